@@ -0,0 +1,142 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = Path.home() / ".config" / "BadWordsChecker" / "transcription_cache.sqlite"
+DEFAULT_CACHE_MAX_MB = 512
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def model_identity(model_path: Path) -> str:
+    """Identifies a model by its resolved path, its version and the Vosk version."""
+    from importlib import metadata  # slow to import and only needed when a scan starts
+
+    model_path = Path(model_path).resolve()
+    parts = [str(model_path)]
+    try:
+        parts.append(f"vosk={metadata.version('vosk')}")
+    except metadata.PackageNotFoundError:
+        pass
+    # Catch a model replaced in place under the same directory name.
+    acoustic_model = model_path / "am" / "final.mdl"
+    if acoustic_model.exists():
+        parts.append(f"am={acoustic_model.stat().st_mtime_ns}")
+    return "|".join(parts)
+
+
+class TranscriptionCache:
+    """A persistent, size-capped cache of transcriptions keyed by audio content.
+
+    Entries hold the finalized recognizer results (text and word timings) and
+    are evicted least-recently-used first once the cache outgrows ``max_bytes``.
+    A cache may be shared by threads, e.g. the pipeline's decode threads.
+    """
+
+    def __init__(self, path: Path, model_id: str, max_bytes: int):
+        self.path = Path(path)
+        self.model_id = model_id
+        self.max_bytes = max_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS transcripts ("
+            "key TEXT PRIMARY KEY, segments BLOB NOT NULL, "
+            "size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    @classmethod
+    def from_config(cls, config: dict, model_path: Path) -> Optional["TranscriptionCache"]:
+        """Opens the cache described by the configuration, or None if it is disabled.
+
+        The non-speech filter changes what is recognized, so its threshold is
+        part of the key when it is enabled.
+        """
+        if config["no_cache"]:
+            return None
+        model_id = model_identity(model_path)
+        if config.get("vad"):
+            model_id += f"|vad={config['vad_threshold_db']}"
+        try:
+            return cls(
+                Path(config["cache_path"]),
+                model_id,
+                config["cache_max_mb"] * 1024 * 1024,
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Transcription cache unavailable at {config['cache_path']}: {e}")
+            return None
+
+    def key_for(self, mp3_path: Path) -> str:
+        """Returns the cache key for an audio file: its content hash plus the model identity."""
+        digest = hashlib.sha256()
+        with open(mp3_path, "rb") as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        digest.update(self.model_id.encode("utf-8"))
+        return digest.hexdigest()
+
+    def contains(self, key: str) -> bool:
+        """Returns whether a key is cached, without marking it recently used."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM transcripts WHERE key = ?", (key,)
+            ).fetchone()
+        return row is not None
+
+    def get(self, key: str) -> Optional[List[Dict]]:
+        """Returns the cached recognizer results for a key, marking them recently used."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT segments FROM transcripts WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE transcripts SET last_used = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+        return json.loads(zlib.decompress(row[0]).decode("utf-8"))
+
+    def put(self, key: str, segments: List[Dict]) -> None:
+        """Stores recognizer results under a key, evicting old entries if needed."""
+        blob = zlib.compress(json.dumps(segments, ensure_ascii=False).encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO transcripts (key, segments, size, last_used) "
+                "VALUES (?, ?, ?, ?)",
+                (key, blob, len(blob), time.time()),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        total = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM transcripts"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute(
+            "SELECT key, size FROM transcripts ORDER BY last_used ASC"
+        ).fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM transcripts WHERE key = ?", (key,))
+            total -= size
+            logger.debug(f"Evicted cached transcription {key}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,66 @@
+import json
+import logging
+import sqlite3
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_FILENAME = "checkpoint.sqlite"
+
+
+class CheckpointJournal:
+    """Records the outcome of each file in the output directory as soon as it finishes.
+
+    A run that crashes or is killed can then be resumed: files already
+    completed are skipped and their matches rebuild the aggregated report.
+    """
+
+    def __init__(self, output_dir: Path, resume: bool = False):
+        self.path = Path(output_dir) / CHECKPOINT_FILENAME
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Files are recorded by the I/O thread, not the thread opening the journal.
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "path TEXT PRIMARY KEY, status TEXT NOT NULL, matches TEXT, "
+            "truncated INTEGER NOT NULL DEFAULT 0, finished REAL NOT NULL)"
+        )
+        if not resume:
+            self._conn.execute("DELETE FROM files")
+        self._conn.commit()
+
+    @staticmethod
+    def key(mp3_path: Path) -> str:
+        return str(Path(mp3_path).resolve())
+
+    def record(self, mp3_path: Path, matches: Optional[Counter], truncated: bool = False) -> None:
+        """Records a finished file; ``matches`` is None when it could not be transcribed."""
+        status = "failed" if matches is None else "done"
+        self._conn.execute(
+            "INSERT OR REPLACE INTO files (path, status, matches, truncated, finished) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                self.key(mp3_path),
+                status,
+                json.dumps(dict(matches), ensure_ascii=False) if matches is not None else None,
+                int(truncated),
+                time.time(),
+            ),
+        )
+        self._conn.commit()
+
+    def completed(self) -> Dict[str, Counter]:
+        """Returns the matches of every successfully completed file, keyed by resolved path.
+
+        Files that failed are left out, so a resumed run retries them.
+        """
+        rows = self._conn.execute(
+            "SELECT path, matches FROM files WHERE status = 'done'"
+        ).fetchall()
+        return {path: Counter(json.loads(matches)) for path, matches in rows}
+
+    def close(self) -> None:
+        self._conn.close()
@@ -1,28 +1,35 @@
 import logging
 import shutil
 import sys
-import tempfile
 from pathlib import Path
+from typing import Dict, List, Set
 import argparse
 
-from vosk import Model
-
+from badwordschecker.checkpoint import CheckpointJournal
 from badwordschecker.dictionary import (
     DEFAULT_DICT_PATH,
     download_dictionary,
     edit_dictionary,
-    load_bad_words,
+    load_dictionary,
 )
 from badwordschecker.reporting import (
     generate_aggregated_report,
     generate_per_file_report,
+    WordFileIndex,
 )
-from badwordschecker.scanning import scan_text
-from badwordschecker.transcription import process_mp3_file
+from badwordschecker.cache import TranscriptionCache
+from badwordschecker.events import EventWriter
+from badwordschecker.matching import DEFAULT_FUZZY_DISTANCE
+from badwordschecker.server import DEFAULT_SOCKET_PATH, serve_main, submit_scan
 from badwordschecker.utils.config import get_config
-from badwordschecker.utils.system import command_exists, silence_stderr
+from badwordschecker.utils.system import command_exists
 from badwordschecker.utils.logging import setup_logging
-from badwordschecker.model_manager import get_model_path, handle_model_download
+from badwordschecker.model_manager import (
+    get_model_path,
+    handle_model_download,
+    load_model,
+    model_supports_grammar,
+)
 
 __version__ = "0.1.0"
 
@@ -30,15 +37,20 @@ logger = logging.getLogger(__name__)
 
 def main():
     """Main entry point for the BadWordsChecker CLI."""
+    if sys.argv[1:2] == ["serve"]:
+        serve_main(sys.argv[2:])
+        return
+
     parser = create_parser()
     args = parser.parse_args()
     config = get_config(args)
 
     setup_logging(config["verbose"], config["log_format"])
 
-    if not command_exists("ffmpeg"):
-        logger.error("ffmpeg not found. Please install it and ensure it's in your PATH.")
-        sys.exit(1)
+    config["mp3_folders"] = collect_roots(config)
+
+    if config["server"] and not (config["download_dict"] or config["edit_dict"]):
+        sys.exit(submit_scan(config, Path(config["server_socket"] or DEFAULT_SOCKET_PATH)))
 
     if config["download_dict"]:
         download_dictionary(config["dict_url"], config["download_dict"], config["force"])
@@ -48,66 +60,277 @@ def main():
         edit_dictionary(Path(config["dict"]))
         sys.exit(0)
 
-    mp3_folder = Path(config["mp3_folder"])
-    if not mp3_folder.is_dir():
-        logger.error(f"MP3 folder not found at {mp3_folder}")
+    # Only scans decode audio, so the dictionary commands work without ffmpeg.
+    if not config["rescan_transcripts"] and not command_exists("ffmpeg"):
+        logger.error("ffmpeg not found. Please install it and ensure it's in your PATH.")
         sys.exit(1)
 
-    bad_words = load_bad_words(Path(config["dict"]))
+    run_scan(config)
+    logger.info("Processing complete.")
+
+
+class RootScan:
+    """One scanned folder with its output directory, checkpoint journal and report index."""
+
+    def __init__(
+        self, root: Path, label: str, output_dir: Path, config: dict, claimed: Set[str]
+    ):
+        self.root = root
+        self.label = label
+        self.output_dir = output_dir
+        mp3_files = (
+            list(root.rglob("*.mp3")) if config["recursive"] else list(root.glob("*.mp3"))
+        )
+        # Files also reachable from an earlier root (nested or overlapping
+        # roots) belong to that root and are neither scanned nor counted here.
+        mp3_files = [p for p in mp3_files if CheckpointJournal.key(p) not in claimed]
+        claimed.update(CheckpointJournal.key(p) for p in mp3_files)
+        self.journal = CheckpointJournal(output_dir, resume=config["resume"])
+        self.completed = self.journal.completed()
+        self.pending = [p for p in mp3_files if CheckpointJournal.key(p) not in self.completed]
+        if self.completed:
+            logger.info(
+                f"Resuming {root}: skipping {len(mp3_files) - len(self.pending)} files "
+                "completed by a previous run."
+            )
+        self.scanned_files = set(self.completed) | {CheckpointJournal.key(p) for p in mp3_files}
+        # Files completed by a previous run keep their matches in the aggregated report.
+        self.report_index = WordFileIndex()
+        for path, matches in self.completed.items():
+            if matches:
+                self.report_index.add(Path(path).name, matches)
+
+    def close(self) -> None:
+        self.journal.close()
+        self.report_index.close()
+
+
+def collect_roots(config: dict) -> List[Path]:
+    """Returns the folders to scan: the arguments, then the roots file, else the current directory.
+
+    A folder given more than once, under any spelling, is only kept the first time.
+    """
+    roots = [Path(folder) for folder in config["mp3_folders"]]
+    if config["roots_file"]:
+        roots_file = Path(config["roots_file"])
+        try:
+            lines = roots_file.read_text(encoding="utf-8").splitlines()
+        except OSError as e:
+            logger.error(f"Failed to read roots file {roots_file}: {e}")
+            sys.exit(1)
+        stripped = (line.strip() for line in lines)
+        roots += [Path(line) for line in stripped if line and not line.startswith("#")]
+    unique: Dict[Path, Path] = {}
+    for root in roots:
+        unique.setdefault(root.resolve(), root)
+    return list(unique.values()) or [Path.cwd()]
+
+
+def _root_labels(roots: List[Path]) -> List[str]:
+    """Unique, readable labels for the roots, used as their output directory names."""
+    labels: List[str] = []
+    for root in roots:
+        base = root.resolve().name or "root"
+        label = base
+        suffix = 2
+        while label in labels:
+            label = f"{base}-{suffix}"
+            suffix += 1
+        labels.append(label)
+    return labels
+
+
+def run_scan(config: dict, output_dir: Path = Path("parolacce"), model=None) -> dict:
+    """Scans the configured folders and writes the reports to ``output_dir``.
+
+    Every folder in ``mp3_folders`` is scanned in one pass with one model and
+    one worker pool. A single folder reports straight into ``output_dir``;
+    with several, each gets its own subdirectory named after it and
+    ``output_dir`` holds a combined aggregated report.
+
+    A ``model`` already loaded (e.g. by the daemon) is used instead of loading
+    one, and files are then scanned in this process. Exits through
+    ``sys.exit`` on fatal errors. Returns a summary of the run.
+    """
+    # The scanning modules load Vosk and NumPy, so they are only imported once
+    # a scan actually runs; --version, --help and the dictionary commands stay fast.
+    from concurrent.futures.process import BrokenProcessPool
+
+    from badwordschecker.parallel import (
+        FileResult,
+        rescan_transcripts,
+        scan_file,
+        scan_files_parallel,
+    )
+    from badwordschecker.metrics import METRICS_FILENAME, RunMetrics, StageTimer
+    from badwordschecker.pipeline import IOThread, format_stage_times, scan_files_pipelined
+
+    roots = [Path(folder) for folder in config["mp3_folders"]]
+    for root in roots:
+        if not root.is_dir():
+            logger.error(f"MP3 folder not found at {root}")
+            sys.exit(1)
+
+    bad_words = load_dictionary(Path(config["dict"]))
     if not bad_words:
         logger.error("No bad words loaded. Exiting.")
         sys.exit(1)
 
-    model_path = get_model_path(config["model_path"])
-    handle_model_download(model_path)
+    if not config["rescan_transcripts"]:
+        model_path = Path(get_model_path(config["model_path"]))
+        if model is None:
+            handle_model_download(model_path)
+        if config["spotting"] and not model_supports_grammar(model_path):
+            logger.warning(
+                f"The model at {model_path} has a static graph and cannot use a spotting "
+                "grammar; files will be fully transcribed."
+            )
 
-    try:
-        if not config["verbose"]:
-            with silence_stderr():
-                model = Model(str(model_path))
-        else:
-            model = Model(str(model_path))
-    except Exception as e:
-        logger.error(f"Failed to load Vosk model: {e}")
-        sys.exit(1)
+    multi_root = len(roots) > 1
+    claimed: Set[str] = set()
+    scans = [
+        RootScan(root, label, output_dir / label if multi_root else output_dir, config, claimed)
+        for root, label in zip(roots, _root_labels(roots))
+    ]
+    owners: Dict[Path, RootScan] = {}
+    for scan in scans:
+        for mp3_path in scan.pending:
+            owners[mp3_path] = scan
+    mp3_files = list(owners)
 
-    mp3_files = (
-        list(mp3_folder.rglob("*.mp3"))
-        if config["recursive"]
-        else list(mp3_folder.glob("*.mp3"))
-    )
-
-    if not mp3_files:
+    total_files = sum(len(scan.scanned_files) for scan in scans)
+    if not total_files:
         logger.info("No MP3 files found in the specified folder.")
+        for scan in scans:
+            scan.close()
         sys.exit(0)
+    if multi_root:
+        logger.info(f"Scanning {len(mp3_files)} files in {len(roots)} folders.")
 
-    all_matches = {}
-    output_dir = Path("parolacce")
-    output_dir.mkdir(exist_ok=True)
+    combined_index = WordFileIndex() if multi_root else None
+    if combined_index is not None:
+        for scan in scans:
+            for path, matches in scan.completed.items():
+                if matches:
+                    combined_index.add(f"{scan.label}/{Path(path).name}", matches)
 
-    for mp3_path in mp3_files:
-        logger.info(f"Processing {mp3_path.name}...")
-        transcription = process_mp3_file(mp3_path, model, config["verbose"])
-        if transcription:
-            matches = scan_text(transcription, bad_words, config["match_mode"])
-            if matches:
-                all_matches[mp3_path.name] = matches
-                generate_per_file_report(mp3_path, matches, output_dir)
-                if config["quarantine"]:
+    # Start a fresh events file for this run; workers append to it.
+    events = EventWriter.from_config(config, truncate=True)
+    cache = None
+    metrics = RunMetrics()
+    stage_times = metrics.pipeline
+
+    if config["rescan_transcripts"]:
+        results = rescan_transcripts(mp3_files, bad_words, config)
+    elif config["jobs"] != 1 and model is None:
+        results = scan_files_parallel(mp3_files, model_path, bad_words, config)
+    else:
+        if model is None:
+            try:
+                model = load_model(model_path, config["verbose"])
+            except Exception as e:
+                logger.error(f"Failed to load Vosk model: {e}")
+                sys.exit(1)
+        cache = TranscriptionCache.from_config(config, model_path)
+        if config["prefetch"] > 0:
+            results = scan_files_pipelined(
+                mp3_files, model, bad_words, config, cache, events, stage_times
+            )
+        else:
+            results = (
+                scan_file(mp3_path, model, bad_words, config, cache, events)
+                for mp3_path in mp3_files
+            )
+
+    def finish_file(result: FileResult) -> None:
+        """Writes the reports of a scanned file and quarantines it; runs on the I/O thread."""
+        mp3_path, matches, truncated, timer = result
+        timer = timer if timer is not None else StageTimer()
+        scan = owners[mp3_path]
+        if matches:
+            with timer.time("report"):
+                scan.report_index.add(mp3_path.name, matches)
+                if combined_index is not None:
+                    combined_index.add(f"{scan.label}/{mp3_path.name}", matches)
+                generate_per_file_report(mp3_path, matches, scan.output_dir, truncated)
+            if config["quarantine"]:
+                with timer.time("quarantine"):
                     quarantine_path = Path(config["quarantine"])
                     quarantine_path.mkdir(exist_ok=True)
                     shutil.move(str(mp3_path), str(quarantine_path))
-                    logger.info(f"Moved {mp3_path.name} to {quarantine_path}")
+                logger.info(f"Moved {mp3_path.name} to {quarantine_path}")
+        elif config["rescan_transcripts"]:
+            # The new dictionary may have cleared a file reported by an earlier run.
+            (scan.output_dir / f"{mp3_path.name}.txt").unlink(missing_ok=True)
+        with timer.time("checkpoint"):
+            scan.journal.record(mp3_path, matches, truncated)
+        metrics.add(mp3_path, timer, failed=matches is None)
+
+    io_thread = IOThread(finish_file, stats=stage_times)
+    try:
+        try:
+            for result in results:
+                io_thread.submit(result)
+        finally:
+            io_thread.close()
+    except BrokenProcessPool as e:
+        logger.error(f"Worker pool failed, most likely while loading the Vosk model: {e}")
+        sys.exit(1)
+    finally:
+        for scan in scans:
+            scan.journal.close()
+        if cache is not None:
+            cache.close()
+        if events is not None:
+            events.close()
+
+    files_with_bad_words = 0
+    for scan in scans:
+        generate_aggregated_report(scan.report_index, scan.output_dir, len(scan.scanned_files))
+        files_with_bad_words += scan.report_index.file_count
+        scan.report_index.close()
+    if combined_index is not None:
+        generate_aggregated_report(combined_index, output_dir, total_files)
+        combined_index.close()
+    metrics.finish()
+    summary = metrics.summary()
+    rtf = ""
+    if summary["rtf"] is not None:
+        rtf = f"real-time factor {summary['rtf']:.3f} over {summary['audio_seconds']:.0f}s of audio, "
+    # With --log-format json the totals and percentiles are logged as a "metrics" field.
+    logger.info(
+        f"Run metrics: {rtf}stage times: {format_stage_times(stage_times)}",
+        extra={"metrics": summary},
+    )
+    metrics_path = Path(config["metrics_path"] or output_dir / METRICS_FILENAME)
+    metrics.write_json(metrics_path)
+    if config["prometheus_textfile"]:
+        metrics.write_prometheus(Path(config["prometheus_textfile"]))
+    return {
+        "files": total_files,
+        "files_with_bad_words": files_with_bad_words,
+        "report": str(output_dir / "parolacce.txt"),
+        "metrics": str(metrics_path),
+    }
 
-    generate_aggregated_report(all_matches, output_dir, len(mp3_files))
-    logger.info("Processing complete.")
 
 def create_parser():
     parser = argparse.ArgumentParser(
         description="Scan MP3 files for bad words.",
         formatter_class=argparse.RawTextHelpFormatter,
     )
-    parser.add_argument("mp3_folder", nargs="?", type=Path, help="Path to the folder containing MP3 files.")
+    parser.add_argument(
+        "mp3_folder",
+        nargs="*",
+        type=Path,
+        help="Folders containing MP3 files (default: the current directory). Several\n"
+        "folders are scanned in one run with a single model load.",
+    )
+    parser.add_argument(
+        "--roots-file",
+        type=Path,
+        help="File listing more folders to scan, one per line (# starts a comment).",
+    )
     parser.add_argument(
         "--download-dict",
         nargs="?",
@@ -130,17 +353,96 @@ def create_parser():
     )
     parser.add_argument(
         "--match-mode",
-        choices=["exact", "substring"],
-        help="Matching mode: exact or substring.",
+        choices=["exact", "substring", "stem", "fuzzy", "phonetic"],
+        help="Matching mode: exact, substring, stem (inflected forms of dictionary words),\n"
+        "fuzzy (tolerates small misspellings) or phonetic (words that sound alike).",
+    )
+    parser.add_argument(
+        "--fuzzy-distance",
+        type=int,
+        help="In fuzzy mode, the most edits (inserted, deleted or replaced letters) between\n"
+        "a word and a dictionary entry; words of up to 5 letters allow none, 6-8 letters\n"
+        f"one, and one more every 3 letters (default: {DEFAULT_FUZZY_DISTANCE}).",
+    )
+    parser.add_argument(
+        "--phonetic-distance",
+        type=int,
+        help="In phonetic mode, also require a word to be at most this many edits away\n"
+        "from the dictionary entry it sounds like (default: no limit).",
+    )
+    parser.add_argument(
+        "--first-hit",
+        type=int,
+        metavar="N",
+        help="Stop transcribing a file once N bad words are found; 1 gives a yes/no verdict\n"
+        "(default: 0, scan whole files).",
+    )
+    parser.add_argument(
+        "--spotting",
+        action="store_true",
+        help="Keyword spotting: decode with a grammar built from the dictionary instead of\n"
+        "full transcription. Much faster; falls back to full decoding if the model\n"
+        "does not accept the grammar.",
+    )
+    parser.add_argument(
+        "--vad",
+        action="store_true",
+        help="Skip silence and other non-speech audio before recognition.",
+    )
+    parser.add_argument(
+        "--vad-threshold-db",
+        type=float,
+        help="Audio quieter than this level (dBFS) counts as non-speech (default: -45).",
+    )
+    parser.add_argument(
+        "--rescan-transcripts",
+        action="store_true",
+        help="Re-scan the transcripts saved next to the MP3s by a previous run with the\n"
+        "current dictionary and match mode, without decoding any audio.",
     )
     parser.add_argument(
         "--quarantine",
         type=Path,
         help="Move offending MP3s to this folder.",
     )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip files completed by a previous interrupted run, as recorded in\n"
+        "parolacce/checkpoint.sqlite, and include their matches in the aggregated report.",
+    )
     parser.add_argument(
         "--recursive", action="store_true", help="Scan for MP3 files recursively."
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        help="Number of worker processes scanning files in parallel (0 = one per CPU core).",
+    )
+    parser.add_argument(
+        "--prefetch",
+        type=int,
+        help="Without --jobs, decode up to this many upcoming files into memory in the\n"
+        "background while the current one is recognized (default: 0 = stream each file\n"
+        "from ffmpeg while recognizing it).",
+    )
+    parser.add_argument(
+        "--prefetch-memory-mb",
+        type=int,
+        help="Most decoded audio held in memory by --prefetch, including the file being\n"
+        "recognized; larger files are streamed (default: 512).",
+    )
+    parser.add_argument(
+        "--split-threads",
+        type=int,
+        help="Split long files at pauses and transcribe the parts on this many threads\n"
+        "(0 = one per CPU core, default: 1 = no splitting).",
+    )
+    parser.add_argument(
+        "--split-min-duration",
+        type=float,
+        help="Only split files lasting at least this many seconds (default: 900).",
+    )
     parser.add_argument(
         "--verbose", action="store_true", help="Enable verbose logging."
     )
@@ -149,6 +451,28 @@ def create_parser():
         choices=["text", "json"],
         help="Set the log output format.",
     )
+    parser.add_argument(
+        "--events",
+        choices=["jsonl"],
+        help="Stream hit and per-file start/finish events as they happen.",
+    )
+    parser.add_argument(
+        "--events-path",
+        type=str,
+        help="Where to write events (default: parolacce/events.jsonl; '-' for stdout).",
+    )
+    parser.add_argument(
+        "--metrics-path",
+        type=Path,
+        help="Where to write the run's stage timings and real-time factor\n"
+        "(default: parolacce/metrics.json).",
+    )
+    parser.add_argument(
+        "--prometheus-textfile",
+        type=Path,
+        help="Also write the run's metrics in the Prometheus text format to this file,\n"
+        "e.g. in node_exporter's textfile collector directory.",
+    )
     parser.add_argument(
         "--dict-url",
         type=str,
@@ -159,6 +483,27 @@ def create_parser():
         type=Path,
         help="Path to the Vosk model directory.",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not read or write the persistent transcription cache.",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Re-transcribe every file and overwrite its cached transcription.",
+    )
+    parser.add_argument(
+        "--server",
+        action="store_true",
+        help="Send the scan to a running 'badwordschecker serve' daemon instead of loading\n"
+        "the model here.",
+    )
+    parser.add_argument(
+        "--server-socket",
+        type=Path,
+        help=f"Socket of the daemon used by --server (default: {DEFAULT_SOCKET_PATH}).",
+    )
     parser.add_argument(
         "--version", action="version", version=f"%(prog)s {__version__}"
     )
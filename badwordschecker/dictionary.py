@@ -1,12 +1,17 @@
+import hashlib
 import logging
 import os
+import pickle
 import platform
+import re
 import subprocess
 import sys
+import threading
 from pathlib import Path
-from typing import Set
+from typing import Optional, Set
 
-import requests
+from badwordschecker.matching import REGEX_PREFIX, CompiledDictionary, check_pattern
+from badwordschecker.utils.text_normalization import normalize_text, strip_accents, tokenize_text
 
 DEFAULT_DICT_URL = "https://raw.githubusercontent.com/napolux/paroleitaliane/master/paroleitaliane/parole_proibite.txt"
 
@@ -14,23 +19,122 @@ logger = logging.getLogger(__name__)
 
 DEFAULT_DICT_PATH = Path("badwords-it.txt")
 
+# Bump whenever the layout of CompiledDictionary changes, to invalidate old artifacts.
+COMPILED_FORMAT_VERSION = 7
+
 
 def load_bad_words(dict_path: Path) -> Set[str]:
-    """Loads bad words from a file into a set, ignoring comments and empty lines."""
+    """Loads bad words from a file into a set, ignoring comments and empty lines.
+
+    Entries are normalized the same way as transcripts, so accented entries
+    match the accent-stripped tokens. Lines starting with ``re:`` are regular
+    expressions; they are kept as written except for their accents, and match
+    regardless of case. Invalid ones, and ones using features
+    ``check_pattern`` rejects, are skipped.
+    """
     if not dict_path.exists():
         logger.error(f"Dictionary file not found at {dict_path}")
         return set()
+    words = set()
     with open(dict_path, "r", encoding="utf-8") as f:
-        words = {
-            line.strip().lower()
-            for line in f
-            if line.strip() and not line.startswith("#")
-        }
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith(REGEX_PREFIX):
+                pattern = strip_accents(line[len(REGEX_PREFIX):].strip())
+                try:
+                    check_pattern(pattern)
+                except re.error as e:
+                    logger.warning(f"Skipping invalid pattern {line!r} in {dict_path}: {e}")
+                    continue
+                words.add(REGEX_PREFIX + pattern)
+            else:
+                words.add(" ".join(tokenize_text(normalize_text(line))))
+    words.discard("")
+    words.discard(REGEX_PREFIX)
     if not words:
         logger.warning(f"Dictionary at {dict_path} is empty.")
     return words
 
 
+def compiled_dictionary_path(dict_path: Path) -> Path:
+    """Returns the location of the compiled artifact stored next to a dictionary."""
+    return dict_path.with_name(dict_path.name + ".idx")
+
+
+def load_dictionary(dict_path: Path) -> CompiledDictionary:
+    """Loads a dictionary through its compiled artifact, rebuilding it when the source changes.
+
+    The artifact is reused as long as the source's mtime and size are unchanged;
+    otherwise the source is hashed and only re-parsed if its content changed.
+    """
+    if not dict_path.exists():
+        logger.error(f"Dictionary file not found at {dict_path}")
+        return CompiledDictionary(set())
+
+    artifact_path = compiled_dictionary_path(dict_path)
+    stat = dict_path.stat()
+    artifact = _read_compiled_artifact(artifact_path)
+    if (
+        artifact is not None
+        and artifact["mtime_ns"] == stat.st_mtime_ns
+        and artifact["size"] == stat.st_size
+    ):
+        logger.debug(f"Loaded compiled dictionary from {artifact_path}")
+        return artifact["dictionary"]
+
+    digest = hashlib.sha256(dict_path.read_bytes()).hexdigest()
+    if artifact is not None and artifact["sha256"] == digest:
+        dictionary = artifact["dictionary"]
+    else:
+        logger.info(f"Compiling dictionary {dict_path}...")
+        dictionary = CompiledDictionary(load_bad_words(dict_path)).compile()
+
+    _write_compiled_artifact(
+        artifact_path,
+        {
+            "format": COMPILED_FORMAT_VERSION,
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": digest,
+            "dictionary": dictionary,
+        },
+    )
+    return dictionary
+
+
+def _read_compiled_artifact(artifact_path: Path) -> Optional[dict]:
+    if not artifact_path.exists():
+        return None
+    try:
+        with open(artifact_path, "rb") as f:
+            artifact = pickle.load(f)
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable compiled dictionary {artifact_path}: {e}")
+        return None
+    if not isinstance(artifact, dict) or artifact.get("format") != COMPILED_FORMAT_VERSION:
+        return None
+    return artifact
+
+
+def _write_compiled_artifact(artifact_path: Path, artifact: dict) -> None:
+    # Write to a temporary file first so concurrent readers never see a partial artifact.
+    # The name is unique per thread, as daemon jobs may compile the same dictionary at once.
+    temp_path = artifact_path.with_name(
+        f"{artifact_path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+    )
+    try:
+        with open(temp_path, "wb") as f:
+            pickle.dump(artifact, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, artifact_path)
+        logger.debug(f"Saved compiled dictionary to {artifact_path}")
+    except OSError as e:
+        logger.warning(f"Could not save compiled dictionary to {artifact_path}: {e}")
+        if temp_path.exists():
+            temp_path.unlink()
+
+
 def download_dictionary(url: str, dest_path: Path, force: bool = False) -> None:
     """Downloads the dictionary from a URL."""
     if dest_path.exists() and not force:
@@ -38,6 +142,8 @@ def download_dictionary(url: str, dest_path: Path, force: bool = False) -> None:
             f"Dictionary already exists at {dest_path}. Use --force to overwrite."
         )
         return
+    import requests  # only needed here; keeps it out of every other command's startup
+
     try:
         response = requests.get(url, timeout=30)
         response.raise_for_status()
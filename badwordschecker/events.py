@@ -0,0 +1,97 @@
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from badwordschecker.matching import CompiledDictionary
+from badwordschecker.scanning import scan_text
+from badwordschecker.utils.text_normalization import normalize_text, tokenize_text
+
+logger = logging.getLogger(__name__)
+
+STDOUT_PATH = "-"
+
+
+class EventWriter:
+    """Writes scan events as JSON lines the moment they happen.
+
+    Every event is a single ``write`` to a file opened in append mode, so
+    several worker processes can share the same events file.
+    """
+
+    def __init__(self, path, truncate: bool = False):
+        self.path = str(path)
+        if self.path == STDOUT_PATH:
+            self._fd = os.dup(1)
+            return
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        flags = os.O_WRONLY | os.O_CREAT | os.O_APPEND
+        if truncate:
+            flags |= os.O_TRUNC
+        self._fd = os.open(self.path, flags, 0o644)
+
+    @classmethod
+    def from_config(cls, config: dict, truncate: bool = False) -> Optional["EventWriter"]:
+        """Opens the events output described by the configuration, or None if disabled."""
+        if config["events"] != "jsonl":
+            return None
+        return cls(config["events_path"], truncate=truncate)
+
+    def emit(self, event: str, **fields) -> None:
+        record = {"event": event, "ts": round(time.time(), 3), **fields}
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        try:
+            os.write(self._fd, line.encode("utf-8"))
+        except OSError as e:
+            logger.warning(f"Failed to write {event} event to {self.path}: {e}")
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+def find_segment_hits(
+    segment: Dict,
+    bad_words: CompiledDictionary,
+    match_mode: str,
+    max_distance: Optional[int] = None,
+) -> Iterator[Tuple[str, Optional[Dict]]]:
+    """Yields each bad word found in a recognized segment with the word that matched.
+
+    The matched word carries the recognizer's ``start``, ``end`` and ``conf``
+    values; it is None when the segment has no word timings. For a phrase it
+    spans the recognized words making it up, with their lowest confidence.
+    """
+    words = segment.get("result")
+    if not words:
+        for bad_word, count in scan_text(segment.get("text", ""), bad_words, match_mode, max_distance).items():
+            for _ in range(count):
+                yield bad_word, None
+        return
+
+    # Phrases span several recognized words, so they are matched over the
+    # segment's tokens, remembering which word each token came from.
+    tokens: List[str] = []
+    owners: List[int] = []
+    for index, word in enumerate(words):
+        for bad_word, count in scan_text(word.get("word", ""), bad_words, match_mode, max_distance).items():
+            for _ in range(count):
+                yield bad_word, word
+        if bad_words.phrases:
+            for token in tokenize_text(normalize_text(word.get("word", ""))):
+                tokens.append(token)
+                owners.append(index)
+    for start, end, phrase in bad_words.match_phrases(tokens):
+        yield phrase, _span(words[owners[start] : owners[end - 1] + 1])
+
+
+def _span(words: List[Dict]) -> Dict:
+    """Merges consecutive recognized words into one, as reported for a phrase hit."""
+    confidences = [word["conf"] for word in words if "conf" in word]
+    return {
+        "word": " ".join(word.get("word", "") for word in words),
+        "start": words[0].get("start"),
+        "end": words[-1].get("end"),
+        "conf": min(confidences) if confidences else None,
+    }
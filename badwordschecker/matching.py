@@ -0,0 +1,409 @@
+import json
+import re
+from collections import Counter, deque
+from functools import cached_property
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from badwordschecker.utils.phonetics import phonetic_key
+from badwordschecker.utils.stemming import stem
+
+# Dictionary lines starting with this prefix are regular expressions.
+REGEX_PREFIX = "re:"
+
+# Key marking the end of a phrase in the phrase trie; tokens are never None.
+_PHRASE_END = None
+
+# In fuzzy mode, tokens shorter than this only match exactly: one edit away
+# from a short bad word there are too many innocent words (pazzo, cazzo).
+FUZZY_MIN_LENGTH = 6
+# Each edit beyond the first needs this many more characters in the token.
+FUZZY_LENGTH_PER_EDIT = 3
+DEFAULT_FUZZY_DISTANCE = 1
+# Fuzzy lookups remembered per dictionary before the memo starts over.
+FUZZY_MEMO_SIZE = 200_000
+
+
+def levenshtein(a: str, b: str, max_distance: Optional[int] = None) -> int:
+    """Edit distance between two strings.
+
+    With ``max_distance``, stops as soon as the distance is known to exceed
+    it and returns ``max_distance + 1``.
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    if max_distance is not None and len(a) - len(b) > max_distance:
+        return max_distance + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(
+                min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b))
+            )
+        if max_distance is not None and min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+
+
+def check_pattern(pattern: str) -> None:
+    """Raises ``re.error`` unless a regex entry can be part of ``combined_pattern``.
+
+    Each entry becomes one named group of a single alternation, so global
+    inline flags such as ``(?i)``, named groups and backreferences, whose
+    meaning would change there, are rejected along with invalid syntax.
+    """
+    compiled = re.compile(pattern)
+    if compiled.flags & ~re.UNICODE:
+        raise re.error("inline global flags are not supported, use a scoped group like (?i:...)")
+    if compiled.groupindex:
+        raise re.error("named groups are not supported")
+    if compiled.groups and _has_backreference(pattern):
+        raise re.error("backreferences are not supported")
+    re.compile(f"(?:(?P<p0>{pattern}))")
+
+
+def _has_backreference(pattern: str) -> bool:
+    i = 0
+    while i < len(pattern):
+        if pattern[i] == "\\":
+            if i + 1 < len(pattern) and pattern[i + 1] in "123456789":
+                return True
+            i += 2
+            continue
+        if pattern.startswith(("(?P=", "(?("), i):
+            return True
+        i += 1
+    return False
+
+
+def allowed_edits(length: int, max_distance: int) -> int:
+    """Edits fuzzy mode allows for a token of ``length`` characters, at most ``max_distance``.
+
+    None below ``FUZZY_MIN_LENGTH`` characters, one from there, and one more
+    every ``FUZZY_LENGTH_PER_EDIT`` characters: 6-8 characters allow one
+    edit, 9-11 two, and so on.
+    """
+    if length < FUZZY_MIN_LENGTH:
+        return 0
+    return min(max_distance, 1 + (length - FUZZY_MIN_LENGTH) // FUZZY_LENGTH_PER_EDIT)
+
+
+def _deletes(word: str, distance: int) -> Set[str]:
+    """The word and every string obtained by deleting up to ``distance`` characters from it."""
+    variants = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1 :] for w in frontier for i in range(len(w))}
+        variants |= frontier
+    return variants
+
+
+class DeletionIndex:
+    """A SymSpell-style index finding the words within an edit distance of a query.
+
+    Every word is indexed under each string obtained by deleting up to
+    ``max_distance`` of its characters. Two words at most ``d`` edits apart
+    share such a deletion, so a lookup only generates the deletions of the
+    query and checks the few words filed under them, instead of computing
+    the distance to every word.
+    """
+
+    def __init__(self, words: Iterable[str], max_distance: int):
+        self.max_distance = max_distance
+        index: Dict[str, List[str]] = {}
+        for word in sorted(words):
+            for variant in _deletes(word, max_distance):
+                index.setdefault(variant, []).append(word)
+        self._index: Dict[str, Tuple[str, ...]] = {
+            variant: tuple(words) for variant, words in index.items()
+        }
+
+    def search(self, word: str, max_distance: int) -> List[Tuple[int, str]]:
+        """Returns ``(distance, word)`` pairs within ``max_distance``, closest first."""
+        if max_distance > self.max_distance:
+            raise ValueError(
+                f"Index built for distance {self.max_distance}, cannot search {max_distance}"
+            )
+        candidates: Set[str] = set()
+        for variant in _deletes(word, max_distance):
+            candidates.update(self._index.get(variant, ()))
+        found = []
+        for candidate in candidates:
+            distance = levenshtein(word, candidate, max_distance)
+            if distance <= max_distance:
+                found.append((distance, candidate))
+        return sorted(found)
+
+
+class AhoCorasick:
+    """A multi-pattern substring matcher (Aho–Corasick automaton).
+
+    Finding every pattern that occurs in a text takes a single pass over the
+    text, regardless of how many patterns the automaton was built from.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[Tuple[str, ...]] = [()]
+
+        for pattern in patterns:
+            self._add(pattern)
+        self._build_failure_links()
+
+    def _add(self, pattern: str) -> None:
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append(())
+            state = next_state
+        self._outputs[state] = (pattern,)
+
+    def _build_failure_links(self) -> None:
+        # Breadth-first, so every failure target is final before it is used.
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._outputs[next_state] += self._outputs[self._fail[next_state]]
+
+    def find_all(self, text: str) -> Set[str]:
+        """Returns the set of distinct patterns that occur anywhere in the text."""
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        found = set(outputs[0])
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if outputs[state]:
+                found.update(outputs[state])
+        return found
+
+
+class CompiledDictionary:
+    """A bad words dictionary together with the match structures derived from it.
+
+    Build it once from the output of ``load_bad_words`` and reuse it across
+    files; the match structures are only built the first time a mode needs them.
+    """
+
+    def __init__(self, words: Iterable[str]):
+        single_words = set()
+        phrases = set()
+        patterns = set()
+        for entry in words:
+            if entry.startswith(REGEX_PREFIX):
+                patterns.add(entry)
+                continue
+            tokens = tuple(entry.split())
+            if len(tokens) > 1:
+                phrases.add(tokens)
+            else:
+                single_words.add(entry)
+        self.words: FrozenSet[str] = frozenset(single_words)
+        self.phrases: FrozenSet[Tuple[str, ...]] = frozenset(phrases)
+        # Regex entries, kept with their prefix; hits are reported under them.
+        self.patterns: FrozenSet[str] = frozenset(patterns)
+        self._deletion_index: Optional[DeletionIndex] = None
+        self._fuzzy_memo: Dict[Tuple[str, int], Optional[str]] = {}
+
+    def __getstate__(self) -> dict:
+        # Lookups remembered while scanning are not worth storing or sending to workers.
+        return {**self.__dict__, "_fuzzy_memo": {}}
+
+    @cached_property
+    def automaton(self) -> AhoCorasick:
+        return AhoCorasick(self.words)
+
+    @cached_property
+    def stem_index(self) -> Dict[str, str]:
+        """Maps the stem of every word to the word hits are reported under.
+
+        When several words share a stem (e.g. ``stronzo`` and ``stronza``),
+        the alphabetically first one is used.
+        """
+        index: Dict[str, str] = {}
+        for word in sorted(self.words):
+            index.setdefault(stem(word), word)
+        return index
+
+    def stem_match(self, token: str) -> Optional[str]:
+        """Returns the dictionary word ``token`` is an inflected form of, if any."""
+        if token in self.words:
+            return token
+        return self.stem_index.get(stem(token))
+
+    @cached_property
+    def phonetic_index(self) -> Dict[str, Tuple[str, ...]]:
+        """Maps the phonetic key of every word to the words sharing it, in alphabetical order."""
+        index: Dict[str, List[str]] = {}
+        for word in sorted(self.words):
+            index.setdefault(phonetic_key(word), []).append(word)
+        return {key: tuple(words) for key, words in index.items()}
+
+    def phonetic_match(self, token: str, max_distance: Optional[int] = None) -> Optional[str]:
+        """Returns the dictionary word that sounds like ``token``, if any.
+
+        A single lookup by phonetic key finds the candidates. With
+        ``max_distance``, candidates more edits away than that are rejected;
+        of those left, the closest one wins, ties going to the alphabetically
+        first word.
+        """
+        if token in self.words:
+            return token
+        candidates = self.phonetic_index.get(phonetic_key(token))
+        if not candidates:
+            return None
+        if len(candidates) == 1 and max_distance is None:
+            return candidates[0]
+        distance, word = min((levenshtein(token, word, max_distance), word) for word in candidates)
+        if max_distance is not None and distance > max_distance:
+            return None
+        return word
+
+    @cached_property
+    def phrase_trie(self) -> dict:
+        """Multi-word entries as a token trie.
+
+        Each node maps a token to the next node; a node ending a phrase also
+        holds the joined phrase under ``_PHRASE_END``.
+        """
+        root: dict = {}
+        for phrase in self.phrases:
+            node = root
+            for token in phrase:
+                node = node.setdefault(token, {})
+            node[_PHRASE_END] = " ".join(phrase)
+        return root
+
+    def match_phrases(self, tokens: Sequence[str]) -> Iterator[Tuple[int, int, str]]:
+        """Yields ``(start, end, phrase)`` for every multi-word entry in a token sequence.
+
+        Each position walks the trie only as far as the tokens keep matching a
+        phrase, so no n-grams are built. Overlapping phrases are all reported.
+        """
+        trie = self.phrase_trie
+        if not trie:
+            return
+        for start, token in enumerate(tokens):
+            node = trie.get(token)
+            end = start + 1
+            while node is not None:
+                phrase = node.get(_PHRASE_END)
+                if phrase is not None:
+                    yield start, end, phrase
+                if end == len(tokens):
+                    break
+                node = node.get(tokens[end])
+                end += 1
+
+    @cached_property
+    def combined_pattern(self) -> Optional["re.Pattern[str]"]:
+        """All regex entries as one alternation, with the named group ``p<i>`` for entry ``i``.
+
+        Entries must pass ``check_pattern``. A token matches an entry when the
+        whole token matches, so one ``fullmatch`` tries every entry at once.
+        Tokens are lowercase, so entries match regardless of case.
+        """
+        if not self.patterns:
+            return None
+        alternatives = "|".join(
+            f"(?P<p{i}>{entry[len(REGEX_PREFIX):]})" for i, entry in enumerate(self._pattern_entries)
+        )
+        return re.compile(f"(?:{alternatives})", re.IGNORECASE)
+
+    @cached_property
+    def _pattern_entries(self) -> Tuple[str, ...]:
+        return tuple(sorted(self.patterns))
+
+    def match_patterns(self, tokens: Iterable[str]) -> Counter:
+        """Counts the tokens matching each regex entry.
+
+        Each token counts for the first entry, in alphabetical order, that
+        matches it as a whole.
+        """
+        matches: Counter = Counter()
+        pattern = self.combined_pattern
+        if pattern is None:
+            return matches
+        entries = self._pattern_entries
+        # Each distinct token is matched on its own, so no match can span two tokens.
+        for token, count in Counter(tokens).items():
+            match = pattern.fullmatch(token)
+            if match is not None and match.lastgroup is not None:
+                matches[entries[int(match.lastgroup[1:])]] += count
+        return matches
+
+    def deletion_index(self, max_distance: int = DEFAULT_FUZZY_DISTANCE) -> DeletionIndex:
+        """The fuzzy index, rebuilt once for a larger distance than it was built for."""
+        index = self._deletion_index
+        if index is None or index.max_distance < max_distance:
+            index = DeletionIndex(self.words, max(max_distance, DEFAULT_FUZZY_DISTANCE))
+            self._deletion_index = index
+        return index
+
+    def fuzzy_match(self, token: str, max_distance: int = DEFAULT_FUZZY_DISTANCE) -> Optional[str]:
+        """Returns the dictionary word closest to ``token`` within ``max_distance`` edits.
+
+        Shorter tokens get fewer edits, see ``allowed_edits``. Ties go to the
+        alphabetically first word. Results are memoized, as the
+        same tokens come back in file after file.
+        """
+        key = (token, max_distance)
+        try:
+            return self._fuzzy_memo[key]
+        except KeyError:
+            pass
+        if token in self.words:
+            match: Optional[str] = token
+        else:
+            distance = allowed_edits(len(token), max_distance)
+            found = self.deletion_index(distance).search(token, distance) if distance else []
+            match = found[0][1] if found else None
+        if len(self._fuzzy_memo) >= FUZZY_MEMO_SIZE:
+            self._fuzzy_memo.clear()
+        self._fuzzy_memo[key] = match
+        return match
+
+    @cached_property
+    def spotting_grammar(self) -> str:
+        """A Vosk grammar listing every literal entry, plus ``[unk]`` for all other speech."""
+        return json.dumps(sorted(self.entries() - self.patterns) + ["[unk]"], ensure_ascii=False)
+
+    def compile(self) -> "CompiledDictionary":
+        """Builds every match structure up front, e.g. before serializing."""
+        self.automaton
+        self.stem_index
+        self.phonetic_index
+        self.phrase_trie
+        self.combined_pattern
+        self.deletion_index()
+        return self
+
+    def entries(self) -> Set[str]:
+        """Returns all dictionary entries, with multi-word entries joined by spaces."""
+        return set(self.words) | {" ".join(phrase) for phrase in self.phrases} | set(self.patterns)
+
+    def __contains__(self, word: object) -> bool:
+        return word in self.words or word in self.patterns or (
+            isinstance(word, str) and tuple(word.split()) in self.phrases
+        )
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.entries())
+
+    def __len__(self) -> int:
+        return len(self.words) + len(self.phrases) + len(self.patterns)
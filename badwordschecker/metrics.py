@@ -0,0 +1,203 @@
+import json
+import logging
+import os
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import DefaultDict, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+METRICS_FILENAME = "metrics.json"
+PERCENTILES = (50, 90, 99)
+
+# Stages making up the real-time factor: the time needed to turn audio into text.
+RTF_STAGES = ("decode", "recognize")
+
+
+class StageTimer:
+    """Wall time spent on one file in each stage, plus the length of its audio.
+
+    Stages are e.g. ``cache`` (hashing and lookups), ``decode`` (ffmpeg),
+    ``recognize`` (Vosk; it includes decoding when both are streamed
+    together), ``save_transcript``, ``scan``, ``report``, ``quarantine`` and
+    ``checkpoint``. The timer is sent back from worker processes with the
+    file's result, so it only holds plain values.
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self.audio_seconds: Optional[float] = None
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def add_audio(self, seconds: float) -> None:
+        self.audio_seconds = (self.audio_seconds or 0.0) + seconds
+
+    @contextmanager
+    def time(self, stage: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start)
+
+    @property
+    def rtf(self) -> Optional[float]:
+        """Decoding and recognition time over audio duration; None without decoded audio."""
+        if not self.audio_seconds:
+            return None
+        return sum(self.stages.get(stage, 0.0) for stage in RTF_STAGES) / self.audio_seconds
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Linearly interpolated percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def _distribution(values: List[float]) -> dict:
+    summary = {"total": round(sum(values), 3)}
+    for pct in PERCENTILES:
+        summary[f"p{pct}"] = round(percentile(values, pct), 3)
+    summary["max"] = round(max(values), 3)
+    return summary
+
+
+class RunMetrics:
+    """Collects the stage timings of every file of a run and exports them.
+
+    ``pipeline`` holds run-wide times that do not belong to a single file,
+    such as the recognizer waiting for decoded audio (``wait_for_audio``) or
+    for the I/O thread (``wait_for_io``).
+    """
+
+    def __init__(self):
+        self.started = datetime.now(timezone.utc)
+        self.pipeline: DefaultDict[str, float] = defaultdict(float)
+        self.files: List[dict] = []
+        self._start = time.perf_counter()
+        self._wall_seconds: Optional[float] = None
+
+    def add(self, mp3_path: Path, timer: Optional[StageTimer], failed: bool = False) -> None:
+        timer = timer if timer is not None else StageTimer()
+        rtf = timer.rtf
+        self.files.append(
+            {
+                "file": str(mp3_path),
+                "failed": failed,
+                "audio_seconds": round(timer.audio_seconds, 3) if timer.audio_seconds else None,
+                "rtf": round(rtf, 4) if rtf is not None else None,
+                "stages": {stage: round(seconds, 4) for stage, seconds in timer.stages.items()},
+            }
+        )
+
+    def finish(self) -> None:
+        """Stops the run's wall clock."""
+        self._wall_seconds = time.perf_counter() - self._start
+
+    def summary(self) -> dict:
+        """Totals and percentiles over the files of the run."""
+        wall_seconds = (
+            self._wall_seconds if self._wall_seconds is not None else time.perf_counter() - self._start
+        )
+        stage_values: Dict[str, List[float]] = {}
+        for record in self.files:
+            for stage, seconds in record["stages"].items():
+                stage_values.setdefault(stage, []).append(seconds)
+        timed = [record for record in self.files if record["rtf"] is not None]
+        audio_seconds = sum(record["audio_seconds"] for record in timed)
+        rtf_seconds = sum(
+            record["stages"].get(stage, 0.0) for record in timed for stage in RTF_STAGES
+        )
+
+        summary = {
+            "started": self.started.isoformat(timespec="seconds"),
+            "wall_seconds": round(wall_seconds, 3),
+            "files": len(self.files),
+            "failed": sum(record["failed"] for record in self.files),
+            "audio_seconds": round(audio_seconds, 3),
+            "rtf": round(rtf_seconds / audio_seconds, 4) if audio_seconds else None,
+            "stages": {stage: _distribution(values) for stage, values in sorted(stage_values.items())},
+            "pipeline": {stage: round(seconds, 3) for stage, seconds in self.pipeline.items()},
+        }
+        if timed:
+            summary["file_rtf"] = _distribution([record["rtf"] for record in timed])
+            del summary["file_rtf"]["total"]
+        return summary
+
+    def write_json(self, path: Path) -> None:
+        """Writes the summary and the timings of every file."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(
+            json.dumps({**self.summary(), "per_file": self.files}, indent=2, ensure_ascii=False) + "\n",
+            encoding="utf-8",
+        )
+        logger.info(f"Metrics saved to {path}")
+
+    def write_prometheus(self, path: Path) -> None:
+        """Writes the summary in the Prometheus text format, for node_exporter's textfile collector.
+
+        The file is replaced atomically so the collector never reads a partial file.
+        """
+        summary = self.summary()
+        lines = []
+
+        def metric(name: str, kind: str, help_text: str, samples: List[tuple]) -> None:
+            lines.append(f"# HELP badwordschecker_{name} {help_text}")
+            lines.append(f"# TYPE badwordschecker_{name} {kind}")
+            for suffix, labels, value in samples:
+                label_text = ",".join(f'{key}="{val}"' for key, val in labels.items())
+                label_text = f"{{{label_text}}}" if label_text else ""
+                lines.append(f"badwordschecker_{name}{suffix}{label_text} {value}")
+
+        metric(
+            "last_run_timestamp_seconds",
+            "gauge",
+            "Start time of the last run.",
+            [("", {}, int(self.started.timestamp()))],
+        )
+        metric("last_run_wall_seconds", "gauge", "Duration of the last run.", [("", {}, summary["wall_seconds"])])
+        metric("last_run_files", "gauge", "Files scanned by the last run.", [("", {}, summary["files"])])
+        metric("last_run_failed_files", "gauge", "Files that could not be scanned.", [("", {}, summary["failed"])])
+        metric(
+            "last_run_audio_seconds",
+            "gauge",
+            "Audio decoded by the last run.",
+            [("", {}, summary["audio_seconds"])],
+        )
+        if summary["rtf"] is not None:
+            metric(
+                "last_run_real_time_factor",
+                "gauge",
+                "Decoding and recognition time over audio duration.",
+                [("", {}, summary["rtf"])],
+            )
+
+        samples = []
+        for stage, values in summary["stages"].items():
+            for pct in PERCENTILES:
+                samples.append(("", {"stage": stage, "quantile": pct / 100}, values[f"p{pct}"]))
+            samples.append(("_sum", {"stage": stage}, values["total"]))
+            samples.append(("_count", {"stage": stage}, sum(stage in r["stages"] for r in self.files)))
+        if samples:
+            metric("last_run_stage_seconds", "summary", "Time spent on each file per stage.", samples)
+        if summary["pipeline"]:
+            metric(
+                "last_run_pipeline_seconds",
+                "gauge",
+                "Run-wide time per pipeline stage.",
+                [("", {"stage": stage}, seconds) for stage, seconds in summary["pipeline"].items()],
+            )
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        temp_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        os.replace(temp_path, path)
+        logger.info(f"Prometheus metrics saved to {path}")
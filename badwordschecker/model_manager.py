@@ -1,8 +1,15 @@
 import logging
-import requests
 import zipfile
 from pathlib import Path
-from tqdm import tqdm
+from typing import TYPE_CHECKING
+
+from badwordschecker.utils.system import silence_stderr
+
+if TYPE_CHECKING:
+    from vosk import Model
+
+# vosk, requests and tqdm are imported where they are used, so commands that
+# never load or download a model start without them.
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +23,20 @@ def get_model_path(custom_path: Path = None) -> Path:
         return custom_path
     return DEFAULT_MODEL_PATH
 
+def load_model(model_path: Path, verbose: bool = False) -> "Model":
+    """Load the Vosk model, hiding its native logging unless verbose."""
+    from vosk import Model
+
+    if not verbose:
+        with silence_stderr():
+            return Model(str(model_path))
+    return Model(str(model_path))
+
+def model_supports_grammar(model_path: Path) -> bool:
+    """Whether the model can decode with a runtime grammar (lookahead graph)."""
+    graph_dir = Path(model_path) / "graph"
+    return (graph_dir / "HCLr.fst").exists() and (graph_dir / "Gr.fst").exists()
+
 def handle_model_download(model_path: Path):
     """Check if the model exists, and if not, download and unzip it."""
     if model_path.exists():
@@ -36,6 +57,9 @@ def handle_model_download(model_path: Path):
 
 def _download_model(zip_path: Path):
     """Download the model zip file with a progress bar."""
+    import requests
+    from tqdm import tqdm
+
     try:
         with requests.get(MODEL_URL, stream=True) as r:
             r.raise_for_status()
@@ -0,0 +1,243 @@
+import logging
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterator, List, NamedTuple, Optional, Set, Union
+
+from badwordschecker.cache import TranscriptionCache
+from badwordschecker.events import EventWriter, find_segment_hits
+from badwordschecker.matching import CompiledDictionary
+from badwordschecker.metrics import StageTimer
+from badwordschecker.model_manager import load_model
+from badwordschecker.scanning import match_distance, scan_text
+from badwordschecker.transcription import process_mp3_file
+from badwordschecker.utils.logging import setup_logging
+
+logger = logging.getLogger(__name__)
+
+# Per-process state populated once by _init_worker.
+_worker_model = None
+_worker_bad_words: Union[Set[str], CompiledDictionary] = set()
+_worker_config: dict = {}
+_worker_cache: Optional[TranscriptionCache] = None
+_worker_events: Optional[EventWriter] = None
+
+# Files handed to each rescan worker at a time; scanning a stored transcript
+# is quick, so batching keeps the inter-process overhead low.
+RESCAN_CHUNKSIZE = 16
+
+
+class FileResult(NamedTuple):
+    """Outcome of scanning a single MP3 file."""
+
+    mp3_path: Path
+    matches: Optional[Counter]
+    truncated: bool = False
+    timings: Optional[StageTimer] = None
+
+
+def resolve_jobs(jobs: int) -> int:
+    """Returns the number of worker processes to use; 0 means one per CPU core."""
+    if jobs <= 0:
+        return os.cpu_count() or 1
+    return jobs
+
+
+def scan_file(
+    mp3_path: Path,
+    model,
+    bad_words: Union[Set[str], CompiledDictionary],
+    config: dict,
+    cache: Optional[TranscriptionCache] = None,
+    events: Optional[EventWriter] = None,
+    pcm: Optional[bytes] = None,
+    cache_key: Optional[str] = None,
+    timer: Optional[StageTimer] = None,
+) -> FileResult:
+    """Transcribes a single MP3 file and scans the transcription for bad words.
+
+    Each segment is scanned as soon as it is recognized when hits are streamed
+    to ``events`` or when ``first_hit`` is set; in the latter case transcription
+    stops once that many bad words have been found, and the result is marked
+    truncated. A transcript that came back whole anyway, e.g. from the cache,
+    is scanned whole and not marked. ``pcm``, ``cache_key``
+    and ``timer`` carry work already done by the pipeline's decode stage.
+    """
+    logger.info(f"Processing {mp3_path.name}...")
+    timer = timer if timer is not None else StageTimer()
+    if not isinstance(bad_words, CompiledDictionary):
+        bad_words = CompiledDictionary(bad_words)
+    if events is not None:
+        events.emit("file_start", file=str(mp3_path))
+
+    hit_limit = config["first_hit"]
+    early_matches: Counter = Counter()
+    stopped_early = False
+
+    def on_stop() -> None:
+        nonlocal stopped_early
+        stopped_early = True
+
+    def on_segment(segment: dict) -> bool:
+        for bad_word, word in find_segment_hits(
+            segment, bad_words, config["match_mode"], match_distance(config)
+        ):
+            early_matches[bad_word] += 1
+            if events is not None:
+                word = word or {}
+                events.emit(
+                    "hit",
+                    file=str(mp3_path),
+                    word=bad_word,
+                    heard=word.get("word"),
+                    start=word.get("start"),
+                    end=word.get("end"),
+                    conf=word.get("conf"),
+                )
+        return bool(hit_limit) and sum(early_matches.values()) >= hit_limit
+
+    transcription = process_mp3_file(
+        mp3_path,
+        model,
+        config["verbose"],
+        cache=cache,
+        refresh=config["refresh"],
+        on_segment=on_segment if hit_limit or events is not None else None,
+        grammar=bad_words.spotting_grammar if config["spotting"] else None,
+        vad_threshold_db=config["vad_threshold_db"] if config["vad"] else None,
+        split_threads=resolve_jobs(config["split_threads"]),
+        split_min_duration=config["split_min_duration"],
+        pcm=pcm,
+        cache_key=cache_key,
+        timer=timer,
+        on_stop=on_stop,
+    )
+    if stopped_early:
+        logger.info(f"Stopped scanning {mp3_path.name} after {hit_limit} bad word(s).")
+        result = FileResult(mp3_path, early_matches, truncated=True, timings=timer)
+    elif not transcription:
+        result = FileResult(mp3_path, None, timings=timer)
+    else:
+        with timer.time("scan"):
+            matches = scan_text(
+                transcription, bad_words, config["match_mode"], match_distance(config)
+            )
+        result = FileResult(mp3_path, matches, timings=timer)
+
+    if events is not None:
+        if transcription is None:
+            status = "failed"
+        else:
+            status = "truncated" if result.truncated else "done"
+        events.emit(
+            "file_finish",
+            file=str(mp3_path),
+            status=status,
+            hits=sum(result.matches.values()) if result.matches else 0,
+        )
+    return result
+
+
+def _init_worker(model_path: Path, bad_words: Union[Set[str], CompiledDictionary], config: dict) -> None:
+    """Loads the Vosk model and opens the cache and events output once per worker process."""
+    global _worker_model, _worker_bad_words, _worker_config, _worker_cache, _worker_events
+    setup_logging(config["verbose"], config["log_format"])
+    _worker_model = load_model(model_path, config["verbose"])
+    _worker_bad_words = bad_words
+    _worker_config = config
+    _worker_cache = TranscriptionCache.from_config(config, model_path)
+    _worker_events = EventWriter.from_config(config)
+
+
+def _scan_file_in_worker(mp3_path: Path) -> FileResult:
+    return scan_file(
+        mp3_path,
+        _worker_model,
+        _worker_bad_words,
+        _worker_config,
+        _worker_cache,
+        _worker_events,
+    )
+
+
+def scan_files_parallel(
+    mp3_files: List[Path], model_path: Path, bad_words: Union[Set[str], CompiledDictionary], config: dict
+) -> Iterator[FileResult]:
+    """Scans MP3 files in a process pool, yielding results in input order.
+
+    Each worker loads its own copy of the model through the pool initializer,
+    so the model is loaded once per process rather than once per file.
+    """
+    jobs = resolve_jobs(config["jobs"])
+    logger.info(f"Scanning {len(mp3_files)} files with {jobs} worker processes.")
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_init_worker,
+        initargs=(model_path, bad_words, config),
+    ) as executor:
+        yield from executor.map(_scan_file_in_worker, mp3_files)
+
+
+def rescan_transcript(
+    mp3_path: Path,
+    bad_words: Union[Set[str], CompiledDictionary],
+    match_mode: str = "exact",
+    max_distance: Optional[int] = None,
+) -> FileResult:
+    """Scans the transcript stored next to an MP3 file by a previous run."""
+    timer = StageTimer()
+    transcript_path = mp3_path.with_suffix(".txt")
+    try:
+        with timer.time("read_transcript"):
+            text = transcript_path.read_text(encoding="utf-8")
+    except OSError as e:
+        logger.warning(f"No stored transcript for {mp3_path.name}, skipping: {e}")
+        return FileResult(mp3_path, None, timings=timer)
+    with timer.time("scan"):
+        matches = scan_text(text, bad_words, match_mode, max_distance)
+    return FileResult(mp3_path, matches, timings=timer)
+
+
+def _init_rescan_worker(bad_words: Union[Set[str], CompiledDictionary], config: dict) -> None:
+    global _worker_bad_words, _worker_config
+    setup_logging(config["verbose"], config["log_format"])
+    _worker_bad_words = bad_words
+    _worker_config = config
+
+
+def _rescan_in_worker(mp3_path: Path) -> FileResult:
+    return rescan_transcript(
+        mp3_path, _worker_bad_words, _worker_config["match_mode"], match_distance(_worker_config)
+    )
+
+
+def rescan_transcripts(
+    mp3_files: List[Path], bad_words: Union[Set[str], CompiledDictionary], config: dict
+) -> Iterator[FileResult]:
+    """Re-scans stored transcripts with the current dictionary, yielding results in input order.
+
+    No audio is decoded and no model is loaded. With more than one job the
+    transcripts are read and scanned in a process pool.
+    """
+    if not isinstance(bad_words, CompiledDictionary):
+        bad_words = CompiledDictionary(bad_words)
+    jobs = resolve_jobs(config["jobs"])
+    if jobs == 1:
+        for mp3_path in mp3_files:
+            yield rescan_transcript(
+                mp3_path, bad_words, config["match_mode"], match_distance(config)
+            )
+        return
+    if config["match_mode"] in ("substring", "fuzzy", "phonetic"):
+        # Build the match structures once here instead of once in every worker.
+        bad_words.compile()
+        if config["match_mode"] == "fuzzy":
+            bad_words.deletion_index(config["fuzzy_distance"])
+    logger.info(f"Re-scanning {len(mp3_files)} transcripts with {jobs} worker processes.")
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_init_rescan_worker,
+        initargs=(bad_words, config),
+    ) as executor:
+        yield from executor.map(_rescan_in_worker, mp3_files, chunksize=RESCAN_CHUNKSIZE)
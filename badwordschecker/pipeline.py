@@ -0,0 +1,217 @@
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, DefaultDict, Deque, Dict, Iterator, List, NamedTuple, Optional, Set, Union
+
+from badwordschecker.cache import TranscriptionCache
+from badwordschecker.events import EventWriter
+from badwordschecker.matching import CompiledDictionary
+from badwordschecker.metrics import StageTimer
+from badwordschecker.parallel import FileResult, scan_file
+from badwordschecker.transcription import decode_mp3_to_pcm, estimate_pcm_bytes
+
+logger = logging.getLogger(__name__)
+
+# Results waiting for the I/O thread before the recognizer blocks.
+IO_QUEUE_DEPTH = 32
+
+_STOP = object()
+
+
+class PrefetchedAudio(NamedTuple):
+    """A file prepared by the decode stage."""
+
+    mp3_path: Path
+    pcm: Optional[bytes]  # None when the recognizer stage must decode it itself
+    cache_key: Optional[str]
+    timer: StageTimer  # hashing and decoding so far; the recognizer stage adds to it
+    failed: bool = False  # the file could not be read or decoded
+
+
+def _prefetch(
+    mp3_path: Path, cache: Optional[TranscriptionCache], refresh: bool
+) -> PrefetchedAudio:
+    """Hashes and decodes a file; cached files are not decoded."""
+    timer = StageTimer()
+    cache_key = None
+    if cache is not None:
+        with timer.time("cache"):
+            try:
+                cache_key = cache.key_for(mp3_path)
+            except OSError as e:
+                logger.error(f"Failed to read {mp3_path}: {e}")
+                return PrefetchedAudio(mp3_path, None, None, timer, failed=True)
+            cached = not refresh and cache.contains(cache_key)
+        if cached:
+            return PrefetchedAudio(mp3_path, None, cache_key, timer)
+    with timer.time("decode"):
+        pcm = decode_mp3_to_pcm(mp3_path)
+    return PrefetchedAudio(mp3_path, pcm, cache_key, timer, failed=pcm is None)
+
+
+def _failed_file(audio: PrefetchedAudio, events: Optional[EventWriter]) -> FileResult:
+    """The result of a file the decode stage could not read, without decoding it again."""
+    if events is not None:
+        events.emit("file_start", file=str(audio.mp3_path))
+        events.emit("file_finish", file=str(audio.mp3_path), status="failed", hits=0)
+    return FileResult(audio.mp3_path, None, timings=audio.timer)
+
+
+class _Pending(NamedTuple):
+    """A file queued for the recognizer stage."""
+
+    mp3_path: Path
+    future: Optional[Future]  # None when the file is too large to decode ahead
+    reserved: int  # estimated decoded size, counted until the decode finishes
+
+
+def _held_bytes(pending: Deque[_Pending], current: int) -> int:
+    """Decoded audio held by the current file and by finished or running prefetches.
+
+    Finished prefetches count their actual size; running ones their estimate.
+    """
+    total = current
+    for item in pending:
+        if item.future is not None and item.future.done() and item.future.exception() is None:
+            total += len(item.future.result().pcm or b"")
+        else:
+            total += item.reserved
+    return total
+
+
+def scan_files_pipelined(
+    mp3_files: List[Path],
+    model,
+    bad_words: Union[Set[str], CompiledDictionary],
+    config: dict,
+    cache: Optional[TranscriptionCache] = None,
+    events: Optional[EventWriter] = None,
+    stats: Optional[DefaultDict[str, float]] = None,
+) -> Iterator[FileResult]:
+    """Scans MP3 files one at a time while the next ones are decoded ahead.
+
+    Up to ``prefetch`` files are hashed and decoded by ffmpeg on background
+    threads while the recognizer works on the current file. The current file,
+    the finished prefetches and the estimated size of the running ones stay
+    within ``prefetch_memory_mb`` of decoded audio; a file that would not fit
+    even on its own is streamed by the recognizer stage instead. Time spent in
+    each stage, and waiting on the previous one, is added to ``stats`` in
+    seconds.
+    """
+    stats = stats if stats is not None else defaultdict(float)
+    depth = max(1, config["prefetch"])
+    max_bytes = config["prefetch_memory_mb"] * 1024 * 1024
+    # Spotting bypasses the cache, so there is nothing to look up ahead.
+    prefetch_cache = None if config["spotting"] else cache
+    remaining: Deque[Path] = deque(mp3_files)
+    estimates: Dict[Path, int] = {}
+    pending: Deque[_Pending] = deque()
+
+    with ThreadPoolExecutor(max_workers=depth, thread_name_prefix="decode") as decoder:
+
+        def fill(current: int) -> None:
+            while remaining and len(pending) < depth:
+                mp3_path = remaining[0]
+                if mp3_path not in estimates:
+                    estimates[mp3_path] = estimate_pcm_bytes(mp3_path)
+                estimate = estimates[mp3_path]
+                if estimate > max_bytes:
+                    item = _Pending(mp3_path, None, 0)
+                elif _held_bytes(pending, current) + estimate <= max_bytes:
+                    future = decoder.submit(_prefetch, mp3_path, prefetch_cache, config["refresh"])
+                    item = _Pending(mp3_path, future, estimate)
+                else:
+                    return
+                remaining.popleft()
+                pending.append(item)
+
+        fill(0)
+        while pending:
+            item = pending.popleft()
+            if item.future is None:
+                audio = PrefetchedAudio(item.mp3_path, None, None, StageTimer())
+            else:
+                start = time.perf_counter()
+                audio = item.future.result()
+                stats["wait_for_audio"] += time.perf_counter() - start
+                stats["decode"] += sum(audio.timer.stages.values())
+            fill(len(audio.pcm or b""))
+
+            if audio.failed:
+                result = _failed_file(audio, events)
+            else:
+                start = time.perf_counter()
+                result = scan_file(
+                    audio.mp3_path,
+                    model,
+                    bad_words,
+                    config,
+                    cache,
+                    events,
+                    pcm=audio.pcm,
+                    cache_key=audio.cache_key,
+                    timer=audio.timer,
+                )
+                stats["recognize"] += time.perf_counter() - start
+            del audio
+            fill(0)
+            yield result
+
+
+class IOThread:
+    """Runs a handler over submitted items on a background thread, in order.
+
+    Used for report writing and quarantine moves so the recognizer does not
+    wait on disk I/O. An exception raised by the handler stops further
+    handling and is re-raised by the next ``submit`` or by ``close``.
+    """
+
+    def __init__(
+        self,
+        handler: Callable,
+        depth: int = IO_QUEUE_DEPTH,
+        stats: Optional[DefaultDict[str, float]] = None,
+    ):
+        self.handler = handler
+        self.stats = stats if stats is not None else defaultdict(float)
+        self._queue: queue.Queue = queue.Queue(maxsize=depth)
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="report-io", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            if self._error is not None:
+                continue  # keep draining so submit never blocks forever
+            start = time.perf_counter()
+            try:
+                self.handler(item)
+            except BaseException as e:
+                self._error = e
+            self.stats["io"] += time.perf_counter() - start
+
+    def submit(self, item) -> None:
+        if self._error is not None:
+            raise self._error
+        start = time.perf_counter()
+        self._queue.put(item)
+        self.stats["wait_for_io"] += time.perf_counter() - start
+
+    def close(self) -> None:
+        """Waits for every submitted item to be handled."""
+        self._queue.put(_STOP)
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+
+def format_stage_times(stats: Dict[str, float]) -> str:
+    """Formats per-stage times, e.g. ``decode 12.3s, recognize 456.7s``."""
+    return ", ".join(f"{stage.replace('_', ' ')} {seconds:.1f}s" for stage, seconds in stats.items())
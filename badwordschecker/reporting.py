@@ -1,15 +1,26 @@
+import heapq
 import logging
+import os
+import shutil
+import sqlite3
+import tempfile
 from collections import Counter
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional, Union
 
 logger = logging.getLogger(__name__)
 
+# Word/file pairs kept in memory by WordFileIndex before spilling to disk.
+DEFAULT_MAX_POSTINGS = 200_000
+
 
 def generate_per_file_report(
-    mp3_path: Path, matches: Counter, output_dir: Path
+    mp3_path: Path, matches: Counter, output_dir: Path, truncated: bool = False
 ) -> None:
-    """Generates a report for a single file."""
+    """Generates a report for a single file.
+
+    ``truncated`` marks a scan that stopped early, so the counts are partial.
+    """
     if not matches:
         return
 
@@ -19,49 +30,121 @@ def generate_per_file_report(
     with open(report_path, "w", encoding="utf-8") as f:
         f.write(f"File: {mp3_path.name}\n")
         f.write(f"Total bad words: {sum(matches.values())}\n")
+        if truncated:
+            f.write("Scan truncated: stopped at the first bad words found.\n")
         f.write("--------------------------------\n")
         for word, count in sorted(matches.items()):
             f.write(f"{word}: {count}\n")
     logger.info(f"Generated per-file report for {mp3_path.name} at {report_path}")
 
 
+class WordFileIndex:
+    """Word → files index behind the aggregated report, updated as each file completes.
+
+    Postings are held in memory up to ``max_postings`` and then spilled to a
+    temporary SQLite database, so large libraries do not keep every file's
+    matches in memory until the end of the run.
+    """
+
+    def __init__(self, max_postings: int = DEFAULT_MAX_POSTINGS):
+        self.max_postings = max_postings
+        self.totals: Counter = Counter()
+        self.file_count = 0
+        self._postings: Dict[str, List[str]] = {}
+        self._in_memory = 0
+        self._spill_dir: Optional[str] = None
+        self._db: Optional[sqlite3.Connection] = None
+
+    @classmethod
+    def from_matches(cls, all_matches: Dict[str, Counter]) -> "WordFileIndex":
+        index = cls()
+        for filename, matches in all_matches.items():
+            index.add(filename, matches)
+        return index
+
+    def add(self, filename: str, matches: Counter) -> None:
+        """Adds the matches of one file."""
+        self.file_count += 1
+        self.totals.update(matches)
+        for word in matches:
+            self._postings.setdefault(word, []).append(filename)
+        self._in_memory += len(matches)
+        if self._in_memory > self.max_postings:
+            self._spill()
+
+    def _spill(self) -> None:
+        if self._db is None:
+            self._spill_dir = tempfile.mkdtemp(prefix="badwordschecker-report-")
+            self._db = sqlite3.connect(os.path.join(self._spill_dir, "postings.sqlite"))
+            self._db.execute("CREATE TABLE postings (word TEXT NOT NULL, filename TEXT NOT NULL)")
+        self._db.executemany(
+            "INSERT INTO postings (word, filename) VALUES (?, ?)",
+            ((word, filename) for word, files in self._postings.items() for filename in files),
+        )
+        self._db.commit()
+        logger.debug(f"Spilled {self._in_memory} report postings to {self._spill_dir}")
+        self._postings.clear()
+        self._in_memory = 0
+
+    def files_for(self, word: str) -> Iterator[str]:
+        """Yields the files containing ``word`` in sorted order."""
+        in_memory = sorted(self._postings.get(word, ()))
+        if self._db is None:
+            return iter(in_memory)
+        self._db.execute("CREATE INDEX IF NOT EXISTS postings_word ON postings (word, filename)")
+        # SQLite's binary collation orders UTF-8 like Python orders str.
+        on_disk = (
+            row[0]
+            for row in self._db.execute(
+                "SELECT filename FROM postings WHERE word = ? ORDER BY filename", (word,)
+            )
+        )
+        return heapq.merge(in_memory, on_disk)
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+        if self._spill_dir is not None:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+            self._spill_dir = None
+
+
 def generate_aggregated_report(
-    all_matches: Dict[str, Counter], output_dir: Path, total_files: int
+    all_matches: Union[Dict[str, Counter], WordFileIndex], output_dir: Path, total_files: int
 ) -> None:
-    """Generates an aggregated report of all bad words found."""
+    """Generates an aggregated report of all bad words found.
+
+    ``all_matches`` is either a ``WordFileIndex`` filled while scanning or a
+    mapping of file names to their matches.
+    """
     output_dir.mkdir(exist_ok=True)
     report_path = output_dir / "parolacce.txt"
+    index = all_matches if isinstance(all_matches, WordFileIndex) else WordFileIndex.from_matches(all_matches)
 
-    with open(report_path, "w", encoding="utf-8") as f:
-        f.write("Bad Words Summary\n")
-        f.write("=================\n")
-        f.write(f"Total files scanned: {total_files}\n")
-        f.write(f"Files with bad words: {len(all_matches)}\n\n")
-
-        if not all_matches:
-            f.write("No bad words found.\n")
-            return
-
-        aggregated_counts = Counter()
-        for file_matches in all_matches.values():
-            aggregated_counts.update(file_matches)
-
-        word_to_files: Dict[str, List[str]] = {}
-        for word in aggregated_counts:
-            word_to_files[word] = []
-            for filename, matches in all_matches.items():
-                if word in matches:
-                    word_to_files[word].append(filename)
-
-        # Sort words by frequency (descending) and then alphabetically (ascending)
-        sorted_words = sorted(
-            aggregated_counts.items(), key=lambda item: (-item[1], item[0])
-        )
+    try:
+        with open(report_path, "w", encoding="utf-8") as f:
+            f.write("Bad Words Summary\n")
+            f.write("=================\n")
+            f.write(f"Total files scanned: {total_files}\n")
+            f.write(f"Files with bad words: {index.file_count}\n\n")
+
+            if not index.file_count:
+                f.write("No bad words found.\n")
+                return
+
+            # Sort words by frequency (descending) and then alphabetically (ascending)
+            sorted_words = sorted(
+                index.totals.items(), key=lambda item: (-item[1], item[0])
+            )
 
-        f.write("{:<20} | {:<12} | {}\n".format("Word", "Total Count", "Files"))
-        f.write("-" * 60 + "\n")
-        for word, count in sorted_words:
-            files_str = ", ".join(sorted(word_to_files[word]))
-            f.write(f"{word:<20} | {count:<12} | {files_str}\n")
+            f.write("{:<20} | {:<12} | {}\n".format("Word", "Total Count", "Files"))
+            f.write("-" * 60 + "\n")
+            for word, count in sorted_words:
+                files_str = ", ".join(index.files_for(word))
+                f.write(f"{word:<20} | {count:<12} | {files_str}\n")
+    finally:
+        if index is not all_matches:
+            index.close()
 
     logger.info(f"Generated aggregated report at {report_path}")
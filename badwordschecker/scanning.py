@@ -1,27 +1,76 @@
 from collections import Counter
-from typing import List, Set
+from typing import Optional, Set, Union
 
+from badwordschecker.matching import DEFAULT_FUZZY_DISTANCE, CompiledDictionary
 from badwordschecker.utils.text_normalization import normalize_text, tokenize_text
 
 
 def scan_text(
     text: str,
-    bad_words: Set[str],
+    bad_words: Union[Set[str], CompiledDictionary],
     match_mode: str = "exact",
+    max_distance: Optional[int] = None,
 ) -> Counter:
-    """Scans text for bad words and returns a counter of matches."""
+    """Scans text for bad words and returns a counter of matches.
+
+    Pass a ``CompiledDictionary`` to reuse its match structures across calls.
+    In ``fuzzy`` mode a token matches the closest dictionary word at most
+    ``max_distance`` edits away (``DEFAULT_FUZZY_DISTANCE`` when None), and
+    the hit is counted under that word; short tokens get fewer edits, see
+    ``matching.allowed_edits``.
+    In ``phonetic`` mode a token matches a dictionary word with the same
+    Italian phonetic key, e.g. ``kazzo`` matches ``cazzo``; with
+    ``max_distance``, only if it is also at most that many edits away.
+    In ``stem`` mode a token matches when its Italian stem is the stem of a
+    dictionary word, and the hit is counted under that word.
+    Regex entries match whole tokens in every mode and are counted under
+    the entry itself. Multi-word entries match the exact token sequence in
+    every mode and are counted under the phrase.
+    """
+    if not isinstance(bad_words, CompiledDictionary):
+        bad_words = CompiledDictionary(bad_words)
+
     normalized_text = normalize_text(text)
     tokens = tokenize_text(normalized_text)
-    matches = Counter()
+    matches: Counter = Counter()
 
     if match_mode == "exact":
         for token in tokens:
-            if token in bad_words:
+            if token in bad_words.words:
                 matches[token] += 1
     elif match_mode == "substring":
-        for bad_word in bad_words:
-            for token in tokens:
-                if bad_word in token:
-                    matches[bad_word] += 1
+        # Each bad word counts once per token containing it, so every distinct
+        # token only needs to go through the automaton once.
+        automaton = bad_words.automaton
+        for token, count in Counter(tokens).items():
+            for bad_word in automaton.find_all(token):
+                matches[bad_word] += count
+    elif match_mode == "stem":
+        for token, count in Counter(tokens).items():
+            hit = bad_words.stem_match(token)
+            if hit is not None:
+                matches[hit] += count
+    elif match_mode == "fuzzy":
+        distance = DEFAULT_FUZZY_DISTANCE if max_distance is None else max_distance
+        for token, count in Counter(tokens).items():
+            hit = bad_words.fuzzy_match(token, distance)
+            if hit is not None:
+                matches[hit] += count
+    elif match_mode == "phonetic":
+        for token, count in Counter(tokens).items():
+            hit = bad_words.phonetic_match(token, max_distance)
+            if hit is not None:
+                matches[hit] += count
 
+    for _, _, phrase in bad_words.match_phrases(tokens):
+        matches[phrase] += 1
+    if bad_words.patterns:
+        matches.update(bad_words.match_patterns(tokens))
     return matches
+
+
+def match_distance(config: dict) -> Optional[int]:
+    """The ``max_distance`` to scan with for the configured match mode."""
+    if config["match_mode"] == "phonetic":
+        return config["phonetic_distance"]
+    return config["fuzzy_distance"]
@@ -0,0 +1,295 @@
+import argparse
+import json
+import logging
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional, cast
+
+from badwordschecker.model_manager import get_model_path, handle_model_download, load_model
+from badwordschecker.utils.logging import setup_logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET_PATH = Path.home() / ".config" / "BadWordsChecker" / "server.sock"
+DEFAULT_MAX_JOBS = 2
+DEFAULT_MAX_QUEUE = 16
+
+# Configuration values holding paths. The client makes them absolute, since
+# the daemon does not share its working directory.
+PATH_KEYS = (
+    "mp3_folders",
+    "dict",
+    "quarantine",
+    "events_path",
+    "metrics_path",
+    "prometheus_textfile",
+    "model_path",
+    "cache_path",
+)
+
+
+class ScanServer(socketserver.ThreadingUnixStreamServer):
+    """Serves scan jobs over a Unix socket with one Vosk model kept in memory.
+
+    Each request is a single JSON line answered by a single JSON line:
+    ``{"op": "scan", "config": {...}}`` runs a scan and answers once it is
+    done, ``{"op": "health"}`` returns the daemon's state and counters. Up to
+    ``max_jobs`` scans run at once, each on its own thread with its own
+    recognizers over the shared model; up to ``max_queue`` more wait for a
+    free slot and further jobs are rejected. Jobs writing to the same output
+    directory run one after the other, as they share its checkpoint and
+    reports.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: Path, model, model_path: Path, max_jobs: int, max_queue: int):
+        self.model = model
+        self.model_path = Path(model_path).resolve()
+        self.max_jobs = max_jobs
+        self.max_queue = max_queue
+        self.started = time.time()
+        self.stats: Counter = Counter()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_jobs, thread_name_prefix="scan-job")
+        self._output_locks: Dict[Path, threading.Lock] = {}
+        # Create the socket owner-only; a chmod after binding leaves a window open.
+        old_umask = os.umask(0o177)
+        try:
+            super().__init__(str(socket_path), _RequestHandler)
+        finally:
+            os.umask(old_umask)
+
+    def health(self) -> dict:
+        with self._lock:
+            return {
+                "status": "ok",
+                "pid": os.getpid(),
+                "model_path": str(self.model_path),
+                "uptime": round(time.time() - self.started, 1),
+                "max_jobs": self.max_jobs,
+                "max_queue": self.max_queue,
+                **{
+                    key: self.stats[key]
+                    for key in ("running", "queued", "completed", "failed", "rejected", "files_scanned")
+                },
+            }
+
+    def submit(self, config: dict) -> dict:
+        """Runs a scan job once a slot is free and returns its outcome.
+
+        Jobs that do not name a model use the resident one.
+        """
+        if config.get("model_path") is None:
+            config = {**config, "model_path": str(self.model_path)}
+        elif not config.get("rescan_transcripts"):
+            job_model_path = Path(get_model_path(config["model_path"])).resolve()
+            if job_model_path != self.model_path:
+                return {
+                    "status": "error",
+                    "exit_code": 1,
+                    "error": f"The daemon serves the model at {self.model_path}, not {job_model_path}.",
+                }
+        with self._lock:
+            if self.stats["running"] + self.stats["queued"] >= self.max_jobs + self.max_queue:
+                self.stats["rejected"] += 1
+                return {"status": "rejected", "exit_code": 1, "error": "The job queue is full."}
+            self.stats["queued"] += 1
+        return self._executor.submit(self._run_job, config).result()
+
+    def _run_job(self, config: dict) -> dict:
+        # Imported here because the CLI imports this module.
+        from badwordschecker.cli import run_scan
+
+        with self._lock:
+            self.stats["queued"] -= 1
+            self.stats["running"] += 1
+        # The resident model is only used in this process, so jobs scan serially.
+        config = {**config, "jobs": 1}
+        output_dir = Path(config.get("output_dir") or "parolacce").resolve()
+        folders = ", ".join(config["mp3_folders"])
+        logger.info(f"Scanning {folders}")
+        try:
+            with self._output_lock(output_dir):
+                summary = run_scan(config, output_dir, model=self.model)
+            result = {"status": "done", "exit_code": 0, **summary}
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else 1
+            result = {"status": "done" if code == 0 else "failed", "exit_code": code}
+        except Exception as e:
+            logger.error(f"Scan of {folders} failed: {e}", exc_info=True)
+            result = {"status": "failed", "exit_code": 1, "error": str(e)}
+
+        with self._lock:
+            self.stats["running"] -= 1
+            self.stats["completed" if result["exit_code"] == 0 else "failed"] += 1
+            self.stats["files_scanned"] += result.get("files", 0)
+        return result
+
+    def _output_lock(self, output_dir: Path) -> threading.Lock:
+        with self._lock:
+            return self._output_locks.setdefault(output_dir, threading.Lock())
+
+    def server_close(self) -> None:
+        super().server_close()
+        self._executor.shutdown(wait=True)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        server = cast(ScanServer, self.server)
+        response: Dict[str, object]
+        try:
+            request = json.loads(self.rfile.readline())
+        except ValueError:
+            response = {"status": "error", "error": "Invalid request."}
+        else:
+            op = request.get("op") if isinstance(request, dict) else None
+            if op == "health":
+                response = server.health()
+            elif op == "scan":
+                config = request.get("config")
+                if isinstance(config, dict) and isinstance(config.get("mp3_folders"), list):
+                    response = server.submit(config)
+                else:
+                    response = {
+                        "status": "error",
+                        "exit_code": 1,
+                        "error": "A scan request needs a config with mp3_folders.",
+                    }
+            else:
+                response = {"status": "error", "error": f"Unknown operation {op!r}."}
+        self.wfile.write((json.dumps(response) + "\n").encode("utf-8"))
+
+
+def send_request(socket_path: Path, payload: dict) -> dict:
+    """Sends one request to the daemon and waits for its answer."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(str(socket_path))
+        sock.sendall((json.dumps(payload, default=str) + "\n").encode("utf-8"))
+        with sock.makefile("rb") as f:
+            line = f.readline()
+    if not line:
+        raise ConnectionError("The daemon closed the connection without answering.")
+    return json.loads(line)
+
+
+def submit_scan(config: dict, socket_path: Path) -> int:
+    """Runs a scan on the daemon and returns the exit code of the job."""
+    job = dict(config)
+    for key in PATH_KEYS:
+        value = job.get(key)
+        if isinstance(value, list):
+            job[key] = [str(Path(item).expanduser().resolve()) for item in value]
+        elif value is not None:
+            job[key] = str(Path(value).expanduser().resolve())
+    job["output_dir"] = str(Path("parolacce").resolve())
+
+    logger.info(f"Sending scan of {', '.join(job['mp3_folders'])} to the daemon at {socket_path}")
+    try:
+        response = send_request(socket_path, {"op": "scan", "config": job})
+    except (OSError, ValueError) as e:
+        logger.error(f"Cannot reach the BadWordsChecker daemon at {socket_path}: {e}")
+        return 1
+
+    if response.get("exit_code") == 0:
+        if "files" in response:
+            logger.info(
+                f"Scanned {response['files']} files, {response['files_with_bad_words']} with bad "
+                f"words. Report: {response['report']}"
+            )
+    else:
+        logger.error(f"Scan failed on the daemon: {response.get('error', response.get('status'))}")
+    return response.get("exit_code", 1)
+
+
+def _socket_in_use(socket_path: Path) -> bool:
+    try:
+        send_request(socket_path, {"op": "health"})
+        return True
+    except (OSError, ValueError):
+        return False
+
+
+def create_serve_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="badwordschecker serve",
+        description="Keep the Vosk model loaded and serve scan jobs over a Unix socket.",
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+    parser.add_argument(
+        "--socket",
+        type=Path,
+        default=DEFAULT_SOCKET_PATH,
+        help=f"Unix socket to listen on (default: {DEFAULT_SOCKET_PATH}).",
+    )
+    parser.add_argument("--model-path", type=Path, help="Path to the Vosk model directory.")
+    parser.add_argument(
+        "--max-jobs",
+        type=int,
+        default=DEFAULT_MAX_JOBS,
+        help=f"Scans running at the same time (default: {DEFAULT_MAX_JOBS}).",
+    )
+    parser.add_argument(
+        "--max-queue",
+        type=int,
+        default=DEFAULT_MAX_QUEUE,
+        help=f"Scans waiting for a free slot before new ones are rejected (default: {DEFAULT_MAX_QUEUE}).",
+    )
+    parser.add_argument(
+        "--status",
+        action="store_true",
+        help="Print the health and counters of the running daemon and exit.",
+    )
+    parser.add_argument("--verbose", action="store_true", help="Enable verbose logging.")
+    parser.add_argument(
+        "--log-format", choices=["text", "json"], default="text", help="Set the log format."
+    )
+    return parser
+
+
+def serve_main(argv: Optional[list] = None) -> None:
+    """Entry point of ``badwordschecker serve``."""
+    args = create_serve_parser().parse_args(argv)
+    setup_logging(args.verbose, args.log_format)
+    socket_path = args.socket.expanduser()
+
+    if args.status:
+        try:
+            print(json.dumps(send_request(socket_path, {"op": "health"}), indent=2))
+        except (OSError, ValueError) as e:
+            logger.error(f"No BadWordsChecker daemon at {socket_path}: {e}")
+            sys.exit(1)
+        return
+
+    if socket_path.exists():
+        if _socket_in_use(socket_path):
+            logger.error(f"A daemon is already listening on {socket_path}")
+            sys.exit(1)
+        socket_path.unlink()  # left behind by a daemon that did not shut down cleanly
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+
+    model_path = Path(get_model_path(args.model_path))
+    handle_model_download(model_path)
+    try:
+        model = load_model(model_path, args.verbose)
+    except Exception as e:
+        logger.error(f"Failed to load Vosk model: {e}")
+        sys.exit(1)
+
+    server = ScanServer(socket_path, model, model_path, max(1, args.max_jobs), max(0, args.max_queue))
+    logger.info(f"Serving scans on {socket_path} with the model at {model_path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down.")
+    finally:
+        server.server_close()
+        socket_path.unlink(missing_ok=True)
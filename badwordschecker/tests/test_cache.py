@@ -0,0 +1,83 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from badwordschecker.cache import TranscriptionCache, model_identity
+
+
+class TestTranscriptionCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.cache = TranscriptionCache(self.temp_dir / "cache.sqlite", "model-a", 1024 * 1024)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.temp_dir)
+
+    def _write_mp3(self, name: str, content: bytes) -> Path:
+        path = self.temp_dir / name
+        path.write_bytes(content)
+        return path
+
+    def test_put_and_get(self):
+        segments = [{"text": "ciao", "result": [{"word": "ciao", "start": 0.1, "end": 0.5, "conf": 1.0}]}]
+        key = self.cache.key_for(self._write_mp3("a.mp3", b"audio"))
+        self.assertIsNone(self.cache.get(key))
+        self.cache.put(key, segments)
+        self.assertEqual(self.cache.get(key), segments)
+
+    def test_key_depends_on_content_and_model(self):
+        first = self._write_mp3("a.mp3", b"audio")
+        renamed_copy = self._write_mp3("b.mp3", b"audio")
+        changed = self._write_mp3("c.mp3", b"other audio")
+        self.assertEqual(self.cache.key_for(first), self.cache.key_for(renamed_copy))
+        self.assertNotEqual(self.cache.key_for(first), self.cache.key_for(changed))
+
+        other_model = TranscriptionCache(self.temp_dir / "cache.sqlite", "model-b", 1024)
+        self.assertNotEqual(self.cache.key_for(first), other_model.key_for(first))
+        other_model.close()
+
+    def test_lru_eviction(self):
+        # Incompressible text keeps each entry at a predictable size.
+        self.cache.max_bytes = 1500
+        texts = {name: os.urandom(600).hex() for name in ("a", "b", "c")}
+        self.cache.put("a", [{"text": texts["a"]}])
+        self.cache.put("b", [{"text": texts["b"]}])
+        self.cache.get("a")  # "b" is now the least recently used entry
+        self.cache.put("c", [{"text": texts["c"]}])
+
+        self.assertIsNotNone(self.cache.get("a"))
+        self.assertIsNone(self.cache.get("b"))
+        self.assertIsNotNone(self.cache.get("c"))
+
+    def test_from_config_disabled(self):
+        config = {"no_cache": True}
+        self.assertIsNone(TranscriptionCache.from_config(config, Path("model")))
+
+    def test_from_config_keys_on_vad_threshold(self):
+        config = {
+            "no_cache": False,
+            "cache_path": self.temp_dir / "vad.sqlite",
+            "cache_max_mb": 1,
+            "vad": False,
+            "vad_threshold_db": -45.0,
+        }
+        mp3_path = self.temp_dir / "a.mp3"
+        mp3_path.write_bytes(b"audio")
+        keys = []
+        for vad, threshold in ((False, -45.0), (True, -45.0), (True, -30.0)):
+            config.update(vad=vad, vad_threshold_db=threshold)
+            cache = TranscriptionCache.from_config(config, Path("model"))
+            assert cache is not None
+            keys.append(cache.key_for(mp3_path))
+            cache.close()
+        self.assertEqual(len(set(keys)), 3)
+
+    def test_model_identity_includes_path(self):
+        self.assertIn(str(Path("model").resolve()), model_identity(Path("model")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import shutil
+import tempfile
+import unittest
+from collections import Counter
+from pathlib import Path
+
+from badwordschecker.checkpoint import CheckpointJournal
+
+
+class TestCheckpointJournal(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.output_dir = self.temp_dir / "parolacce"
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_resume_returns_completed_files(self):
+        journal = CheckpointJournal(self.output_dir)
+        journal.record(self.temp_dir / "a.mp3", Counter({"cazzo": 2}))
+        journal.record(self.temp_dir / "b.mp3", Counter())
+        journal.record(self.temp_dir / "c.mp3", None)  # failed, retried on resume
+        journal.close()
+
+        resumed = CheckpointJournal(self.output_dir, resume=True)
+        completed = resumed.completed()
+        resumed.close()
+        self.assertEqual(
+            completed,
+            {
+                CheckpointJournal.key(self.temp_dir / "a.mp3"): Counter({"cazzo": 2}),
+                CheckpointJournal.key(self.temp_dir / "b.mp3"): Counter(),
+            },
+        )
+
+    def test_fresh_run_clears_journal(self):
+        journal = CheckpointJournal(self.output_dir)
+        journal.record(self.temp_dir / "a.mp3", Counter({"cazzo": 1}))
+        journal.close()
+
+        fresh = CheckpointJournal(self.output_dir)
+        self.assertEqual(fresh.completed(), {})
+        fresh.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
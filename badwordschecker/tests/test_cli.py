@@ -1,10 +1,13 @@
+import json
 import unittest
 from unittest.mock import patch, MagicMock
 from pathlib import Path
 import tempfile
 import shutil
 
-from badwordschecker.cli import main
+from badwordschecker.cli import collect_roots, create_parser, main, run_scan
+from badwordschecker.server import DEFAULT_SOCKET_PATH
+from badwordschecker.utils.config import get_config
 
 class TestCli(unittest.TestCase):
     def setUp(self):
@@ -43,3 +46,87 @@ class TestCli(unittest.TestCase):
         # but this confirms that the CWD is being used.
         with self.assertRaises(SystemExit):
             main()
+
+    @patch("badwordschecker.cli.submit_scan", return_value=0)
+    def test_server_flag_keeps_folder(self, mock_submit):
+        with patch("sys.argv", ["badwordschecker", "--server", self.temp_dir]):
+            with self.assertRaises(SystemExit) as cm:
+                main()
+        self.assertEqual(cm.exception.code, 0)
+        config, socket_path = mock_submit.call_args.args
+        self.assertEqual(config["mp3_folders"], [Path(self.temp_dir)])
+        self.assertEqual(socket_path, DEFAULT_SOCKET_PATH)
+
+    def test_first_hit_takes_a_count_before_folders(self):
+        args = create_parser().parse_args(["--first-hit", "1", self.temp_dir])
+        config = get_config(args)
+        self.assertEqual(config["first_hit"], 1)
+        self.assertEqual(config["mp3_folders"], [Path(self.temp_dir)])
+
+    def test_multiple_roots(self):
+        temp_dir = Path(self.temp_dir)
+        for name, text in (("a", "che cazzo"), ("b", "merda e cazzo")):
+            root = temp_dir / name
+            root.mkdir()
+            (root / f"{name}.mp3").touch()
+            (root / f"{name}.txt").write_text(text, encoding="utf-8")
+        (temp_dir / "dict.txt").write_text("cazzo\nmerda\n", encoding="utf-8")
+        (temp_dir / "roots.txt").write_text(
+            f"# extra roots\n  # {temp_dir / 'c'}\n{temp_dir / 'b'}\n{temp_dir / 'a' / '..' / 'a'}\n",
+            encoding="utf-8",
+        )
+
+        args = create_parser().parse_args(
+            [
+                str(temp_dir / "a"),
+                "--roots-file",
+                str(temp_dir / "roots.txt"),
+                "--dict",
+                str(temp_dir / "dict.txt"),
+                "--rescan-transcripts",
+            ]
+        )
+        config = get_config(args)
+        config["mp3_folders"] = collect_roots(config)
+        self.assertEqual(config["mp3_folders"], [temp_dir / "a", temp_dir / "b"])
+
+        output_dir = temp_dir / "parolacce"
+        summary = run_scan(config, output_dir)
+
+        self.assertEqual((summary["files"], summary["files_with_bad_words"]), (2, 2))
+        self.assertTrue((output_dir / "a" / "a.mp3.txt").exists())
+        self.assertIn("merda", (output_dir / "b" / "parolacce.txt").read_text(encoding="utf-8"))
+        combined = (output_dir / "parolacce.txt").read_text(encoding="utf-8")
+        self.assertIn("cazzo                | 2            | a/a.mp3, b/b.mp3", combined)
+        metrics = json.loads((output_dir / "metrics.json").read_text(encoding="utf-8"))
+        self.assertEqual(metrics["files"], 2)
+        self.assertIn("scan", metrics["stages"])
+
+    def test_nested_roots_scan_each_file_once(self):
+        temp_dir = Path(self.temp_dir)
+        inner = temp_dir / "outer" / "inner"
+        inner.mkdir(parents=True)
+        for folder, text in ((temp_dir / "outer", "che cazzo"), (inner, "cazzo")):
+            (folder / f"{folder.name}.mp3").touch()
+            (folder / f"{folder.name}.txt").write_text(text, encoding="utf-8")
+        (temp_dir / "dict.txt").write_text("cazzo\n", encoding="utf-8")
+
+        args = create_parser().parse_args(
+            [
+                str(temp_dir / "outer"),
+                str(inner),
+                "--recursive",
+                "--dict",
+                str(temp_dir / "dict.txt"),
+                "--rescan-transcripts",
+            ]
+        )
+        config = get_config(args)
+        config["mp3_folders"] = collect_roots(config)
+        summary = run_scan(config, temp_dir / "parolacce")
+
+        self.assertEqual((summary["files"], summary["files_with_bad_words"]), (2, 2))
+        combined = (temp_dir / "parolacce" / "parolacce.txt").read_text(encoding="utf-8")
+        # The inner file belongs to the first root that reaches it.
+        self.assertIn("outer/inner.mp3", combined)
+        self.assertNotIn("inner/inner.mp3", combined)
@@ -1,8 +1,17 @@
+import os
+import shutil
+import tempfile
 import unittest
 from pathlib import Path
 from unittest.mock import patch, mock_open
 
-from badwordschecker.dictionary import load_bad_words, download_dictionary
+from badwordschecker.dictionary import (
+    compiled_dictionary_path,
+    download_dictionary,
+    load_bad_words,
+    load_dictionary,
+)
+from badwordschecker.matching import CompiledDictionary
 
 
 class TestDictionary(unittest.TestCase):
@@ -13,6 +22,31 @@ class TestDictionary(unittest.TestCase):
                 words = load_bad_words(Path("dummy_path"))
                 self.assertEqual(words, {"word1", "word2", "word3"})
 
+    def test_load_bad_words_normalizes_entries(self):
+        m = mock_open(read_data="Caffè\nporca  Miseria\n")
+        with patch("builtins.open", m):
+            with patch("pathlib.Path.exists", return_value=True):
+                words = load_bad_words(Path("dummy_path"))
+                self.assertEqual(words, {"caffe", "porca miseria"})
+
+    def test_load_bad_words_keeps_patterns(self):
+        m = mock_open(read_data="re:Stronz[oaie]\nre: vaff.*\nre:cazz(\nre:perch[eé]\nMerda\n")
+        with patch("builtins.open", m):
+            with patch("pathlib.Path.exists", return_value=True):
+                words = load_bad_words(Path("dummy_path"))
+                self.assertEqual(words, {"re:Stronz[oaie]", "re:vaff.*", "re:perch[ee]", "merda"})
+        matches = CompiledDictionary(words).match_patterns(["stronzi", "perche"])
+        self.assertEqual(matches, {"re:Stronz[oaie]": 1, "re:perch[ee]": 1})
+
+    def test_load_bad_words_skips_uncombinable_patterns(self):
+        # Global flags, backreferences and named groups break the combined pattern.
+        m = mock_open(read_data="re:(?i)foo\nre:(a)\\1\nre:(?P<p0>x)\nre:(?i:bar)\n")
+        with patch("builtins.open", m):
+            with patch("pathlib.Path.exists", return_value=True):
+                words = load_bad_words(Path("dummy_path"))
+        self.assertEqual(words, {"re:(?i:bar)"})
+        CompiledDictionary(words).compile()
+
     def test_load_bad_words_empty(self):
         m = mock_open(read_data="")
         with patch("builtins.open", m):
@@ -35,5 +69,36 @@ class TestDictionary(unittest.TestCase):
             mock_write_text.assert_called_once_with("word1\nword2", encoding="utf-8")
 
 
+class TestCompiledDictionary(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.dict_path = self.temp_dir / "badwords.txt"
+        self.dict_path.write_text("cazzo\nporca miseria\n", encoding="utf-8")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_load_dictionary_builds_artifact(self):
+        dictionary = load_dictionary(self.dict_path)
+        self.assertEqual(dictionary.words, {"cazzo"})
+        self.assertEqual(dictionary.phrases, {("porca", "miseria")})
+        self.assertTrue(compiled_dictionary_path(self.dict_path).exists())
+
+    def test_load_dictionary_reuses_artifact(self):
+        load_dictionary(self.dict_path)
+        with patch("badwordschecker.dictionary.load_bad_words") as mock_load:
+            dictionary = load_dictionary(self.dict_path)
+            mock_load.assert_not_called()
+        self.assertEqual(dictionary.words, {"cazzo"})
+
+    def test_load_dictionary_rebuilds_when_source_changes(self):
+        load_dictionary(self.dict_path)
+        self.dict_path.write_text("merda\n", encoding="utf-8")
+        stat = self.dict_path.stat()
+        os.utime(self.dict_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        dictionary = load_dictionary(self.dict_path)
+        self.assertEqual(dictionary.words, {"merda"})
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,81 @@
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from badwordschecker.events import EventWriter, find_segment_hits
+from badwordschecker.matching import CompiledDictionary
+
+
+class TestEvents(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.events_path = self.temp_dir / "events.jsonl"
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _read_events(self):
+        with open(self.events_path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def test_emit_appends_json_lines(self):
+        writer = EventWriter(self.events_path)
+        writer.emit("file_start", file="a.mp3")
+        writer.emit("hit", file="a.mp3", word="cazzo", start=1.5)
+        writer.close()
+
+        events = self._read_events()
+        self.assertEqual([e["event"] for e in events], ["file_start", "hit"])
+        self.assertEqual(events[1]["start"], 1.5)
+
+    def test_truncate_starts_fresh_file(self):
+        self.events_path.write_text('{"event": "old"}\n', encoding="utf-8")
+        writer = EventWriter(self.events_path, truncate=True)
+        writer.emit("file_start", file="a.mp3")
+        writer.close()
+        self.assertEqual([e["event"] for e in self._read_events()], ["file_start"])
+
+    def test_from_config_disabled(self):
+        self.assertIsNone(EventWriter.from_config({"events": None}))
+
+    def test_find_segment_hits(self):
+        bad_words = CompiledDictionary({"cazzo"})
+        segment = {
+            "text": "che cazzo",
+            "result": [
+                {"word": "che", "start": 0.0, "end": 0.2, "conf": 1.0},
+                {"word": "cazzo", "start": 0.2, "end": 0.6, "conf": 0.9},
+            ],
+        }
+        hits = list(find_segment_hits(segment, bad_words, "exact"))
+        self.assertEqual(hits, [("cazzo", segment["result"][1])])
+
+    def test_find_segment_hits_phrase(self):
+        bad_words = CompiledDictionary({"porca miseria", "merda"})
+        segment = {
+            "text": "porca miseria che merda",
+            "result": [
+                {"word": "porca", "start": 0.0, "end": 0.3, "conf": 0.8},
+                {"word": "miseria", "start": 0.3, "end": 0.8, "conf": 0.95},
+                {"word": "che", "start": 0.8, "end": 0.9, "conf": 1.0},
+                {"word": "merda", "start": 0.9, "end": 1.2, "conf": 1.0},
+            ],
+        }
+        hits = list(find_segment_hits(segment, bad_words, "exact"))
+        self.assertEqual(
+            hits,
+            [
+                ("merda", segment["result"][3]),
+                ("porca miseria", {"word": "porca miseria", "start": 0.0, "end": 0.8, "conf": 0.8}),
+            ],
+        )
+
+    def test_find_segment_hits_without_timings(self):
+        hits = list(find_segment_hits({"text": "cazzo cazzo"}, CompiledDictionary({"cazzo"}), "exact"))
+        self.assertEqual(hits, [("cazzo", None), ("cazzo", None)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import json
+import random
+import re
+import unittest
+
+from badwordschecker.matching import (
+    AhoCorasick,
+    CompiledDictionary,
+    DeletionIndex,
+    allowed_edits,
+    check_pattern,
+    levenshtein,
+)
+
+
+class TestAhoCorasick(unittest.TestCase):
+    def test_find_all(self):
+        automaton = AhoCorasick({"he", "she", "his", "hers"})
+        self.assertEqual(automaton.find_all("ushers"), {"he", "she", "hers"})
+        self.assertEqual(automaton.find_all("this"), {"his"})
+        self.assertEqual(automaton.find_all("xyz"), set())
+
+    def test_matches_naive_search(self):
+        rng = random.Random(42)
+        patterns = {"".join(rng.choices("abc", k=rng.randint(1, 4))) for _ in range(30)}
+        automaton = AhoCorasick(patterns)
+        for _ in range(200):
+            text = "".join(rng.choices("abc", k=rng.randint(0, 12)))
+            self.assertEqual(automaton.find_all(text), {p for p in patterns if p in text})
+
+
+class TestDeletionIndex(unittest.TestCase):
+    def test_levenshtein(self):
+        self.assertEqual(levenshtein("cazzo", "cazzo"), 0)
+        self.assertEqual(levenshtein("cazzo", "cazo"), 1)
+        self.assertEqual(levenshtein("stronzo", "strunso"), 2)
+        self.assertEqual(levenshtein("stronzo", "merda", max_distance=2), 3)
+
+    def test_matches_naive_search(self):
+        rng = random.Random(42)
+        words = {"".join(rng.choices("abcd", k=rng.randint(1, 6))) for _ in range(100)}
+        index = DeletionIndex(words, 2)
+        for _ in range(100):
+            query = "".join(rng.choices("abcd", k=rng.randint(1, 6)))
+            expected = sorted((levenshtein(query, w), w) for w in words if levenshtein(query, w) <= 2)
+            self.assertEqual(index.search(query, 2), expected)
+            self.assertEqual(index.search(query, 1), [(d, w) for d, w in expected if d <= 1])
+
+
+class TestCompiledDictionary(unittest.TestCase):
+    def test_set_like(self):
+        dictionary = CompiledDictionary({"cazzo", "merda"})
+        self.assertEqual(len(dictionary), 2)
+        self.assertIn("cazzo", dictionary)
+        self.assertFalse(CompiledDictionary(set()))
+
+    def test_fuzzy_match(self):
+        dictionary = CompiledDictionary({"cazzo", "merda", "stronzo", "coglione"})
+        self.assertEqual(dictionary.fuzzy_match("stronso"), "stronzo")
+        self.assertEqual(dictionary.fuzzy_match("coglone"), "coglione")
+        self.assertIsNone(dictionary.fuzzy_match("mela"))
+        # Five letters or fewer only match exactly: pazzo is not cazzo.
+        self.assertIsNone(dictionary.fuzzy_match("pazzo"))
+        self.assertIsNone(dictionary.fuzzy_match("cazo"))
+        self.assertEqual(dictionary.fuzzy_match("cazzo"), "cazzo")
+        # Two edits need nine letters.
+        self.assertIsNone(dictionary.fuzzy_match("strunso", max_distance=2))
+        self.assertEqual(dictionary.fuzzy_match("cojjglione", max_distance=2), "coglione")
+
+    def test_allowed_edits(self):
+        lengths = range(1, 14)
+        self.assertEqual(
+            [allowed_edits(n, 3) for n in lengths], [0, 0, 0, 0, 0, 1, 1, 1, 2, 2, 2, 3, 3]
+        )
+        self.assertEqual(allowed_edits(12, 1), 1)
+
+    def test_phonetic_match(self):
+        dictionary = CompiledDictionary({"cazzo", "gazzo", "minchia", "merda"})
+        self.assertEqual(dictionary.phonetic_index["KAZO"], ("cazzo",))
+        self.assertEqual(dictionary.phonetic_match("merda"), "merda")
+        self.assertEqual(dictionary.phonetic_match("kazo"), "cazzo")
+        self.assertEqual(dictionary.phonetic_match("minkia"), "minchia")
+        self.assertIsNone(dictionary.phonetic_match("mela"))
+        self.assertIsNone(dictionary.phonetic_match("minkiaa", max_distance=1))
+        self.assertEqual(dictionary.phonetic_match("minkia", max_distance=2), "minchia")
+
+    def test_match_phrases(self):
+        dictionary = CompiledDictionary({"porca", "porca miseria", "porca miseria ladra", "porca vacca"})
+        tokens = "porca miseria porca vacca porca miseria ladra porca".split()
+        self.assertEqual(
+            list(dictionary.match_phrases(tokens)),
+            [(0, 2, "porca miseria"), (2, 4, "porca vacca"), (4, 6, "porca miseria"), (4, 7, "porca miseria ladra")],
+        )
+        self.assertEqual(list(CompiledDictionary({"porca"}).match_phrases(tokens)), [])
+
+    def test_match_patterns(self):
+        dictionary = CompiledDictionary({"re:stronz.*", "re:stronzo", "re:vaff.*"})
+        matches = dictionary.match_patterns(["stronzo", "stronzo", "vaffa", "vaff", "avaff"])
+        # Each token counts for the first pattern matching it as a whole.
+        self.assertEqual(matches, {"re:stronz.*": 2, "re:vaff.*": 2})
+        self.assertEqual(dictionary.match_patterns([]), {})
+
+    def test_match_patterns_ignore_case(self):
+        dictionary = CompiledDictionary({"re:Vaff.*"})
+        self.assertEqual(dictionary.match_patterns(["vaffa"]), {"re:Vaff.*": 1})
+
+    def test_match_patterns_never_span_tokens(self):
+        dictionary = CompiledDictionary({"re:a\\s*b", "re:(x)y"})
+        self.assertEqual(dictionary.match_patterns(["a", "b", "xy"]), {"re:(x)y": 1})
+        matches = dictionary.match_patterns(["a", "b"])
+        self.assertEqual(matches, {})
+        self.assertFalse(matches)
+
+    def test_check_pattern(self):
+        for pattern in ("(?i)foo", "(a)\\1", "(?P<p0>x)", "(a)(?(1)b|c)", "cazz("):
+            with self.assertRaises(re.error, msg=pattern):
+                check_pattern(pattern)
+        for pattern in ("stronz[oaie]", "(?i:foo)", "a\\s*b", "\\\\1"):
+            check_pattern(pattern)
+
+    def test_spotting_grammar(self):
+        dictionary = CompiledDictionary({"merda", "porca miseria", "re:vaff.*"})
+        self.assertEqual(
+            json.loads(dictionary.spotting_grammar), ["merda", "porca miseria", "[unk]"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
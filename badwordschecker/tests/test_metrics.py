@@ -0,0 +1,61 @@
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from badwordschecker.metrics import RunMetrics, StageTimer, percentile
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _timer(self, decode, recognize, audio):
+        timer = StageTimer()
+        timer.add("decode", decode)
+        timer.add("recognize", recognize)
+        timer.add_audio(audio)
+        return timer
+
+    def test_percentile(self):
+        self.assertEqual(percentile([3.0, 1.0, 2.0], 50), 2.0)
+        self.assertEqual(percentile([1.0, 2.0], 90), 1.9)
+        self.assertEqual(percentile([5.0], 99), 5.0)
+
+    def test_summary(self):
+        metrics = RunMetrics()
+        metrics.add(Path("a.mp3"), self._timer(1.0, 9.0, 100.0))
+        metrics.add(Path("b.mp3"), self._timer(1.0, 29.0, 100.0))
+        metrics.add(Path("c.mp3"), None, failed=True)
+        metrics.pipeline["wait_for_audio"] += 0.5
+
+        summary = metrics.summary()
+        self.assertEqual((summary["files"], summary["failed"]), (3, 1))
+        self.assertEqual(summary["audio_seconds"], 200.0)
+        self.assertEqual(summary["rtf"], 0.2)
+        self.assertEqual(summary["stages"]["recognize"]["total"], 38.0)
+        self.assertEqual(summary["stages"]["recognize"]["max"], 29.0)
+        self.assertEqual(summary["file_rtf"]["p50"], 0.2)
+        self.assertEqual(summary["pipeline"], {"wait_for_audio": 0.5})
+
+    def test_exports(self):
+        metrics = RunMetrics()
+        metrics.add(Path("a.mp3"), self._timer(1.0, 9.0, 100.0))
+        metrics.write_json(self.temp_dir / "metrics.json")
+        metrics.write_prometheus(self.temp_dir / "badwordschecker.prom")
+
+        exported = json.loads((self.temp_dir / "metrics.json").read_text(encoding="utf-8"))
+        self.assertEqual(exported["per_file"][0]["rtf"], 0.1)
+        prom = (self.temp_dir / "badwordschecker.prom").read_text(encoding="utf-8")
+        self.assertIn("badwordschecker_last_run_real_time_factor 0.1\n", prom)
+        self.assertIn('badwordschecker_last_run_stage_seconds_sum{stage="decode"} 1.0\n', prom)
+        self.assertIn('badwordschecker_last_run_stage_seconds{stage="recognize",quantile="0.5"} 9.0\n', prom)
+        self.assertEqual(sorted(p.name for p in self.temp_dir.iterdir()), ["badwordschecker.prom", "metrics.json"])
+
+
+if __name__ == "__main__":
+    unittest.main()
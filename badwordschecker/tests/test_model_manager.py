@@ -4,7 +4,12 @@ from pathlib import Path
 import tempfile
 import shutil
 
-from badwordschecker.model_manager import get_model_path, handle_model_download, DEFAULT_MODEL_PATH
+from badwordschecker.model_manager import (
+    get_model_path,
+    handle_model_download,
+    model_supports_grammar,
+    DEFAULT_MODEL_PATH,
+)
 
 class TestModelManager(unittest.TestCase):
     def setUp(self):
@@ -32,4 +37,14 @@ class TestModelManager(unittest.TestCase):
         model_path = Path(self.temp_dir) / "model"
         with patch("badwordschecker.model_manager._download_model") as mock_download:
             handle_model_download(model_path)
-            mock_download.assert_not_called()
\ No newline at end of file
+            mock_download.assert_not_called()
+
+    def test_model_supports_grammar(self):
+        model_path = Path(self.temp_dir)
+        graph_dir = model_path / "graph"
+        graph_dir.mkdir()
+        (graph_dir / "HCLG.fst").touch()
+        self.assertFalse(model_supports_grammar(model_path))
+        (graph_dir / "HCLr.fst").touch()
+        (graph_dir / "Gr.fst").touch()
+        self.assertTrue(model_supports_grammar(model_path))
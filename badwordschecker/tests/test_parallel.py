@@ -0,0 +1,135 @@
+import multiprocessing
+import shutil
+import tempfile
+import unittest
+from collections import Counter
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from badwordschecker.parallel import (
+    FileResult,
+    rescan_transcripts,
+    resolve_jobs,
+    scan_file,
+    scan_files_parallel,
+)
+
+
+def _fake_transcription(mp3_path, model, verbose, **kwargs):
+    return f"testo con {mp3_path.stem}"
+
+
+class TestParallel(unittest.TestCase):
+    def setUp(self):
+        self.config = {
+            "verbose": False,
+            "log_format": "text",
+            "match_mode": "exact",
+            "fuzzy_distance": 1,
+            "phonetic_distance": None,
+            "jobs": 2,
+            "no_cache": True,
+            "refresh": False,
+            "first_hit": 0,
+            "spotting": False,
+            "vad": False,
+            "split_threads": 1,
+            "split_min_duration": 900,
+            "events": None,
+        }
+
+    def test_resolve_jobs(self):
+        self.assertEqual(resolve_jobs(3), 3)
+        with patch("os.cpu_count", return_value=8):
+            self.assertEqual(resolve_jobs(0), 8)
+
+    @patch("badwordschecker.parallel.process_mp3_file", return_value="che cazzo dici")
+    def test_scan_file(self, mock_process):
+        result = scan_file(Path("test.mp3"), MagicMock(), {"cazzo"}, self.config)
+        self.assertEqual(result[:3], FileResult(Path("test.mp3"), Counter({"cazzo": 1}))[:3])
+        self.assertIn("scan", result.timings.stages)
+
+    @patch("badwordschecker.parallel.process_mp3_file")
+    def test_scan_file_first_hit(self, mock_process):
+        def fake_process(mp3_path, model, verbose, on_segment=None, on_stop=None, **kwargs):
+            for text in ["tutto bene", "che cazzo", "merda"]:
+                if on_segment({"text": text}):
+                    on_stop()
+                    return "tutto bene che cazzo"
+            return "tutto bene che cazzo merda"
+
+        mock_process.side_effect = fake_process
+        self.config["first_hit"] = 1
+        result = scan_file(Path("test.mp3"), MagicMock(), {"cazzo", "merda"}, self.config)
+        self.assertEqual(result.matches, Counter({"cazzo": 1}))
+        self.assertTrue(result.truncated)
+
+    @patch("badwordschecker.parallel.process_mp3_file")
+    def test_scan_file_first_hit_with_whole_transcript(self, mock_process):
+        # A cached transcript is replayed until the limit but comes back whole.
+        def fake_process(mp3_path, model, verbose, on_segment=None, on_stop=None, **kwargs):
+            on_segment({"text": "che cazzo"})
+            return "che cazzo merda"
+
+        mock_process.side_effect = fake_process
+        self.config["first_hit"] = 1
+        result = scan_file(Path("test.mp3"), MagicMock(), {"cazzo", "merda"}, self.config)
+        self.assertEqual(result.matches, Counter({"cazzo": 1, "merda": 1}))
+        self.assertFalse(result.truncated)
+
+    @patch("badwordschecker.parallel.process_mp3_file")
+    def test_scan_file_emits_events(self, mock_process):
+        def fake_process(mp3_path, model, verbose, on_segment=None, **kwargs):
+            on_segment({"text": "che cazzo", "result": [
+                {"word": "che", "start": 0.0, "end": 0.2, "conf": 1.0},
+                {"word": "cazzo", "start": 0.2, "end": 0.6, "conf": 0.9},
+            ]})
+            return "che cazzo"
+
+        mock_process.side_effect = fake_process
+        events = MagicMock()
+        scan_file(Path("test.mp3"), MagicMock(), {"cazzo"}, self.config, events=events)
+
+        names = [c.args[0] for c in events.emit.call_args_list]
+        self.assertEqual(names, ["file_start", "hit", "file_finish"])
+        hit = events.emit.call_args_list[1].kwargs
+        self.assertEqual((hit["word"], hit["start"], hit["conf"]), ("cazzo", 0.2, 0.9))
+        self.assertEqual(events.emit.call_args_list[2].kwargs["hits"], 1)
+
+    @patch("badwordschecker.parallel.process_mp3_file", return_value=None)
+    def test_scan_file_failed_transcription(self, mock_process):
+        result = scan_file(Path("test.mp3"), MagicMock(), {"cazzo"}, self.config)
+        self.assertIsNone(result.matches)
+
+    @patch("badwordschecker.parallel.process_mp3_file", side_effect=_fake_transcription)
+    @patch("badwordschecker.parallel.load_model")
+    def test_scan_files_parallel_preserves_order(self, mock_load_model, mock_process):
+        if multiprocessing.get_start_method() != "fork":
+            self.skipTest("Patched workers require the fork start method.")
+        mp3_files = [Path(f"file{i}.mp3") for i in range(6)]
+        bad_words = {"file1", "file4"}
+
+        results = list(scan_files_parallel(mp3_files, Path("model"), bad_words, self.config))
+
+        self.assertEqual([r.mp3_path for r in results], mp3_files)
+        self.assertEqual(results[1].matches, Counter({"file1": 1}))
+        self.assertEqual(results[4].matches, Counter({"file4": 1}))
+        self.assertEqual(results[0].matches, Counter())
+
+    def test_rescan_transcripts(self):
+        temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, temp_dir)
+        mp3_files = [temp_dir / f"file{i}.mp3" for i in range(5)]
+        for i, mp3_path in enumerate(mp3_files[:4]):
+            mp3_path.with_suffix(".txt").write_text(f"che cazzo {i}" if i % 2 else "tutto bene", encoding="utf-8")
+
+        for jobs in (1, 2):
+            self.config["jobs"] = jobs
+            results = list(rescan_transcripts(mp3_files, {"cazzo"}, self.config))
+            self.assertEqual([r.mp3_path for r in results], mp3_files)
+            self.assertEqual([r.matches for r in results[:4]], [Counter(), Counter({"cazzo": 1})] * 2)
+            self.assertIsNone(results[4].matches)  # no stored transcript
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+
+from badwordschecker.utils.phonetics import phonetic_key
+
+
+class TestPhonetics(unittest.TestCase):
+    def test_spellings_that_sound_alike_share_a_key(self):
+        groups = [
+            ("cazzo", "cazo", "kazzo", "kazo"),
+            ("minchia", "minkia", "minchiaa"),
+            ("quadro", "cuadro"),
+            ("bacio", "baccio"),
+            ("hanno", "anno"),
+        ]
+        for group in groups:
+            self.assertEqual({phonetic_key(word) for word in group}, {phonetic_key(group[0])}, group)
+
+    def test_italian_spelling_rules(self):
+        expected = {
+            "cena": "CENA",  # soft c
+            "chiesa": "KIESA",  # ch stays hard
+            "ciao": "CAO",  # the i only softens the c
+            "giallo": "JALO",
+            "ghiro": "GIRO",
+            "scemo": "XEMO",
+            "sciocco": "XOKO",
+            "schifo": "SKIFO",
+            "figlio": "FILJO",
+            "sogno": "SONJO",
+            "xilofono": "KSILOFONO",
+        }
+        self.assertEqual({word: phonetic_key(word) for word in expected}, expected)
+
+    def test_different_sounds_keep_different_keys(self):
+        self.assertNotEqual(phonetic_key("sogno"), phonetic_key("sono"))
+        self.assertNotEqual(phonetic_key("cena"), phonetic_key("kena"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+import threading
+import unittest
+from collections import Counter, defaultdict
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from badwordschecker.parallel import FileResult
+from badwordschecker.pipeline import IOThread, format_stage_times, scan_files_pipelined
+
+
+class TestPipeline(unittest.TestCase):
+    def setUp(self):
+        self.config = {
+            "verbose": False,
+            "match_mode": "exact",
+            "fuzzy_distance": 1,
+            "phonetic_distance": None,
+            "refresh": False,
+            "first_hit": 0,
+            "spotting": False,
+            "vad": False,
+            "split_threads": 1,
+            "split_min_duration": 900,
+            "prefetch": 2,
+            "prefetch_memory_mb": 512,
+        }
+
+    @patch("badwordschecker.pipeline.decode_mp3_to_pcm", side_effect=lambda p: p.stem.encode())
+    @patch("badwordschecker.parallel.process_mp3_file")
+    def test_scan_files_pipelined(self, mock_process, mock_decode):
+        mock_process.side_effect = lambda mp3_path, *args, pcm=None, **kwargs: f"testo {pcm.decode()}"
+        mp3_files = [Path(f"file{i}.mp3") for i in range(5)]
+        stats = defaultdict(float)
+
+        results = list(
+            scan_files_pipelined(mp3_files, MagicMock(), {"file3"}, self.config, stats=stats)
+        )
+
+        self.assertEqual([r.mp3_path for r in results], mp3_files)
+        self.assertEqual(results[3].matches, Counter({"file3": 1}))
+        self.assertEqual(mock_decode.call_count, 5)
+        self.assertEqual(set(stats), {"wait_for_audio", "decode", "recognize"})
+
+    @patch("badwordschecker.pipeline.decode_mp3_to_pcm")
+    @patch("badwordschecker.parallel.process_mp3_file", return_value="testo")
+    def test_cached_files_are_not_decoded(self, mock_process, mock_decode):
+        cache = MagicMock()
+        cache.key_for.side_effect = lambda p: p.name
+        cache.contains.side_effect = lambda key: key == "cached.mp3"
+        mock_decode.return_value = b"pcm"
+
+        list(scan_files_pipelined([Path("cached.mp3"), Path("new.mp3")], MagicMock(), {"x"}, self.config, cache))
+
+        mock_decode.assert_called_once_with(Path("new.mp3"))
+        kwargs = [c.kwargs for c in mock_process.call_args_list]
+        self.assertEqual([(k["pcm"], k["cache_key"]) for k in kwargs], [(None, "cached.mp3"), (b"pcm", "new.mp3")])
+
+    @patch("badwordschecker.pipeline.estimate_pcm_bytes")
+    @patch("badwordschecker.pipeline.decode_mp3_to_pcm")
+    @patch("badwordschecker.parallel.process_mp3_file", return_value="testo")
+    def test_memory_cap_counts_current_and_running_decodes(self, mock_process, mock_decode, mock_estimate):
+        mib = 1024 * 1024
+        sizes = {"a.mp3": 400_000, "b.mp3": 400_000, "huge.mp3": 2 * mib, "c.mp3": 400_000, "d.mp3": 400_000}
+        mock_estimate.side_effect = lambda p: sizes[p.name]
+        decoded, recognized, held = [], [], []
+
+        def decode(mp3_path):
+            decoded.append(mp3_path)
+            return b"\0" * sizes[mp3_path.name]
+
+        def process(mp3_path, *args, pcm=None, **kwargs):
+            held.append(len(decoded) - len(recognized))
+            recognized.append(mp3_path)
+            return "testo"
+
+        mock_decode.side_effect = decode
+        mock_process.side_effect = process
+        config = {**self.config, "prefetch": 3, "prefetch_memory_mb": 1}
+        mp3_files = [Path(name) for name in sizes]
+
+        results = list(scan_files_pipelined(mp3_files, MagicMock(), {"x"}, config))
+
+        self.assertEqual([r.mp3_path for r in results], mp3_files)
+        # 1 MiB holds the current file and one more, not the three --prefetch allows.
+        self.assertLessEqual(max(held), 2)
+        # The file larger than the cap is streamed by the recognizer stage.
+        self.assertNotIn(Path("huge.mp3"), decoded)
+        pcms = {c.args[0].name: c.kwargs["pcm"] for c in mock_process.call_args_list}
+        self.assertIsNone(pcms["huge.mp3"])
+        self.assertEqual(len(pcms["c.mp3"]), 400_000)
+
+    @patch("badwordschecker.pipeline.decode_mp3_to_pcm", return_value=b"pcm")
+    @patch("badwordschecker.parallel.process_mp3_file", return_value="testo")
+    def test_unreadable_file_does_not_stop_the_run(self, mock_process, mock_decode):
+        def key_for(mp3_path):
+            if mp3_path.name == "gone.mp3":
+                raise FileNotFoundError(mp3_path)
+            return mp3_path.name
+
+        cache = MagicMock()
+        cache.key_for.side_effect = key_for
+        cache.contains.return_value = False
+
+        files = [Path("gone.mp3"), Path("ok.mp3")]
+        results = list(scan_files_pipelined(files, MagicMock(), {"x"}, self.config, cache))
+
+        self.assertEqual([r.mp3_path for r in results], files)
+        self.assertIsNone(results[0].matches)
+        self.assertEqual(results[1].matches, Counter())
+        self.assertEqual(mock_process.call_count, 1)
+
+    @patch("badwordschecker.pipeline.decode_mp3_to_pcm", side_effect=lambda p: None if p.name == "bad.mp3" else b"pcm")
+    @patch("badwordschecker.parallel.process_mp3_file", return_value="testo")
+    def test_undecodable_file_is_not_decoded_again(self, mock_process, mock_decode):
+        files = [Path("bad.mp3"), Path("ok.mp3")]
+        results = list(scan_files_pipelined(files, MagicMock(), {"x"}, self.config))
+
+        self.assertIsNone(results[0].matches)
+        self.assertEqual(results[1].matches, Counter())
+        self.assertEqual(mock_decode.call_count, 2)
+        self.assertEqual([c.args[0] for c in mock_process.call_args_list], [Path("ok.mp3")])
+
+    def test_io_thread_handles_items_in_order(self):
+        handled = []
+        threads = set()
+
+        def handler(item):
+            threads.add(threading.current_thread())
+            handled.append(item)
+
+        io_thread = IOThread(handler, depth=2)
+        for i in range(10):
+            io_thread.submit(i)
+        io_thread.close()
+
+        self.assertEqual(handled, list(range(10)))
+        self.assertNotIn(threading.current_thread(), threads)
+        self.assertIn("io", io_thread.stats)
+
+    def test_io_thread_reraises_handler_errors(self):
+        def handler(item):
+            raise OSError("disk full")
+
+        io_thread = IOThread(handler)
+        io_thread.submit(FileResult(Path("a.mp3"), Counter()))
+        with self.assertRaises(OSError):
+            io_thread.close()
+
+    def test_format_stage_times(self):
+        self.assertEqual(
+            format_stage_times({"decode": 1.5, "wait_for_audio": 0.25}),
+            "decode 1.5s, wait for audio 0.2s",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,5 @@
+import shutil
+import tempfile
 import unittest
 from collections import Counter
 from pathlib import Path
@@ -6,6 +8,7 @@ from unittest.mock import mock_open, patch
 from badwordschecker.reporting import (
     generate_per_file_report,
     generate_aggregated_report,
+    WordFileIndex,
 )
 
 
@@ -27,6 +30,13 @@ class TestReporting(unittest.TestCase):
                 handle.write.assert_any_call("File: test.mp3\n")
                 handle.write.assert_any_call("Total bad words: 3\n")
 
+    def test_generate_per_file_report_truncated(self):
+        m = mock_open()
+        with patch("builtins.open", m):
+            with patch("pathlib.Path.mkdir"):
+                generate_per_file_report(Path("test.mp3"), Counter({"cazzo": 1}), Path("out"), truncated=True)
+                m().write.assert_any_call("Scan truncated: stopped at the first bad words found.\n")
+
     def test_generate_aggregated_report(self):
         all_matches = {
             "test1.mp3": Counter({"cazzo": 2, "merda": 1}),
@@ -46,6 +56,26 @@ class TestReporting(unittest.TestCase):
                 handle.write.assert_any_call("Bad Words Summary\n")
                 handle.write.assert_any_call("Total files scanned: 2\n")
 
+    def test_aggregated_report_from_spilled_index(self):
+        temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, temp_dir)
+        all_matches = {
+            f"file{i:02d}.mp3": Counter({"cazzo": i % 3 + 1, "merda": 1} if i % 2 else {"cazzo": 1})
+            for i in range(20, 0, -1)
+        }
+        generate_aggregated_report(all_matches, temp_dir / "dict", 25)
+
+        index = WordFileIndex(max_postings=3)
+        for filename, matches in all_matches.items():
+            index.add(filename, matches)
+        self.assertIsNotNone(index._db)  # postings were spilled to disk
+        generate_aggregated_report(index, temp_dir / "index", 25)
+        index.close()
+
+        expected = (temp_dir / "dict" / "parolacce.txt").read_text(encoding="utf-8")
+        self.assertIn("file01.mp3, file02.mp3, file03.mp3", expected)
+        self.assertEqual((temp_dir / "index" / "parolacce.txt").read_text(encoding="utf-8"), expected)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,6 +1,7 @@
 import unittest
 from collections import Counter
 
+from badwordschecker.matching import CompiledDictionary
 from badwordschecker.scanning import scan_text
 
 
@@ -17,6 +18,51 @@ class TestScanning(unittest.TestCase):
         matches = scan_text(text, bad_words, match_mode="substring")
         self.assertEqual(matches, Counter({"badword": 2}))
 
+    def test_scan_text_substring_counts_once_per_token(self):
+        text = "cazzocazzo cazzone cazzo"
+        bad_words = CompiledDictionary({"cazzo", "azz", "one"})
+        matches = scan_text(text, bad_words, match_mode="substring")
+        self.assertEqual(matches, Counter({"cazzo": 3, "azz": 3, "one": 1}))
+
+    def test_scan_text_fuzzy_match(self):
+        text = "che cazo dici, stronso! sei pazzo, coglionne? cosa"
+        bad_words = CompiledDictionary({"cazzo", "stronzo", "coglione", "cosa"})
+        matches = scan_text(text, bad_words, match_mode="fuzzy")
+        # Words of five letters or fewer (cazo, pazzo) only match exactly.
+        self.assertEqual(matches, Counter({"stronzo": 1, "coglione": 1, "cosa": 1}))
+        matches = scan_text("cojjglione", bad_words, "fuzzy", max_distance=2)
+        self.assertEqual(matches, Counter({"coglione": 1}))
+
+    def test_scan_text_stem_match(self):
+        text = "Stronza, stronzi e stronze! Che cazzate, sei incazzato? anni"
+        bad_words = CompiledDictionary({"stronzo", "cazzata", "incazzare", "ano"})
+        matches = scan_text(text, bad_words, match_mode="stem")
+        self.assertEqual(matches, Counter({"stronzo": 3, "cazzata": 1, "incazzare": 1}))
+
+    def test_scan_text_phonetic_match(self):
+        text = "Che kazzo, minkia! Sei un cojone, stronso. Cosa"
+        bad_words = CompiledDictionary({"cazzo", "minchia", "coglione", "stronzo"})
+        matches = scan_text(text, bad_words, match_mode="phonetic")
+        self.assertEqual(matches, Counter({"cazzo": 1, "minchia": 1}))
+        matches = scan_text("kazzo minkia", bad_words, "phonetic", max_distance=1)
+        self.assertEqual(matches, Counter({"cazzo": 1}))
+
+    def test_scan_text_regex_entries(self):
+        text = "Stronzo! vaffanculo, stronzi e stronzate. Cazzo"
+        bad_words = CompiledDictionary({"cazzo", "re:stronz[oaie]", "re:vaff.*"})
+        for mode in ("exact", "substring", "stem", "fuzzy", "phonetic"):
+            matches = scan_text(text, bad_words, match_mode=mode)
+            self.assertEqual(matches, Counter({"re:stronz[oaie]": 2, "re:vaff.*": 1, "cazzo": 1}))
+
+    def test_scan_text_phrases(self):
+        text = "Porca miseria! porca la miseria, porca miseria ladra"
+        bad_words = CompiledDictionary({"porca miseria", "porca miseria ladra", "miseria"})
+        for mode in ("exact", "substring", "fuzzy", "phonetic"):
+            matches = scan_text(text, bad_words, match_mode=mode)
+            self.assertEqual(
+                matches, Counter({"porca miseria": 2, "porca miseria ladra": 1, "miseria": 3})
+            )
+
     def test_scan_text_no_match(self):
         text = "This is a clean text."
         bad_words = {"badword1", "badword2"}
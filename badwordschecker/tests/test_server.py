@@ -0,0 +1,132 @@
+import os
+import shutil
+import stat
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from badwordschecker.server import ScanServer, send_request, submit_scan
+
+
+class TestServer(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.socket_path = self.temp_dir / "server.sock"
+        self.model_path = self.temp_dir / "model"
+        self.server = ScanServer(self.socket_path, MagicMock(), self.model_path, max_jobs=1, max_queue=0)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.temp_dir)
+
+    def _config(self):
+        return {"mp3_folders": [str(self.temp_dir)], "model_path": str(self.model_path), "jobs": 4}
+
+    def test_health(self):
+        health = send_request(self.socket_path, {"op": "health"})
+        self.assertEqual(health["status"], "ok")
+        self.assertEqual(health["model_path"], str(self.model_path.resolve()))
+        self.assertEqual(health["running"], 0)
+
+    @patch("badwordschecker.cli.run_scan")
+    def test_scan_uses_resident_model(self, mock_run_scan):
+        mock_run_scan.return_value = {"files": 3, "files_with_bad_words": 1, "report": "parolacce.txt"}
+
+        exit_code = submit_scan(self._config(), self.socket_path)
+
+        self.assertEqual(exit_code, 0)
+        config, output_dir = mock_run_scan.call_args.args
+        self.assertIs(mock_run_scan.call_args.kwargs["model"], self.server.model)
+        self.assertEqual(config["jobs"], 1)
+        self.assertTrue(output_dir.is_absolute())
+        health = send_request(self.socket_path, {"op": "health"})
+        self.assertEqual((health["completed"], health["files_scanned"]), (1, 3))
+
+    @patch("badwordschecker.cli.run_scan", side_effect=SystemExit(1))
+    def test_failed_scan(self, mock_run_scan):
+        self.assertEqual(submit_scan(self._config(), self.socket_path), 1)
+        self.assertEqual(send_request(self.socket_path, {"op": "health"})["failed"], 1)
+
+    def test_socket_is_owner_only(self):
+        self.assertEqual(stat.S_IMODE(os.stat(self.socket_path).st_mode), 0o600)
+
+    @patch("badwordschecker.cli.run_scan")
+    def test_job_without_model_uses_resident_model(self, mock_run_scan):
+        mock_run_scan.return_value = {"files": 0, "files_with_bad_words": 0, "report": ""}
+        config = {**self._config(), "model_path": None}
+
+        response = send_request(self.socket_path, {"op": "scan", "config": config})
+
+        self.assertEqual(response["status"], "done")
+        self.assertEqual(mock_run_scan.call_args.args[0]["model_path"], str(self.model_path))
+
+    def test_scan_without_config(self):
+        response = send_request(self.socket_path, {"op": "scan"})
+        self.assertEqual(response["status"], "error")
+        self.assertIn("mp3_folders", response["error"])
+
+    @patch("badwordschecker.cli.run_scan")
+    def test_jobs_sharing_an_output_dir_run_one_at_a_time(self, mock_run_scan):
+        server = ScanServer(self.temp_dir / "two.sock", MagicMock(), self.model_path, max_jobs=2, max_queue=2)
+        lock = threading.Lock()
+        running = {}
+        overlaps = []
+
+        def slow_scan(config, output_dir, model=None):
+            with lock:
+                running[output_dir] = running.get(output_dir, 0) + 1
+                overlaps.append(running[output_dir])
+            threading.Event().wait(0.1)
+            with lock:
+                running[output_dir] -= 1
+            return {"files": 0, "files_with_bad_words": 0, "report": ""}
+
+        mock_run_scan.side_effect = slow_scan
+        config = {**self._config(), "output_dir": str(self.temp_dir / "out")}
+        jobs = [threading.Thread(target=server.submit, args=(config,)) for _ in range(2)]
+        for job in jobs:
+            job.start()
+        for job in jobs:
+            job.join()
+        server.server_close()
+
+        self.assertEqual(overlaps, [1, 1])
+
+    def test_rejects_other_model(self):
+        config = {**self._config(), "model_path": str(self.temp_dir / "other")}
+        response = send_request(self.socket_path, {"op": "scan", "config": config})
+        self.assertEqual(response["status"], "error")
+
+    @patch("badwordschecker.cli.run_scan")
+    def test_rejects_jobs_beyond_queue(self, mock_run_scan):
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_scan(config, output_dir, model=None):
+            started.set()
+            release.wait(5)
+            return {"files": 0, "files_with_bad_words": 0, "report": ""}
+
+        mock_run_scan.side_effect = slow_scan
+        first = threading.Thread(target=submit_scan, args=(self._config(), self.socket_path))
+        first.start()
+        self.assertTrue(started.wait(5))
+
+        response = send_request(self.socket_path, {"op": "scan", "config": self._config()})
+        release.set()
+        first.join()
+
+        self.assertEqual(response["status"], "rejected")
+        self.assertEqual(send_request(self.socket_path, {"op": "health"})["rejected"], 1)
+
+    def test_unreachable_daemon(self):
+        self.assertEqual(submit_scan(self._config(), self.temp_dir / "missing.sock"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
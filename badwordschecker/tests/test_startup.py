@@ -0,0 +1,52 @@
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+# Cumulative import time allowed for badwordschecker.cli, which is all that
+# --version, --help, --download-dict and --edit-dict load.
+STARTUP_BUDGET_US = 150_000
+
+# Dependencies that only the commands needing them may import.
+HEAVY_MODULES = ("vosk", "numpy", "requests", "tqdm", "json_log_formatter")
+
+
+def _import_times() -> dict:
+    """Imports the CLI in a fresh interpreter and returns cumulative import times in µs."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import badwordschecker.cli"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+class TestStartup(unittest.TestCase):
+    def test_cli_import_skips_heavy_dependencies(self):
+        times = _import_times()
+        loaded = [name for name in HEAVY_MODULES if name in times]
+        self.assertEqual(loaded, [], f"Imported at CLI startup: {loaded}")
+
+    def test_cli_import_within_budget(self):
+        # Best of three, so a busy machine does not fail the budget.
+        elapsed = min(_import_times()["badwordschecker.cli"] for _ in range(3))
+        self.assertLess(
+            elapsed,
+            STARTUP_BUDGET_US,
+            f"badwordschecker.cli took {elapsed / 1000:.0f} ms to import "
+            f"(budget {STARTUP_BUDGET_US / 1000:.0f} ms)",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+
+from badwordschecker.utils.stemming import stem
+
+
+class TestStemming(unittest.TestCase):
+    def test_inflections_share_a_stem(self):
+        for word in ("stronzo", "stronza", "stronzi", "stronze"):
+            self.assertEqual(stem(word), "stronz")
+        for word in ("abbandonata", "abbandonato", "abbandonava", "abbandonerà", "abbandonò"):
+            self.assertEqual(stem(word), "abbandon")
+
+    def test_snowball_vocabulary(self):
+        # Stems produced by the reference Snowball Italian stemmer.
+        expected = {
+            "abbassamento": "abbass",
+            "abbondantemente": "abbondant",
+            "abdicazione": "abdic",
+            "abilità": "abil",
+            "abitualmente": "abitual",
+            "accomodarci": "accomod",
+            "guardandogli": "guard",
+            "qualunque": "qualunqu",
+        }
+        self.assertEqual({word: stem(word) for word in expected}, expected)
+
+    def test_short_words_are_kept(self):
+        self.assertEqual(stem("ano"), "ano")
+        self.assertEqual(stem("a"), "a")
+
+
+if __name__ == "__main__":
+    unittest.main()
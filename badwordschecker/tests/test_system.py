@@ -1,6 +1,7 @@
+import sys
 import unittest
 from unittest.mock import patch
-from badwordschecker.utils.system import command_exists
+from badwordschecker.utils.system import command_exists, silence_stderr
 
 class TestSystem(unittest.TestCase):
 
@@ -12,5 +13,13 @@ class TestSystem(unittest.TestCase):
     def test_command_does_not_exist(self, mock_which):
         self.assertFalse(command_exists('nonexistentcommand'))
 
+    def test_silence_stderr_nested(self):
+        original = sys.stderr
+        with silence_stderr():
+            with silence_stderr():
+                self.assertIsNot(sys.stderr, original)
+            self.assertIsNot(sys.stderr, original)
+        self.assertIs(sys.stderr, original)
+
 if __name__ == '__main__':
     unittest.main()
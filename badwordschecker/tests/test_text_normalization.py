@@ -1,6 +1,22 @@
+import random
 import unittest
+from unittest.mock import patch
 
-from badwordschecker.utils.text_normalization import normalize_text, tokenize_text
+from badwordschecker.utils.text_normalization import (
+    _normalize_text_unicode,
+    normalize_many,
+    normalize_text,
+    tokenize_text,
+)
+
+CORPUS = [
+    "Caffè, perché! Più città: è già così.",
+    "L'uomo disse: «Non è vero», poi andò via...",
+    "ÀÈÌÒÙ àèìòù ÁÉÍÓÚ áéíóú Ç ç Ñ ñ ß Ø ø Æ æ",
+    "İstanbul ΣΊΣΥΦΟΣ Ελληνικά Кириллица 漢字 😀",
+    "e\u0301 a\u0300\u0323 combining marks, tab\tand\nnewline",
+    "under_score 123 ½ ² № ™ ﬁ Ⅻ",
+]
 
 
 class TestTextNormalization(unittest.TestCase):
@@ -9,6 +25,32 @@ class TestTextNormalization(unittest.TestCase):
         self.assertEqual(normalize_text("L'apostrofo"), "lapostrofo")
         self.assertEqual(normalize_text("123 parole"), "123 parole")
 
+    def test_normalize_text_matches_reference(self):
+        for text in CORPUS:
+            self.assertEqual(normalize_text(text), _normalize_text_unicode(text))
+
+        rng = random.Random(0)
+        latin = [chr(c) for c in range(0x250)]
+        mixed = [chr(c) for c in range(0x20, 0x600)] + ["\u0301", "\u2019", "\u00a0", "€"]
+        for alphabet in (latin, mixed):
+            for _ in range(500):
+                text = "".join(rng.choices(alphabet, k=rng.randint(0, 40)))
+                self.assertEqual(normalize_text(text), _normalize_text_unicode(text), repr(text))
+
+    def test_rare_characters_only_slow_down_their_chunk(self):
+        text = "Caffè… e dell’anima, perché ΣΟΦΟΣ! Più città"
+        with patch(
+            "badwordschecker.utils.text_normalization._normalize_text_unicode",
+            side_effect=_normalize_text_unicode,
+        ) as slow:
+            result = normalize_text(text)
+        self.assertEqual(result, _normalize_text_unicode(text))
+        self.assertEqual(result, "caffe e dellanima perche σοφος piu citta")
+        self.assertEqual([c.args[0] for c in slow.call_args_list], ["Caffè…", "dell’anima,", "ΣΟΦΟΣ!"])
+
+    def test_normalize_many(self):
+        self.assertEqual(normalize_many(CORPUS), [normalize_text(text) for text in CORPUS])
+
     def test_tokenize_text(self):
         self.assertEqual(tokenize_text("caffe perche"), ["caffe", "perche"])
         self.assertEqual(tokenize_text("una frase di prova"), ["una", "frase", "di", "prova"])
@@ -1,3 +1,5 @@
+import io
+import json
 import unittest
 import wave
 from pathlib import Path
@@ -6,6 +8,8 @@ from unittest.mock import patch, MagicMock
 from badwordschecker.transcription import (
     convert_mp3_to_wav,
     transcribe_audio,
+    transcribe_mp3_split,
+    transcribe_mp3_stream,
     process_mp3_file,
 )
 
@@ -58,12 +62,208 @@ class TestTranscription(unittest.TestCase):
     @patch("badwordschecker.transcription.save_transcription")
     def test_process_mp3_file(self, mock_save, mock_transcribe, mock_convert):
         model = MagicMock()
-        result = process_mp3_file(Path("test.mp3"), model, False)
+        result = process_mp3_file(Path("test.mp3"), model, False, stream=False)
         self.assertEqual(result, "transcribed text")
         mock_convert.assert_called_once()
         mock_transcribe.assert_called_once()
         mock_save.assert_called_once_with("transcribed text", Path("test.mp3"))
 
+    @patch("badwordschecker.transcription.transcribe_mp3_stream", return_value=[{"text": "streamed text"}])
+    @patch("badwordschecker.transcription.convert_mp3_to_wav")
+    @patch("badwordschecker.transcription.save_transcription")
+    def test_process_mp3_file_streams_by_default(self, mock_save, mock_convert, mock_stream):
+        result = process_mp3_file(Path("test.mp3"), MagicMock(), False)
+        self.assertEqual(result, "streamed text")
+        mock_convert.assert_not_called()
+        mock_save.assert_called_once_with("streamed text", Path("test.mp3"))
+
+    @patch("badwordschecker.transcription.transcribe_mp3_stream")
+    @patch("badwordschecker.transcription.save_transcription")
+    def test_process_mp3_file_uses_cache(self, mock_save, mock_stream):
+        cache = MagicMock()
+        cache.get.return_value = [{"text": "dal"}, {"text": "cache"}]
+        result = process_mp3_file(Path("test.mp3"), MagicMock(), False, cache=cache)
+        self.assertEqual(result, "dal cache")
+        mock_stream.assert_not_called()
+
+    @patch("badwordschecker.transcription.transcribe_mp3_stream", return_value=[{"text": "nuovo"}])
+    @patch("badwordschecker.transcription.save_transcription")
+    def test_process_mp3_file_refresh_bypasses_cache(self, mock_save, mock_stream):
+        cache = MagicMock()
+        result = process_mp3_file(Path("test.mp3"), MagicMock(), False, cache=cache, refresh=True)
+        self.assertEqual(result, "nuovo")
+        cache.get.assert_not_called()
+        cache.put.assert_called_once_with(cache.key_for.return_value, [{"text": "nuovo"}])
+
+    @patch("badwordschecker.transcription.KaldiRecognizer")
+    @patch("subprocess.Popen")
+    def test_transcribe_mp3_stream(self, mock_popen, mock_recognizer):
+        process = mock_popen.return_value
+        process.stdout = io.BytesIO(b"\x00\x00" * 10000)
+        process.stderr = io.BytesIO(b"")
+        process.returncode = 0
+        rec = mock_recognizer.return_value
+        rec.AcceptWaveform.side_effect = [True, False, False]
+        rec.Result.return_value = json.dumps({"text": "ciao"})
+        rec.FinalResult.return_value = json.dumps({"text": "mondo"})
+
+        result = transcribe_mp3_stream(Path("test.mp3"), MagicMock(), True)
+
+        self.assertEqual(result, [{"text": "ciao"}, {"text": "mondo"}])
+        self.assertEqual(rec.AcceptWaveform.call_count, 3)
+        self.assertIn("s16le", mock_popen.call_args[0][0])
+
+    @patch("badwordschecker.transcription.KaldiRecognizer")
+    @patch("subprocess.Popen")
+    def test_transcribe_mp3_stream_stops_early(self, mock_popen, mock_recognizer):
+        process = mock_popen.return_value
+        process.stdout = io.BytesIO(b"\x00\x00" * 40000)
+        process.stderr = io.BytesIO(b"")
+        process.poll.return_value = None
+        rec = mock_recognizer.return_value
+        rec.AcceptWaveform.return_value = True
+        rec.Result.return_value = json.dumps({"text": "cazzo"})
+
+        result = transcribe_mp3_stream(Path("test.mp3"), MagicMock(), True, on_segment=lambda s: True)
+
+        self.assertEqual(result, [{"text": "cazzo"}])
+        self.assertEqual(rec.AcceptWaveform.call_count, 1)
+        process.kill.assert_called_once()
+
+    @patch("badwordschecker.transcription.transcribe_mp3_stream")
+    @patch("badwordschecker.transcription.save_transcription")
+    def test_process_mp3_file_partial_not_cached(self, mock_save, mock_stream):
+        def fake_stream(mp3_path, model, verbose, on_segment, grammar=None, vad_threshold_db=None, timer=None):
+            on_segment({"text": "cazzo"})
+            return [{"text": "cazzo"}]
+
+        mock_stream.side_effect = fake_stream
+        cache = MagicMock()
+        cache.get.return_value = None
+        on_stop = MagicMock()
+        result = process_mp3_file(
+            Path("test.mp3"), MagicMock(), False, cache=cache, on_segment=lambda s: True, on_stop=on_stop
+        )
+        self.assertEqual(result, "cazzo")
+        cache.put.assert_not_called()
+        mock_save.assert_not_called()
+        on_stop.assert_called_once()
+
+    @patch("badwordschecker.transcription.transcribe_mp3_stream")
+    def test_process_mp3_file_unreadable_file_fails(self, mock_stream):
+        cache = MagicMock()
+        cache.key_for.side_effect = PermissionError("Permission denied")
+        self.assertIsNone(process_mp3_file(Path("locked.mp3"), MagicMock(), False, cache=cache))
+        mock_stream.assert_not_called()
+
+    @patch("badwordschecker.transcription.save_transcription")
+    def test_process_mp3_file_cached_transcript_is_not_stopped(self, mock_save):
+        cache = MagicMock()
+        cache.get.return_value = [{"text": "che cazzo"}, {"text": "merda"}]
+        on_stop = MagicMock()
+        result = process_mp3_file(
+            Path("test.mp3"), MagicMock(), False, cache=cache, on_segment=lambda s: True, on_stop=on_stop
+        )
+        self.assertEqual(result, "che cazzo merda")
+        on_stop.assert_not_called()
+
+    @patch("badwordschecker.transcription.KaldiRecognizer")
+    @patch("subprocess.Popen")
+    def test_transcribe_mp3_stream_grammar_fallback(self, mock_popen, mock_recognizer):
+        process = mock_popen.return_value
+        process.stdout = io.BytesIO(b"")
+        process.stderr = io.BytesIO(b"")
+        process.returncode = 0
+        full_rec = MagicMock()
+        full_rec.FinalResult.return_value = json.dumps({"text": ""})
+        mock_recognizer.side_effect = [Exception("Failed to create a recognizer"), full_rec]
+        model = MagicMock()
+
+        result = transcribe_mp3_stream(Path("test.mp3"), model, True, grammar='["cazzo", "[unk]"]')
+
+        self.assertEqual(result, [{"text": ""}])
+        self.assertEqual(mock_recognizer.call_args_list[0].args, (model, 16000, '["cazzo", "[unk]"]'))
+        self.assertEqual(mock_recognizer.call_args_list[1].args, (model, 16000))
+
+    @patch("badwordschecker.transcription.transcribe_mp3_stream", return_value=[{"text": "cazzo [unk]"}])
+    @patch("badwordschecker.transcription.save_transcription")
+    def test_process_mp3_file_spotting_skips_cache_and_save(self, mock_save, mock_stream):
+        cache = MagicMock()
+        result = process_mp3_file(Path("test.mp3"), MagicMock(), False, cache=cache, grammar='["cazzo"]')
+        self.assertEqual(result, "cazzo [unk]")
+        cache.key_for.assert_not_called()
+        mock_save.assert_not_called()
+
+    @patch("badwordschecker.transcription.KaldiRecognizer")
+    @patch("badwordschecker.transcription.decode_mp3_to_pcm")
+    def test_transcribe_mp3_split_offsets_words(self, mock_decode, mock_recognizer):
+        mock_decode.return_value = b"\x00\x00" * 16000 * 20
+        rec = mock_recognizer.return_value
+        rec.AcceptWaveform.return_value = False
+        rec.FinalResult.side_effect = lambda: json.dumps(
+            {"text": "ciao", "result": [{"word": "ciao", "start": 1.0, "end": 1.5}]}
+        )
+
+        segments = transcribe_mp3_split(Path("long.mp3"), MagicMock(), True, threads=2)
+
+        self.assertEqual(len(segments), 2)
+        starts = [segment["result"][0]["start"] for segment in segments]
+        self.assertEqual(starts[0], 1.0)
+        self.assertGreater(starts[1], 1.0 + 5)
+
+    @patch("badwordschecker.transcription.transcribe_mp3_split", return_value=[{"text": "lungo"}])
+    @patch("badwordschecker.transcription.transcribe_mp3_stream")
+    @patch("badwordschecker.transcription.probe_duration", return_value=3600.0)
+    @patch("badwordschecker.transcription.save_transcription")
+    def test_process_mp3_file_splits_long_files(self, mock_save, mock_probe, mock_stream, mock_split):
+        result = process_mp3_file(
+            Path("long.mp3"), MagicMock(), False, split_threads=4, split_min_duration=900
+        )
+        self.assertEqual(result, "lungo")
+        mock_stream.assert_not_called()
+
+        mock_probe.return_value = 60.0
+        mock_stream.return_value = [{"text": "corto"}]
+        result = process_mp3_file(
+            Path("short.mp3"), MagicMock(), False, split_threads=4, split_min_duration=900
+        )
+        self.assertEqual(result, "corto")
+        mock_split.assert_called_once()
+
+    @patch("badwordschecker.transcription.KaldiRecognizer")
+    @patch("badwordschecker.transcription.transcribe_mp3_stream")
+    @patch("badwordschecker.transcription.save_transcription")
+    def test_process_mp3_file_prefetched_pcm(self, mock_save, mock_stream, mock_recognizer):
+        rec = mock_recognizer.return_value
+        rec.AcceptWaveform.return_value = False
+        rec.FinalResult.return_value = json.dumps({"text": "già decodificato"})
+        cache = MagicMock()
+        cache.get.return_value = None
+
+        result = process_mp3_file(
+            Path("test.mp3"), MagicMock(), False, cache=cache, pcm=b"\x00\x00" * 16000, cache_key="k"
+        )
+
+        self.assertEqual(result, "già decodificato")
+        mock_stream.assert_not_called()
+        cache.key_for.assert_not_called()
+        cache.put.assert_called_once_with("k", [{"text": "già decodificato"}])
+
+    @patch("badwordschecker.transcription.KaldiRecognizer")
+    @patch("subprocess.Popen")
+    def test_transcribe_mp3_stream_corrupt_file(self, mock_popen, mock_recognizer):
+        process = mock_popen.return_value
+        process.stdout = io.BytesIO(b"")
+        process.stderr = io.BytesIO(b"Invalid data found when processing input")
+        process.returncode = 1
+
+        result = transcribe_mp3_stream(Path("corrupt.mp3"), MagicMock(), True)
+        self.assertIsNone(result)
+
+    @patch("subprocess.Popen", side_effect=FileNotFoundError)
+    def test_transcribe_mp3_stream_ffmpeg_missing(self, mock_popen):
+        self.assertIsNone(transcribe_mp3_stream(Path("test.mp3"), MagicMock(), True))
+
 
 if __name__ == "__main__":
     unittest.main()
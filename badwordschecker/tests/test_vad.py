@@ -0,0 +1,74 @@
+import unittest
+
+import numpy as np
+
+from badwordschecker.utils.config import DEFAULT_VAD_THRESHOLD_DB
+from badwordschecker.vad import DEFAULT_THRESHOLD_DB, SpeechFilter, find_split_points
+
+RATE = 16000
+
+
+def _tone(seconds: float) -> bytes:
+    t = np.arange(int(RATE * seconds)) / RATE
+    return (np.sin(2 * np.pi * 440 * t) * 8000).astype("<i2").tobytes()
+
+
+def _silence(seconds: float) -> bytes:
+    return b"\x00\x00" * int(RATE * seconds)
+
+
+def _run(speech_filter: SpeechFilter, audio: bytes, chunk: int = 8000) -> bytes:
+    kept = b"".join(speech_filter.process(audio[i : i + chunk]) for i in range(0, len(audio), chunk))
+    return kept + speech_filter.flush()
+
+
+class TestSpeechFilter(unittest.TestCase):
+    def test_drops_long_silence(self):
+        audio = _silence(5) + _tone(1) + _silence(5)
+        speech_filter = SpeechFilter(RATE, padding_ms=300)
+        kept = _run(speech_filter, audio)
+
+        kept_seconds = len(kept) / 2 / RATE
+        self.assertAlmostEqual(kept_seconds, 1.6, delta=0.1)
+        self.assertAlmostEqual(speech_filter.skipped_seconds, 11 - kept_seconds, delta=0.05)
+
+    def test_maps_times_back_to_original_audio(self):
+        audio = _silence(5) + _tone(1) + _silence(5) + _tone(1)
+        speech_filter = SpeechFilter(RATE, padding_ms=300)
+        _run(speech_filter, audio)
+
+        # The first tone starts 0.3s into the kept audio, the second one after
+        # the 1.6s kept around the first tone plus its own 0.3s of padding.
+        self.assertAlmostEqual(speech_filter.to_original(0.3), 5.0, delta=0.05)
+        self.assertAlmostEqual(speech_filter.to_original(1.9), 11.0, delta=0.05)
+
+    def test_chunking_does_not_change_output(self):
+        audio = _silence(2) + _tone(0.5) + _silence(0.2) + _tone(0.5) + _silence(3)
+        whole = _run(SpeechFilter(RATE), audio, chunk=len(audio))
+        chunked = _run(SpeechFilter(RATE), audio, chunk=1234)
+        self.assertEqual(whole, chunked)
+
+    def test_keeps_continuous_speech(self):
+        audio = _tone(2.01)
+        self.assertEqual(_run(SpeechFilter(RATE), audio), audio)
+
+
+class TestFindSplitPoints(unittest.TestCase):
+    def test_cuts_in_nearby_pause(self):
+        audio = _tone(9) + _silence(1) + _tone(10)
+        (point,) = find_split_points(audio, RATE, 2, search_seconds=3)
+        self.assertTrue(9 * RATE * 2 <= point <= 10 * RATE * 2)
+
+    def test_returns_increasing_offsets(self):
+        points = find_split_points(_tone(12), RATE, 4, search_seconds=1)
+        self.assertEqual(len(points), 3)
+        self.assertEqual(points, sorted(points))
+        self.assertTrue(all(p % 2 == 0 for p in points))
+
+    def test_config_default_threshold_matches(self):
+        # The config keeps its own copy so that reading it does not import NumPy.
+        self.assertEqual(DEFAULT_VAD_THRESHOLD_DB, DEFAULT_THRESHOLD_DB)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,21 +1,41 @@
 import json
 import logging
+import math
 import subprocess
+import sys
 import tempfile
+import threading
+import time
 import wave
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from vosk import KaldiRecognizer, Model
-import sys
-import subprocess
-import json
-import logging
 
+from badwordschecker.cache import TranscriptionCache
+from badwordschecker.metrics import StageTimer
 from badwordschecker.utils.system import silence_stderr
+from badwordschecker.vad import SpeechFilter, find_split_points
 
 logger = logging.getLogger(__name__)
 
+SAMPLE_RATE = 16000
+CHUNK_FRAMES = 4000
+# Raw signed 16-bit little-endian mono PCM: two bytes per frame.
+CHUNK_BYTES = CHUNK_FRAMES * 2
+BYTES_PER_SECOND = SAMPLE_RATE * 2
+# A low MP3 bitrate (32 kbps), so decoded sizes estimated from the file size
+# err on the large side when ffprobe cannot tell the duration.
+ESTIMATE_MP3_BYTES_PER_SECOND = 4000
+
+# Long files are split into parts of at most this length, so threads stay
+# balanced even when one part recognizes slower than the others.
+SPLIT_PART_SECONDS = 600
+
+# Called with each finalized recognizer result; returning True stops decoding.
+SegmentCallback = Callable[[Dict], bool]
+
 
 def convert_mp3_to_wav(mp3_path: Path, wav_path: Path) -> bool:
     """Converts an MP3 file to a WAV file using ffmpeg."""
@@ -49,6 +69,49 @@ def convert_mp3_to_wav(mp3_path: Path, wav_path: Path) -> bool:
         return False
 
 
+def _accept_waveform(rec: KaldiRecognizer, data: bytes, verbose: bool, segments: List[Dict]) -> bool:
+    """Feeds a chunk of audio to the recognizer, collecting any finalized segment.
+
+    Returns True if a segment was finalized.
+    """
+    if not verbose:
+        with silence_stderr():
+            finalized = rec.AcceptWaveform(data)
+    else:
+        finalized = rec.AcceptWaveform(data)
+    if finalized:
+        segments.append(json.loads(rec.Result()))
+    return bool(finalized)
+
+
+def _create_recognizer(model: Model, grammar: Optional[str], mp3_path: Path) -> KaldiRecognizer:
+    """Creates a recognizer, restricted to ``grammar`` when the model accepts it."""
+    if grammar is not None:
+        try:
+            return KaldiRecognizer(model, SAMPLE_RATE, grammar)
+        except Exception as e:
+            logger.warning(
+                f"Model rejected the spotting grammar for {mp3_path.name}, "
+                f"falling back to full transcription: {e}"
+            )
+    return KaldiRecognizer(model, SAMPLE_RATE)
+
+
+def _remap_segment(segment: Dict, speech_filter: Optional[SpeechFilter]) -> None:
+    """Maps word timings measured on filtered audio back to the original audio."""
+    if speech_filter is None:
+        return
+    for word in segment.get("result", []):
+        for key in ("start", "end"):
+            if key in word:
+                word[key] = round(speech_filter.to_original(word[key]), 3)
+
+
+def segments_to_text(segments: List[Dict]) -> str:
+    """Joins the text of finalized recognizer results into a single transcript."""
+    return " ".join(segment.get("text", "") for segment in segments).strip()
+
+
 def transcribe_audio(wav_path: Path, model: Model, verbose: bool) -> Optional[str]:
     """Transcribes a WAV file using the Vosk model."""
     try:
@@ -69,10 +132,10 @@ def transcribe_audio(wav_path: Path, model: Model, verbose: bool) -> Optional[st
             rec.SetWords(True)
 
             total_frames = wf.getnframes()
-            chunk_size = 4000
+            chunk_size = CHUNK_FRAMES
             processed_frames = 0
             last_reported_progress = -1
-            results = []
+            segments: List[Dict] = []
 
             while True:
                 data = wf.readframes(chunk_size)
@@ -87,43 +150,485 @@ def transcribe_audio(wav_path: Path, model: Model, verbose: bool) -> Optional[st
                     sys.stderr.flush()
                     last_reported_progress = progress
 
-                if not verbose:
-                    with silence_stderr():
-                        if rec.AcceptWaveform(data):
-                            partial_result = json.loads(rec.Result())
-                            results.append(partial_result.get("text", ""))
-                else:
-                    if rec.AcceptWaveform(data):
-                        partial_result = json.loads(rec.Result())
-                        results.append(partial_result.get("text", ""))
+                _accept_waveform(rec, data, verbose, segments)
 
             sys.stderr.write("\rTranscription complete.    \n")
             sys.stderr.flush()
 
-            final_result = json.loads(rec.FinalResult())
-            results.append(final_result.get("text", ""))
-            
-            return " ".join(results).strip()
+            segments.append(json.loads(rec.FinalResult()))
+            return segments_to_text(segments)
     except Exception as e:
         logger.error(f"Failed to transcribe {wav_path}: {e}", exc_info=True)
         return None
 
 
+def _ffmpeg_pcm_command(mp3_path: Path) -> List[str]:
+    """The ffmpeg command decoding an MP3 to raw 16 kHz mono PCM on stdout."""
+    return [
+        "ffmpeg",
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-i",
+        str(mp3_path),
+        "-ac",
+        "1",
+        "-ar",
+        str(SAMPLE_RATE),
+        "-f",
+        "s16le",
+        "-",
+    ]
+
+
+def _recognize_chunks(
+    chunks: Iterable[bytes],
+    model: Model,
+    verbose: bool,
+    mp3_path: Path,
+    on_segment: Optional[SegmentCallback] = None,
+    grammar: Optional[str] = None,
+    vad_threshold_db: Optional[float] = None,
+) -> Tuple[List[Dict], bool]:
+    """Runs a fresh recognizer over PCM chunks.
+
+    Returns the finalized segments and whether ``on_segment`` asked to stop.
+    """
+    rec = _create_recognizer(model, grammar, mp3_path)
+    rec.SetWords(True)
+    segments: List[Dict] = []
+    speech_filter = (
+        SpeechFilter(SAMPLE_RATE, vad_threshold_db) if vad_threshold_db is not None else None
+    )
+
+    def feed(data: bytes) -> bool:
+        """Recognizes a chunk; returns True if the callback asked to stop."""
+        if not data or not _accept_waveform(rec, data, verbose, segments):
+            return False
+        _remap_segment(segments[-1], speech_filter)
+        return on_segment is not None and bool(on_segment(segments[-1]))
+
+    for data in chunks:
+        if speech_filter is not None:
+            data = speech_filter.process(data)
+        if feed(data):
+            return segments, True
+
+    if speech_filter is not None:
+        if feed(speech_filter.flush()):
+            return segments, True
+        _log_skipped_audio(mp3_path, speech_filter)
+
+    segments.append(json.loads(rec.FinalResult()))
+    _remap_segment(segments[-1], speech_filter)
+    return segments, False
+
+
+def _read_with_progress(stream, timer: Optional[StageTimer] = None) -> Iterator[bytes]:
+    """Yields PCM chunks from a pipe, reporting progress in minutes of audio."""
+    processed_bytes = 0
+    last_reported_minute = -1
+    while True:
+        data = stream.read(CHUNK_BYTES)
+        if len(data) == 0:
+            return
+
+        processed_bytes += len(data)
+        if timer is not None:
+            timer.add_audio(len(data) / BYTES_PER_SECOND)
+        minute = processed_bytes // (BYTES_PER_SECOND * 60)
+        if minute > last_reported_minute:
+            sys.stderr.write(f"\rTranscription progress: {minute} min of audio")
+            sys.stderr.flush()
+            last_reported_minute = minute
+        yield data
+
+
+def transcribe_mp3_stream(
+    mp3_path: Path,
+    model: Model,
+    verbose: bool,
+    on_segment: Optional[SegmentCallback] = None,
+    grammar: Optional[str] = None,
+    vad_threshold_db: Optional[float] = None,
+    timer: Optional[StageTimer] = None,
+) -> Optional[List[Dict]]:
+    """Transcribes an MP3 file by streaming raw PCM from ffmpeg into the recognizer.
+
+    Decoding and recognition overlap and no intermediate WAV file is written.
+    Returns the finalized recognizer results, each holding the segment text and
+    its per-word timings, or None if decoding or recognition failed.
+
+    ``on_segment`` is called with each segment finalized while audio is still
+    being decoded; if it returns True, ffmpeg is stopped and the segments
+    recognized so far are returned. A JSON ``grammar`` restricts recognition to
+    the listed phrases (keyword spotting) when the model supports it.
+
+    With ``vad_threshold_db`` set, audio quieter than that level is treated as
+    non-speech and dropped before recognition; word timings still refer to the
+    original audio.
+
+    The audio read and the time spent, decoding included, are recorded in
+    ``timer`` as the ``recognize`` stage.
+    """
+    timer = timer if timer is not None else StageTimer()
+    start = time.perf_counter()
+    try:
+        process = subprocess.Popen(
+            _ffmpeg_pcm_command(mp3_path), stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+    except FileNotFoundError:
+        logger.error("ffmpeg not found. Please ensure it is installed and in your PATH.")
+        return None
+
+    # Drain stderr concurrently so a chatty ffmpeg cannot block on a full pipe.
+    stderr_chunks: List[bytes] = []
+    assert process.stderr is not None  # opened with stderr=PIPE
+    stderr_reader = threading.Thread(
+        target=lambda pipe: stderr_chunks.append(pipe.read()), args=(process.stderr,), daemon=True
+    )
+    stderr_reader.start()
+
+    try:
+        segments, stopped = _recognize_chunks(
+            _read_with_progress(process.stdout, timer),
+            model,
+            verbose,
+            mp3_path,
+            on_segment,
+            grammar,
+            vad_threshold_db,
+        )
+        if stopped:
+            sys.stderr.write("\rTranscription stopped early.    \n")
+            sys.stderr.flush()
+            return segments
+
+        process.wait()
+        stderr_reader.join()
+        if process.returncode != 0:
+            stderr = b"".join(stderr_chunks).decode("utf-8", errors="replace")
+            logger.error(f"Failed to convert {mp3_path} to PCM: {stderr}")
+            return None
+
+        sys.stderr.write("\rTranscription complete.    \n")
+        sys.stderr.flush()
+        return segments
+    except Exception as e:
+        logger.error(f"Failed to transcribe {mp3_path}: {e}", exc_info=True)
+        return None
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        timer.add("recognize", time.perf_counter() - start)
+
+
+def probe_duration(mp3_path: Path) -> Optional[float]:
+    """Returns the duration of an audio file in seconds using ffprobe, or None if unknown."""
+    command = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-show_entries",
+        "format=duration",
+        "-of",
+        "csv=p=0",
+        str(mp3_path),
+    ]
+    try:
+        result = subprocess.run(command, check=True, capture_output=True, text=True)
+        return float(result.stdout.strip())
+    except (subprocess.CalledProcessError, FileNotFoundError, ValueError):
+        return None
+
+
+def estimate_pcm_bytes(mp3_path: Path) -> int:
+    """Estimates the size of a file decoded to PCM, from its duration or else its size."""
+    duration = probe_duration(mp3_path)
+    if duration is None:
+        try:
+            duration = mp3_path.stat().st_size / ESTIMATE_MP3_BYTES_PER_SECOND
+        except OSError:
+            return 0
+    return int(duration * BYTES_PER_SECOND)
+
+
+def _pcm_chunks(pcm: bytes, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+    """Yields recognizer-sized chunks of a slice of in-memory PCM."""
+    part = memoryview(pcm)[start:end]
+    for i in range(0, len(part), CHUNK_BYTES):
+        yield bytes(part[i : i + CHUNK_BYTES])
+
+
+def transcribe_pcm(
+    pcm: bytes,
+    mp3_path: Path,
+    model: Model,
+    verbose: bool,
+    on_segment: Optional[SegmentCallback] = None,
+    grammar: Optional[str] = None,
+    vad_threshold_db: Optional[float] = None,
+    timer: Optional[StageTimer] = None,
+) -> Optional[List[Dict]]:
+    """Transcribes audio already decoded to raw 16 kHz mono PCM.
+
+    Behaves like ``transcribe_mp3_stream`` for ``on_segment``, ``grammar``,
+    ``vad_threshold_db`` and ``timer``; ``mp3_path`` is only used in messages.
+    """
+    timer = timer if timer is not None else StageTimer()
+    timer.add_audio(len(pcm) / BYTES_PER_SECOND)
+    try:
+        with timer.time("recognize"):
+            segments, _ = _recognize_chunks(
+                _pcm_chunks(pcm), model, verbose, mp3_path, on_segment, grammar, vad_threshold_db
+            )
+    except Exception as e:
+        logger.error(f"Failed to transcribe {mp3_path}: {e}", exc_info=True)
+        return None
+    return segments
+
+
+def decode_mp3_to_pcm(mp3_path: Path) -> Optional[bytes]:
+    """Decodes a whole MP3 file into memory as raw 16 kHz mono PCM."""
+    try:
+        result = subprocess.run(
+            _ffmpeg_pcm_command(mp3_path),
+            check=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        return result.stdout
+    except subprocess.CalledProcessError as e:
+        logger.error(f"Failed to convert {mp3_path} to PCM: {e.stderr.decode('utf-8', errors='replace')}")
+        return None
+    except FileNotFoundError:
+        logger.error("ffmpeg not found. Please ensure it is installed and in your PATH.")
+        return None
+
+
+def transcribe_mp3_split(
+    mp3_path: Path,
+    model: Model,
+    verbose: bool,
+    threads: int,
+    grammar: Optional[str] = None,
+    vad_threshold_db: Optional[float] = None,
+    pcm: Optional[bytes] = None,
+    timer: Optional[StageTimer] = None,
+) -> Optional[List[Dict]]:
+    """Transcribes a long MP3 file as several parts recognized in parallel.
+
+    The decoded audio is held in memory and cut at the quietest point near
+    each even split, then every part is recognized on its own thread with its
+    own recognizer over the shared model. The parts are stitched back together
+    with word timings shifted to their position in the whole file. Audio
+    already decoded (e.g. prefetched) can be passed as ``pcm``. Decoding and
+    recognition times are recorded in ``timer``.
+    """
+    timer = timer if timer is not None else StageTimer()
+    if pcm is None:
+        with timer.time("decode"):
+            pcm = decode_mp3_to_pcm(mp3_path)
+    if pcm is None:
+        return None
+
+    duration = len(pcm) / BYTES_PER_SECOND
+    timer.add_audio(duration)
+    parts = max(threads, math.ceil(duration / SPLIT_PART_SECONDS))
+    bounds = [0] + find_split_points(pcm, SAMPLE_RATE, parts) + [len(pcm)]
+    logger.info(
+        f"Transcribing {mp3_path.name} ({duration / 60:.0f} min) in {parts} parts on {threads} threads."
+    )
+
+    def recognize_part(start: int, end: int) -> List[Dict]:
+        segments, _ = _recognize_chunks(
+            _pcm_chunks(pcm, start, end),
+            model,
+            verbose,
+            mp3_path,
+            grammar=grammar,
+            vad_threshold_db=vad_threshold_db,
+        )
+        offset = start / BYTES_PER_SECOND
+        for segment in segments:
+            for word in segment.get("result", []):
+                for key in ("start", "end"):
+                    if key in word:
+                        word[key] = round(word[key] + offset, 3)
+        return segments
+
+    try:
+        with timer.time("recognize"), ThreadPoolExecutor(max_workers=threads) as executor:
+            results = list(executor.map(recognize_part, bounds[:-1], bounds[1:]))
+    except Exception as e:
+        logger.error(f"Failed to transcribe {mp3_path}: {e}", exc_info=True)
+        return None
+    return [segment for part in results for segment in part]
+
+
+def _log_skipped_audio(mp3_path: Path, speech_filter: SpeechFilter) -> None:
+    total = speech_filter.total_seconds
+    skipped = speech_filter.skipped_seconds
+    share = (skipped / total * 100) if total else 0
+    logger.info(
+        f"Skipped {skipped:.1f}s of {total:.1f}s of non-speech audio in {mp3_path.name} ({share:.0f}%)"
+    )
+
+
 def process_mp3_file(
-    mp3_path: Path, model: Model, verbose: bool
+    mp3_path: Path,
+    model: Model,
+    verbose: bool,
+    stream: bool = True,
+    cache: Optional[TranscriptionCache] = None,
+    refresh: bool = False,
+    on_segment: Optional[SegmentCallback] = None,
+    grammar: Optional[str] = None,
+    vad_threshold_db: Optional[float] = None,
+    split_threads: int = 1,
+    split_min_duration: float = 0,
+    pcm: Optional[bytes] = None,
+    cache_key: Optional[str] = None,
+    timer: Optional[StageTimer] = None,
+    on_stop: Optional[Callable[[], None]] = None,
 ) -> Optional[str]:
-    """Processes a single MP3 file: converts to WAV and transcribes."""
+    """Processes a single MP3 file: decodes it and transcribes the audio.
+
+    By default the decoded audio is streamed straight into the recognizer;
+    with ``stream=False`` it is written to a temporary WAV file first. When a
+    cache is given it is consulted before transcribing, unless ``refresh`` is set.
+
+    ``on_segment`` is called once with every finalized segment, whether it was
+    just recognized, replayed from the cache or produced by the WAV path; it
+    returns True to stop. While streaming, stopping ends transcription early and
+    the partial transcript is returned but neither cached nor saved; ``on_stop``
+    is then called. A transcript taken from the cache, or one already complete
+    as with split files, is returned whole without calling ``on_stop``.
+
+    With a spotting ``grammar`` the output only contains grammar phrases, so it
+    bypasses the cache and is not saved as the file's transcription.
+    ``vad_threshold_db`` enables the non-speech filter on the streaming path.
+
+    With ``split_threads`` above one, files lasting at least
+    ``split_min_duration`` seconds are split and recognized in parallel; their
+    segments only reach ``on_segment`` once the whole file is transcribed.
+
+    ``pcm`` and ``cache_key`` hold the decoded audio and the cache key when
+    they were computed ahead of time, so neither ffmpeg nor hashing runs here.
+
+    The time spent in each stage and the length of the decoded audio are
+    recorded in ``timer``.
+    """
+    timer = timer if timer is not None else StageTimer()
+    if grammar is not None:
+        cache = None
+
+    if cache is not None:
+        with timer.time("cache"):
+            if cache_key is None:
+                try:
+                    cache_key = cache.key_for(mp3_path)
+                except OSError as e:
+                    logger.error(f"Failed to read {mp3_path}: {e}")
+                    return None
+            segments = cache.get(cache_key) if not refresh else None
+        if segments is not None:
+            logger.info(f"Using cached transcription for {mp3_path.name}")
+            _replay_segments(segments, on_segment)
+            transcription = segments_to_text(segments)
+            if transcription:
+                with timer.time("save_transcript"):
+                    save_transcription(transcription, mp3_path)
+            return transcription
+
+    delivered = 0
+    stopped_early = False
+
+    def _on_segment(segment: Dict) -> bool:
+        nonlocal delivered, stopped_early
+        delivered += 1
+        stopped_early = on_segment is not None and bool(on_segment(segment))
+        return stopped_early
+
+    split = False
+    if stream and split_threads > 1:
+        duration = len(pcm) / BYTES_PER_SECOND if pcm is not None else probe_duration(mp3_path)
+        split = duration is not None and duration >= split_min_duration
+
+    if split:
+        segments = transcribe_mp3_split(
+            mp3_path, model, verbose, split_threads, grammar, vad_threshold_db, pcm, timer=timer
+        )
+    elif pcm is not None:
+        segments = transcribe_pcm(
+            pcm,
+            mp3_path,
+            model,
+            verbose,
+            _on_segment if on_segment is not None else None,
+            grammar,
+            vad_threshold_db,
+            timer=timer,
+        )
+    elif stream:
+        segments = transcribe_mp3_stream(
+            mp3_path,
+            model,
+            verbose,
+            _on_segment if on_segment is not None else None,
+            grammar,
+            vad_threshold_db,
+            timer=timer,
+        )
+    else:
+        segments = _transcribe_via_wav(mp3_path, model, verbose, timer)
+    if segments is None:
+        return None
+
+    if stopped_early:
+        if on_stop is not None:
+            on_stop()
+        return segments_to_text(segments)
+    _replay_segments(segments[delivered:], on_segment)
+
+    if cache is not None and cache_key is not None:
+        with timer.time("cache"):
+            cache.put(cache_key, segments)
+
+    transcription = segments_to_text(segments)
+    if transcription and grammar is None:
+        with timer.time("save_transcript"):
+            save_transcription(transcription, mp3_path)
+    return transcription
+
+
+def _replay_segments(segments: List[Dict], on_segment: Optional[SegmentCallback]) -> None:
+    """Delivers already transcribed segments to a callback until it asks to stop."""
+    if on_segment is None:
+        return
+    for segment in segments:
+        if on_segment(segment):
+            break
+
+
+def _transcribe_via_wav(
+    mp3_path: Path, model: Model, verbose: bool, timer: StageTimer
+) -> Optional[List[Dict]]:
+    """Converts the MP3 to a temporary WAV file and transcribes it."""
     with tempfile.NamedTemporaryFile(suffix=".wav", delete=True) as temp_wav_file:
         wav_path = Path(temp_wav_file.name)
-        if not convert_mp3_to_wav(mp3_path, wav_path):
+        with timer.time("decode"):
+            converted = convert_mp3_to_wav(mp3_path, wav_path)
+        if not converted:
             return None
-        
-        transcription = transcribe_audio(wav_path, model, verbose)
-        
-        if transcription:
-            save_transcription(transcription, mp3_path)
-            
-        return transcription
+
+        with timer.time("recognize"):
+            transcription = transcribe_audio(wav_path, model, verbose)
+        if transcription is None:
+            return None
+        # The WAV path only yields the joined text, without word timings.
+        return [{"text": transcription}]
 
 def save_transcription(text: str, mp3_path: Path):
     """Saves the transcription to a text file next to the MP3."""
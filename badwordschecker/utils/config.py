@@ -2,9 +2,15 @@ import configparser
 from pathlib import Path
 import argparse
 
+from badwordschecker.cache import DEFAULT_CACHE_MAX_MB, DEFAULT_CACHE_PATH
+from badwordschecker.matching import DEFAULT_FUZZY_DISTANCE
+
 DEFAULT_CONFIG_FILENAME = "badwordschecker.ini"
 DEFAULT_DICT_URL = "https://raw.githubusercontent.com/napolux/paroleitaliane/main/paroleitaliane/lista_badwords.txt"
 DEFAULT_DICT_PATH = Path("badwords-it.txt")
+DEFAULT_EVENTS_PATH = Path("parolacce") / "events.jsonl"
+# Same as vad.DEFAULT_THRESHOLD_DB; not imported so reading the config does not load NumPy.
+DEFAULT_VAD_THRESHOLD_DB = -45.0
 
 def _get_config():
     config_paths = [
@@ -35,17 +41,42 @@ def get_config(args: argparse.Namespace) -> dict:
         # Use the default fallback.
         return fallback
 
+    phonetic_distance = get_option("phonetic_distance", "options", None)
     return {
-        "mp3_folder": args.mp3_folder or Path.cwd(),
+        "mp3_folders": list(args.mp3_folder or []),
+        "roots_file": getattr(args, "roots_file", None),
         "download_dict": args.download_dict,
         "force": get_option("force", "options", False, is_bool=True),
         "dict": get_option("dict", "dictionary", DEFAULT_DICT_PATH),
         "edit_dict": args.edit_dict,
         "match_mode": get_option("match_mode", "options", "exact"),
+        "fuzzy_distance": int(get_option("fuzzy_distance", "options", DEFAULT_FUZZY_DISTANCE)),
+        "phonetic_distance": int(phonetic_distance) if phonetic_distance not in (None, "") else None,
+        "first_hit": int(get_option("first_hit", "options", 0)),
+        "spotting": get_option("spotting", "options", False, is_bool=True),
+        "vad": get_option("vad", "options", False, is_bool=True),
+        "vad_threshold_db": float(get_option("vad_threshold_db", "options", DEFAULT_VAD_THRESHOLD_DB)),
+        "rescan_transcripts": bool(getattr(args, "rescan_transcripts", False)),
         "quarantine": get_option("quarantine", "options", None),
+        "resume": get_option("resume", "options", False, is_bool=True),
         "recursive": get_option("recursive", "options", False, is_bool=True),
+        "jobs": int(get_option("jobs", "options", 1)),
+        "prefetch": int(get_option("prefetch", "options", 0)),
+        "prefetch_memory_mb": int(get_option("prefetch_memory_mb", "options", 512)),
+        "split_threads": int(get_option("split_threads", "options", 1)),
+        "split_min_duration": float(get_option("split_min_duration", "options", 900)),
         "verbose": get_option("verbose", "options", False, is_bool=True),
         "log_format": get_option("log_format", "options", "text"),
+        "events": get_option("events", "options", None),
+        "events_path": get_option("events_path", "options", DEFAULT_EVENTS_PATH),
+        "metrics_path": get_option("metrics_path", "options", None),
+        "prometheus_textfile": get_option("prometheus_textfile", "options", None),
+        "server": get_option("server", "options", False, is_bool=True),
+        "server_socket": get_option("server_socket", "options", None),
         "dict_url": get_option("dict_url", "dictionary", DEFAULT_DICT_URL),
         "model_path": get_option("model_path", "options", None),
+        "no_cache": get_option("no_cache", "cache", False, is_bool=True),
+        "refresh": get_option("refresh", "cache", False, is_bool=True),
+        "cache_path": get_option("cache_path", "cache", DEFAULT_CACHE_PATH),
+        "cache_max_mb": int(get_option("cache_max_mb", "cache", DEFAULT_CACHE_MAX_MB)),
     }
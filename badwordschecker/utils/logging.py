@@ -1,11 +1,12 @@
 import logging
 import sys
-from json_log_formatter import JSONFormatter
 
 def setup_logging(verbose: bool = False, log_format: str = "text"):
     level = logging.DEBUG if verbose else logging.INFO
     
     if log_format == "json":
+        from json_log_formatter import JSONFormatter
+
         formatter = JSONFormatter()
     else:
         formatter = logging.Formatter(
@@ -0,0 +1,186 @@
+from functools import lru_cache
+
+# Distinct words remembered by stem(); transcripts reuse a small vocabulary.
+STEM_CACHE_SIZE = 100_000
+
+_VOWELS = "aeiouàèìòù"
+_ACUTE_TO_GRAVE = str.maketrans("áéíóú", "àèìòù")
+
+_PRONOUNS = (
+    "ci", "gli", "la", "le", "li", "lo", "mi", "ne", "si", "ti", "vi",
+    "sene", "gliela", "gliele", "glieli", "glielo", "gliene",
+    "mela", "mele", "meli", "melo", "mene", "tela", "tele", "teli", "telo", "tene",
+    "cela", "cele", "celi", "celo", "cene", "vela", "vele", "veli", "velo", "vene",
+)
+_PRONOUN_DELETE_AFTER = ("ando", "endo")
+_PRONOUN_REPLACE_AFTER = ("ar", "er", "ir")
+
+_PLAIN_SUFFIXES = (
+    "anza", "anze", "ico", "ici", "ica", "ice", "iche", "ichi", "ismo", "ismi",
+    "abile", "abili", "ibile", "ibili", "ista", "iste", "isti", "istà", "istè", "istì",
+    "oso", "osi", "osa", "ose", "mente", "atrice", "atrici", "ante", "anti",
+)
+_ATION_SUFFIXES = ("azione", "azioni", "atore", "atori")
+_LOGY_SUFFIXES = ("logia", "logie")
+_UTION_SUFFIXES = ("uzione", "uzioni", "usione", "usioni")
+_ENCE_SUFFIXES = ("enza", "enze")
+_MENT_SUFFIXES = ("amento", "amenti", "imento", "imenti")
+_ITY_SUFFIXES = ("ità",)
+_IVE_SUFFIXES = ("ivo", "ivi", "iva", "ive")
+_STANDARD_SUFFIXES = (
+    _PLAIN_SUFFIXES + _ATION_SUFFIXES + _LOGY_SUFFIXES + _UTION_SUFFIXES + _ENCE_SUFFIXES
+    + _MENT_SUFFIXES + ("amente",) + _ITY_SUFFIXES + _IVE_SUFFIXES
+)
+
+_VERB_SUFFIXES = (
+    "ammo", "ando", "ano", "are", "arono", "asse", "assero", "assi", "assimo", "ata", "ate",
+    "ati", "ato", "ava", "avamo", "avano", "avate", "avi", "avo", "emmo", "enda", "ende",
+    "endi", "endo", "erà", "erai", "eranno", "ere", "erebbe", "erebbero", "erei", "eremmo",
+    "eremo", "ereste", "eresti", "erete", "erò", "erono", "essero", "ete", "eva", "evamo",
+    "evano", "evate", "evi", "evo", "iamo", "immo", "irà", "irai", "iranno", "ire", "irebbe",
+    "irebbero", "irei", "iremmo", "iremo", "ireste", "iresti", "irete", "irò", "irono",
+    "isca", "iscano", "isce", "isci", "isco", "iscono", "issero", "ita", "ite", "iti", "ito",
+    "iva", "ivamo", "ivano", "ivate", "ivi", "ivo", "ar", "ir",
+)
+_FINAL_VOWELS = "aeioàèìò"
+
+
+def _is_vowel(char: str) -> bool:
+    return char in _VOWELS
+
+
+def _longest_suffix(word: str, suffixes) -> str:
+    """Returns the longest of ``suffixes`` ending ``word``, or an empty string."""
+    return max((s for s in suffixes if word.endswith(s)), key=len, default="")
+
+
+def _prelude(word: str) -> str:
+    """Normalizes accents and marks u after q, and i or u between vowels, as consonants."""
+    chars = list(word.translate(_ACUTE_TO_GRAVE))
+    for i, char in enumerate(chars):
+        if char == "u" and i > 0 and chars[i - 1] == "q":
+            chars[i] = "U"
+        elif char in "iu" and 0 < i < len(chars) - 1:
+            if _is_vowel(chars[i - 1]) and _is_vowel(chars[i + 1]):
+                chars[i] = char.upper()
+    return "".join(chars)
+
+
+def _region_after_vc(word: str, start: int) -> int:
+    """Start of the region after the first non-vowel following a vowel, from ``start``."""
+    for i in range(max(start, 1), len(word)):
+        if not _is_vowel(word[i]) and _is_vowel(word[i - 1]):
+            return i + 1
+    return len(word)
+
+
+def _rv(word: str) -> int:
+    if len(word) < 2:
+        return len(word)
+    if not _is_vowel(word[1]):
+        # After the next vowel following the second letter.
+        for i in range(2, len(word)):
+            if _is_vowel(word[i]):
+                return i + 1
+        return len(word)
+    if _is_vowel(word[0]):
+        # Two leading vowels: after the next consonant.
+        for i in range(2, len(word)):
+            if not _is_vowel(word[i]):
+                return i + 1
+        return len(word)
+    return min(3, len(word))
+
+
+def _attached_pronoun(word: str, rv: int) -> str:
+    pronoun = _longest_suffix(word, _PRONOUNS)
+    if not pronoun:
+        return word
+    stem = word[: -len(pronoun)]
+    for before in _PRONOUN_DELETE_AFTER:
+        if stem.endswith(before) and len(stem) - len(before) >= rv:
+            return stem
+    for before in _PRONOUN_REPLACE_AFTER:
+        if stem.endswith(before) and len(stem) - len(before) >= rv:
+            return stem + "e"
+    return word
+
+
+def _standard_suffix(word: str, r1: int, r2: int, rv: int) -> str:
+    """Step 1; returns the word unchanged when no suffix was removed."""
+    suffix = _longest_suffix(word, _STANDARD_SUFFIXES)
+    if not suffix:
+        return word
+    start = len(word) - len(suffix)
+    stem = word[:start]
+
+    def strip_in_r2(word: str, endings) -> str:
+        for ending in endings:
+            if word.endswith(ending) and len(word) - len(ending) >= r2:
+                return word[: -len(ending)]
+        return word
+
+    if suffix in _PLAIN_SUFFIXES:
+        return stem if start >= r2 else word
+    if suffix in _ATION_SUFFIXES:
+        return strip_in_r2(stem, ("ic",)) if start >= r2 else word
+    if suffix in _LOGY_SUFFIXES:
+        return stem + "log" if start >= r2 else word
+    if suffix in _UTION_SUFFIXES:
+        return stem + "u" if start >= r2 else word
+    if suffix in _ENCE_SUFFIXES:
+        return stem + "ente" if start >= r2 else word
+    if suffix in _MENT_SUFFIXES:
+        return stem if start >= rv else word
+    if suffix == "amente":
+        if start < r1:
+            return word
+        if stem.endswith("iv") and len(stem) - 2 >= r2:
+            return strip_in_r2(stem[:-2], ("at",))
+        return strip_in_r2(stem, ("abil", "os", "ic"))
+    if suffix in _ITY_SUFFIXES:
+        return strip_in_r2(stem, ("abil", "ic", "iv")) if start >= r2 else word
+    # _IVE_SUFFIXES
+    if start < r2:
+        return word
+    if stem.endswith("at") and len(stem) - 2 >= r2:
+        return strip_in_r2(stem[:-2], ("ic",))
+    return stem
+
+
+def _verb_suffix(word: str, rv: int) -> str:
+    suffix = _longest_suffix(word, _VERB_SUFFIXES)
+    if suffix and len(word) - len(suffix) >= rv:
+        return word[: -len(suffix)]
+    return word
+
+
+def _vowel_suffix(word: str, rv: int) -> str:
+    if word and word[-1] in _FINAL_VOWELS and len(word) - 1 >= rv:
+        word = word[:-1]
+        if word.endswith("i") and len(word) - 1 >= rv:
+            word = word[:-1]
+    if word.endswith(("ch", "gh")) and len(word) - 2 >= rv:
+        word = word[:-1]
+    return word
+
+
+@lru_cache(maxsize=STEM_CACHE_SIZE)
+def stem(word: str) -> str:
+    """Reduces an Italian word to its stem with the Snowball Italian algorithm.
+
+    ``stronzo``, ``stronza``, ``stronzi`` and ``stronze`` all become
+    ``stronz``. Expects a lowercase word. Results are cached, as the words of
+    a transcript repeat a lot.
+    """
+    word = _prelude(word)
+    r1 = _region_after_vc(word, 0)
+    r2 = _region_after_vc(word, r1 + 1)
+    rv = _rv(word)
+
+    word = _attached_pronoun(word, rv)
+    stemmed = _standard_suffix(word, r1, r2, rv)
+    if stemmed == word:
+        stemmed = _verb_suffix(word, rv)
+    word = _vowel_suffix(stemmed, rv)
+    return word.replace("I", "i").replace("U", "u")
@@ -1,18 +1,35 @@
 import os
 import sys
+import threading
 from contextlib import contextmanager
 import shutil
 
+# Nesting state shared by every thread, so overlapping redirections from
+# concurrent threads restore the original stderr exactly once.
+_silence_lock = threading.Lock()
+_silence_depth = 0
+_silenced_stderr = None
+_original_stderr = None
+
 @contextmanager
 def silence_stderr():
-    """A context manager to temporarily redirect stderr."""
-    new_target = open(os.devnull, "w")
-    old_target, sys.stderr = sys.stderr, new_target
+    """A context manager to temporarily redirect stderr (safe to use from several threads)."""
+    global _silence_depth, _silenced_stderr, _original_stderr
+    with _silence_lock:
+        if _silence_depth == 0:
+            _silenced_stderr = open(os.devnull, "w")
+            _original_stderr, sys.stderr = sys.stderr, _silenced_stderr
+        _silence_depth += 1
+        new_target = _silenced_stderr
     try:
         yield new_target
     finally:
-        sys.stderr = old_target
-        new_target.close()
+        with _silence_lock:
+            _silence_depth -= 1
+            if _silence_depth == 0:
+                sys.stderr = _original_stderr
+                _silenced_stderr.close()
+                _silenced_stderr = _original_stderr = None
 
 def command_exists(command: str) -> bool:
     """Check if a command exists on the system."""
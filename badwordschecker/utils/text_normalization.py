@@ -1,17 +1,57 @@
 import re
 import unicodedata
+from typing import Iterable, List
 
+# Code points up to the end of Latin Extended-B cover Italian text and the
+# other Latin scripts we expect in transcripts.
+_FAST_RANGE_END = 0x250
+_OUTSIDE_FAST_RANGE = re.compile(f"[^\\x00-\\u{_FAST_RANGE_END - 1:04x}]")
+# A whitespace-delimited chunk holding at least one character outside the fast range.
+_SLOW_CHUNK = re.compile(f"\\S*[^\\x00-\\u{_FAST_RANGE_END - 1:04x}]\\S*")
 
-def normalize_text(text: str) -> str:
-    """Normalizes text by lowercasing, removing punctuation, and normalizing accents."""
-    text = text.lower()
-    text = "".join(
-        c for c in unicodedata.normalize("NFD", text) if unicodedata.category(c) != "Mn"
-    )
+
+def strip_accents(text: str) -> str:
+    """Removes accents and other combining marks, e.g. ``perché`` becomes ``perche``."""
+    return "".join(c for c in unicodedata.normalize("NFD", text) if unicodedata.category(c) != "Mn")
+
+
+def _normalize_text_unicode(text: str) -> str:
+    """Reference normalization, valid for any code point."""
+    text = strip_accents(text.lower())
     text = re.sub(r"[^\w\s]", "", text)
     return text
 
 
+# Each character in the fast range maps to its normalized form. The mapping is
+# per character because lowercasing, accent stripping and punctuation removal
+# are all per character for these code points.
+_FAST_TABLE = str.maketrans(
+    {chr(c): _normalize_text_unicode(chr(c)) for c in range(_FAST_RANGE_END)}
+)
+
+
+def normalize_text(text: str) -> str:
+    """Normalizes text by lowercasing, removing punctuation, and normalizing accents."""
+    if not _OUTSIDE_FAST_RANGE.search(text):
+        return text.translate(_FAST_TABLE)
+    # Characters outside the table can depend on their neighbours (e.g. the
+    # Greek final sigma, or combining marks), never across whitespace. So only
+    # the chunks between whitespace holding one take the full Unicode path.
+    parts = []
+    position = 0
+    for match in _SLOW_CHUNK.finditer(text):
+        parts.append(text[position : match.start()].translate(_FAST_TABLE))
+        parts.append(_normalize_text_unicode(match.group()))
+        position = match.end()
+    parts.append(text[position:].translate(_FAST_TABLE))
+    return "".join(parts)
+
+
+def normalize_many(texts: Iterable[str]) -> List[str]:
+    """Normalizes a batch of texts."""
+    return [normalize_text(text) for text in texts]
+
+
 def tokenize_text(text: str) -> list[str]:
     """Tokenizes text into a list of words."""
     return text.split()
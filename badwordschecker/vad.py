@@ -0,0 +1,158 @@
+import bisect
+from typing import List
+
+import numpy as np
+
+DEFAULT_THRESHOLD_DB = -45.0
+DEFAULT_FRAME_MS = 30
+DEFAULT_PADDING_MS = 300
+
+
+class SpeechFilter:
+    """Drops non-speech audio from a stream of 16-bit mono PCM chunks.
+
+    Frames are classified by their energy; every frame within ``padding_ms`` of
+    a speech frame is kept, so word edges and short pauses survive and only
+    longer silences are dropped. The filter remembers where each kept frame
+    came from, so times measured on the filtered audio can be mapped back to
+    the original audio with ``to_original``.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        threshold_db: float = DEFAULT_THRESHOLD_DB,
+        frame_ms: int = DEFAULT_FRAME_MS,
+        padding_ms: int = DEFAULT_PADDING_MS,
+    ):
+        self.sample_rate = sample_rate
+        self.threshold_db = threshold_db
+        self.frame_samples = sample_rate * frame_ms // 1000
+        self.frame_bytes = self.frame_samples * 2
+        self.padding_frames = max(0, padding_ms // frame_ms)
+
+        self._remainder = b""
+        # Frames waiting for enough lookahead to be decided, with their flags.
+        self._pending: List[bytes] = []
+        self._pending_flags = np.zeros(0, dtype=bool)
+        # Flags of the last decided frames, needed as lookbehind.
+        self._history_flags = np.zeros(self.padding_frames, dtype=bool)
+        self._next_frame = 0  # original index of the first pending frame
+        self._kept_frames = 0
+        self._total_frames = 0
+        # Runs of consecutive kept frames: where each starts in the filtered
+        # audio and where it came from in the original audio.
+        self._run_kept_starts: List[int] = []
+        self._run_original_starts: List[int] = []
+
+    def _speech_flags(self, frames: np.ndarray) -> np.ndarray:
+        samples = frames.astype(np.float64) / 32768.0
+        rms = np.sqrt(np.mean(samples * samples, axis=1))
+        db = 20.0 * np.log10(np.maximum(rms, 1e-10))
+        return db > self.threshold_db
+
+    def process(self, data: bytes) -> bytes:
+        """Feeds a chunk of PCM and returns the audio that has been decided as speech."""
+        data = self._remainder + data
+        usable = len(data) - len(data) % self.frame_bytes
+        self._remainder = data[usable:]
+        if usable:
+            frames = np.frombuffer(data[:usable], dtype="<i2").reshape(-1, self.frame_samples)
+            self._pending.extend(
+                data[i : i + self.frame_bytes] for i in range(0, usable, self.frame_bytes)
+            )
+            self._pending_flags = np.concatenate([self._pending_flags, self._speech_flags(frames)])
+        return self._decide(len(self._pending) - self.padding_frames)
+
+    def flush(self) -> bytes:
+        """Returns whatever speech is left once the stream has ended."""
+        if self._remainder:
+            padded = self._remainder + b"\x00" * (self.frame_bytes - len(self._remainder))
+            frames = np.frombuffer(padded, dtype="<i2").reshape(1, self.frame_samples)
+            self._pending.append(self._remainder)
+            self._pending_flags = np.concatenate([self._pending_flags, self._speech_flags(frames)])
+            self._remainder = b""
+        # Nothing follows the last frames, so their lookahead is silence.
+        self._pending_flags = np.concatenate(
+            [self._pending_flags, np.zeros(self.padding_frames, dtype=bool)]
+        )
+        return self._decide(len(self._pending))
+
+    def _decide(self, count: int) -> bytes:
+        if count <= 0:
+            return b""
+        pad = self.padding_frames
+        window = np.concatenate([self._history_flags, self._pending_flags[: count + pad]])
+        # A frame is kept if any frame within the padding on either side is speech.
+        dilated = np.convolve(window.astype(np.int32), np.ones(2 * pad + 1, dtype=np.int32), mode="valid")
+        keep = dilated[:count] > 0
+
+        kept = []
+        for offset in np.flatnonzero(keep):
+            original = self._next_frame + int(offset)
+            if (
+                not self._run_kept_starts
+                or self._run_original_starts[-1] + (self._kept_frames - self._run_kept_starts[-1]) != original
+            ):
+                self._run_kept_starts.append(self._kept_frames)
+                self._run_original_starts.append(original)
+            self._kept_frames += 1
+            kept.append(self._pending[offset])
+
+        self._history_flags = window[count : count + pad] if pad else self._history_flags
+        self._pending = self._pending[count:]
+        self._pending_flags = self._pending_flags[count:]
+        self._next_frame += count
+        self._total_frames += count
+        return b"".join(kept)
+
+    def to_original(self, seconds: float) -> float:
+        """Maps a time in the filtered audio to the matching time in the original audio."""
+        frame_seconds = self.frame_samples / self.sample_rate
+        kept_frame = seconds / frame_seconds
+        run = bisect.bisect_right(self._run_kept_starts, kept_frame) - 1
+        if run < 0:
+            return seconds
+        offset = kept_frame - self._run_kept_starts[run]
+        return (self._run_original_starts[run] + offset) * frame_seconds
+
+    @property
+    def total_seconds(self) -> float:
+        return self._total_frames * self.frame_samples / self.sample_rate
+
+    @property
+    def skipped_seconds(self) -> float:
+        return (self._total_frames - self._kept_frames) * self.frame_samples / self.sample_rate
+
+
+def find_split_points(
+    pcm: bytes, sample_rate: int, parts: int, search_seconds: float = 30.0, window_ms: int = 500
+) -> List[int]:
+    """Returns byte offsets cutting 16-bit mono PCM into ``parts`` pieces.
+
+    Each cut is placed in the middle of the quietest window within
+    ``search_seconds`` of an even split, so it falls into a pause whenever
+    there is one nearby and stays at the even split otherwise.
+    """
+    samples = np.frombuffer(pcm, dtype="<i2")
+    window = max(1, sample_rate * window_ms // 1000)
+    search = int(search_seconds * sample_rate)
+    points: List[int] = []
+    for i in range(1, parts):
+        target = len(samples) * i // parts
+        low = max(points[-1] // 2 if points else 0, target - search)
+        high = min(len(samples), target + search)
+        windows = (high - low) // window
+        if windows == 0:
+            cut = target
+        else:
+            region = samples[low : low + windows * window].astype(np.float64).reshape(windows, window)
+            energy = np.mean(region * region, axis=1)
+            centers = low + np.arange(windows) * window + window // 2
+            # Among equally quiet windows, prefer the one closest to the even split.
+            quietest = int(np.lexsort((np.abs(centers - target), energy))[0])
+            cut = int(centers[quietest])
+        if points and cut * 2 <= points[-1]:
+            continue
+        points.append(cut * 2)
+    return points
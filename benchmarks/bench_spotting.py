@@ -0,0 +1,73 @@
+"""Compare keyword spotting (--spotting) with full transcription on a sample set.
+
+Reports the real-time factor (processing time / audio duration) of both modes
+and the recall of spotting, using the hits of full transcription as reference.
+
+Usage:
+    python -m benchmarks.bench_spotting /path/to/sample/mp3s [--dict badwords-it.txt] [--model-path PATH]
+"""
+import argparse
+import time
+from collections import Counter
+from pathlib import Path
+
+from badwordschecker.dictionary import DEFAULT_DICT_PATH, load_dictionary
+from badwordschecker.model_manager import get_model_path, load_model, model_supports_grammar
+from badwordschecker.scanning import scan_text
+from badwordschecker.transcription import probe_duration, segments_to_text, transcribe_mp3_stream
+
+
+def _timed_scan(mp3_path, model, bad_words, grammar):
+    start = time.perf_counter()
+    segments = transcribe_mp3_stream(mp3_path, model, False, grammar=grammar)
+    elapsed = time.perf_counter() - start
+    matches = scan_text(segments_to_text(segments or []), bad_words, "exact")
+    return elapsed, matches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("sample_folder", type=Path)
+    parser.add_argument("--dict", type=Path, default=DEFAULT_DICT_PATH)
+    parser.add_argument("--model-path", type=Path)
+    args = parser.parse_args()
+
+    model_path = get_model_path(args.model_path)
+    if not model_supports_grammar(model_path):
+        print(f"Warning: {model_path} has a static graph; spotting will fall back to full decoding.")
+    model = load_model(model_path)
+    bad_words = load_dictionary(args.dict)
+    grammar = bad_words.spotting_grammar
+
+    totals = Counter()
+    print(f"{'File':<40} {'Audio s':>8} {'RTF full':>9} {'RTF spot':>9} {'Recall':>7}")
+    for mp3_path in sorted(args.sample_folder.glob("*.mp3")):
+        duration = probe_duration(mp3_path)
+        if not duration:
+            print(f"{mp3_path.name:<40} skipped (unknown duration)")
+            continue
+        full_time, full_matches = _timed_scan(mp3_path, model, bad_words, None)
+        spot_time, spot_matches = _timed_scan(mp3_path, model, bad_words, grammar)
+        expected = sum(full_matches.values())
+        found = sum((full_matches & spot_matches).values())
+        recall = f"{found / expected:.2f}" if expected else "-"
+        print(
+            f"{mp3_path.name[:40]:<40} {duration:>8.1f} "
+            f"{full_time / duration:>9.3f} {spot_time / duration:>9.3f} {recall:>7}"
+        )
+        totals.update(
+            {"audio": duration, "full": full_time, "spot": spot_time, "expected": expected, "found": found}
+        )
+
+    if not totals["audio"]:
+        print("No MP3 files measured.")
+        return
+    recall = totals["found"] / totals["expected"] if totals["expected"] else float("nan")
+    print(
+        f"\nTotal audio {totals['audio']:.1f}s | RTF full {totals['full'] / totals['audio']:.3f} | "
+        f"RTF spotting {totals['spot'] / totals['audio']:.3f} | recall {recall:.2f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
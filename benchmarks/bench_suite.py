@@ -0,0 +1,274 @@
+"""Throughput and memory benchmarks for the scanning stages, runnable offline.
+
+Measures normalization, exact, substring, stem, fuzzy and phonetic scanning
+with dictionaries of increasing size, aggregated report generation and the
+transcription loop, using generated Italian-like transcripts and a fake
+recognizer in place of the Vosk model. Prints operations per second and the tracemalloc peak of a
+single operation for each case.
+
+Usage:
+    python -m benchmarks.bench_suite [--quick] [--filter TEXT]
+    python -m benchmarks.bench_suite --save-baseline benchmarks/baseline.json
+    python -m benchmarks.bench_suite --baseline benchmarks/baseline.json [--tolerance 0.25]
+
+With --baseline, cases slower than the baseline by more than the tolerance
+are flagged and the exit status is 1.
+"""
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Set
+from unittest.mock import patch
+
+from badwordschecker.matching import CompiledDictionary
+from badwordschecker.reporting import generate_aggregated_report
+from badwordschecker.scanning import scan_text
+from badwordschecker.transcription import SAMPLE_RATE, transcribe_pcm
+from badwordschecker.utils.text_normalization import normalize_text
+
+SEED = 1234
+SYLLABLES = [
+    "ca", "co", "cu", "ce", "chi", "da", "de", "di", "fa", "fe", "ga", "gli", "la", "le", "li",
+    "lo", "ma", "me", "mi", "na", "ne", "no", "pa", "pe", "po", "ra", "re", "ri", "ro", "sa",
+    "se", "si", "so", "ta", "te", "ti", "to", "va", "ve", "vi", "za", "zo", "gna", "sci", "zz",
+]
+FUNCTION_WORDS = ["e", "di", "che", "il", "la", "un", "non", "per", "è", "più", "perché", "così"]
+PUNCTUATION = ["", "", "", "", ",", ".", "?", "!"]
+
+
+class Case(NamedTuple):
+    name: str
+    run: Callable[[], object]
+
+
+def _word(rng: random.Random) -> str:
+    word = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+    if rng.random() < 0.05:
+        word = word[:-1] + rng.choice("àèéìòù")
+    return word
+
+
+def make_dictionary(size: int, rng: random.Random) -> List[str]:
+    words: Set[str] = set()
+    while len(words) < size:
+        words.add(_word(rng))
+    return sorted(words)
+
+
+def _compile_dictionary(words: List[str]) -> CompiledDictionary:
+    return CompiledDictionary(set(words)).compile()
+
+
+def _scan_uncompiled(text: str, words: List[str], match_mode: str) -> Counter:
+    return scan_text(text, CompiledDictionary(set(words)), match_mode)
+
+
+def make_transcript(words: int, bad_words: List[str], rng: random.Random, hit_rate: float = 0.01) -> str:
+    """Italian-like text with roughly ``hit_rate`` of its words taken from the dictionary."""
+    tokens = []
+    for _ in range(words):
+        roll = rng.random()
+        if roll < hit_rate:
+            token = rng.choice(bad_words)
+        elif roll < 0.35:
+            token = rng.choice(FUNCTION_WORDS)
+        else:
+            token = _word(rng)
+        if rng.random() < 0.03:
+            token = token.capitalize()
+        tokens.append(token + rng.choice(PUNCTUATION))
+    return " ".join(tokens)
+
+
+class FakeRecognizer:
+    """Stands in for ``vosk.KaldiRecognizer``: finalizes a segment every few chunks."""
+
+    CHUNKS_PER_SEGMENT = 8
+
+    def __init__(self, model, sample_rate, grammar=None):
+        self.sample_rate = sample_rate
+        self._chunks = 0
+        self._seconds = 0.0
+        self._rng = random.Random(SEED)
+
+    def SetWords(self, enabled):
+        pass
+
+    def AcceptWaveform(self, data):
+        self._chunks += 1
+        self._seconds += len(data) / (2 * self.sample_rate)
+        return self._chunks % self.CHUNKS_PER_SEGMENT == 0
+
+    def _segment(self) -> str:
+        words = [
+            {"word": _word(self._rng), "start": self._seconds, "end": self._seconds + 0.3, "conf": 0.9}
+            for _ in range(6)
+        ]
+        return json.dumps({"text": " ".join(w["word"] for w in words), "result": words})
+
+    def Result(self):
+        return self._segment()
+
+    def PartialResult(self):
+        return json.dumps({"partial": ""})
+
+    def FinalResult(self):
+        return self._segment()
+
+
+def build_cases(quick: bool, output_dir: Path) -> List[Case]:
+    """The benchmark cases; reports are written to ``output_dir``."""
+    rng = random.Random(SEED)
+    sizes = [100, 1_000] if quick else [100, 1_000, 10_000]
+    transcript_words = 2_000 if quick else 10_000
+    report_files = 500 if quick else 5_000
+    audio_seconds = 60 if quick else 600
+
+    largest = make_dictionary(sizes[-1], rng)
+    transcript = make_transcript(transcript_words, largest[: sizes[0]], rng)
+    normalized = normalize_text(transcript)
+    cases = [Case(f"normalize_text[{transcript_words} words]", lambda: normalize_text(transcript))]
+
+    for size in sizes:
+        words = largest[:size]
+        compiled = CompiledDictionary(set(words)).compile()
+        cases.append(
+            Case(
+                f"scan_text exact[{size} entries]",
+                partial(scan_text, normalized, compiled, "exact"),
+            )
+        )
+        cases.append(
+            Case(
+                f"scan_text substring[{size} entries]",
+                partial(scan_text, normalized, compiled, "substring"),
+            )
+        )
+        cases.append(
+            Case(
+                f"scan_text stem[{size} entries]",
+                partial(scan_text, normalized, compiled, "stem"),
+            )
+        )
+        cases.append(
+            Case(
+                f"scan_text fuzzy[{size} entries]",
+                # A fresh dictionary per run: measures the index build and the lookups, not the memo.
+                partial(_scan_uncompiled, normalized, words, "fuzzy"),
+            )
+        )
+        cases.append(
+            Case(
+                f"scan_text phonetic[{size} entries]",
+                partial(scan_text, normalized, compiled, "phonetic"),
+            )
+        )
+        cases.append(
+            Case(
+                f"compile dictionary[{size} entries]",
+                partial(_compile_dictionary, words),
+            )
+        )
+
+    all_matches: Dict[str, Counter] = {
+        f"file{i:05d}.mp3": Counter({word: rng.randint(1, 5) for word in rng.sample(largest[:200], 5)})
+        for i in range(report_files)
+    }
+    cases.append(
+        Case(
+            f"generate_aggregated_report[{report_files} files]",
+            lambda: generate_aggregated_report(all_matches, output_dir, report_files),
+        )
+    )
+
+    # Alternate a second of noise with a second of silence, so the VAD has pauses to drop.
+    noise = bytes(random.Random(SEED).getrandbits(8) for _ in range(SAMPLE_RATE * 2))
+    pcm = (noise + b"\x00" * len(noise)) * (audio_seconds // 2)
+    for vad in (None, -45.0):
+        label = "vad" if vad is not None else "no vad"
+        cases.append(
+            Case(
+                f"transcribe_pcm fake recognizer[{audio_seconds}s, {label}]",
+                partial(transcribe_pcm, pcm, Path("bench.mp3"), None, False, vad_threshold_db=vad),
+            )
+        )
+    return cases
+
+
+def measure(case: Case, min_seconds: float) -> Dict[str, float]:
+    """Runs a case repeatedly for at least ``min_seconds``; returns ops/sec and peak memory."""
+    case.run()  # warm up caches and lazy structures
+    runs = 0
+    start = time.perf_counter()
+    while True:
+        case.run()
+        runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            break
+
+    tracemalloc.start()
+    case.run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"ops_per_sec": runs / elapsed, "peak_kib": peak / 1024}
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], tolerance: float) -> bool:
+    """Prints the change against a baseline; returns False if any case regressed."""
+    ok = True
+    print(f"\n{'Case':<52} {'ops/s':>12} {'baseline':>12} {'change':>8}")
+    for name, result in results.items():
+        if name not in baseline:
+            print(f"{name:<52} {result['ops_per_sec']:>12.1f} {'-':>12} {'new':>8}")
+            continue
+        base = baseline[name]["ops_per_sec"]
+        change = result["ops_per_sec"] / base - 1
+        flag = ""
+        if change < -tolerance:
+            flag = "  REGRESSION"
+            ok = False
+        print(f"{name:<52} {result['ops_per_sec']:>12.1f} {base:>12.1f} {change:>+8.0%}{flag}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="Smaller inputs, for a fast sanity run.")
+    parser.add_argument("--filter", help="Only run cases whose name contains this text.")
+    parser.add_argument("--min-time", type=float, default=0.5, help="Seconds to run each case (default: 0.5).")
+    parser.add_argument("--save-baseline", type=Path, help="Write the results to this JSON file.")
+    parser.add_argument("--baseline", type=Path, help="Compare the results with this JSON file.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown (default: 0.25).")
+    args = parser.parse_args()
+
+    results: Dict[str, Dict[str, float]] = {}
+    print(f"{'Case':<52} {'ops/s':>12} {'peak KiB':>10}")
+    with tempfile.TemporaryDirectory(prefix="badwordschecker-bench-") as temp_dir, patch(
+        "badwordschecker.transcription.KaldiRecognizer", FakeRecognizer
+    ):
+        for case in build_cases(args.quick, Path(temp_dir)):
+            if args.filter and args.filter not in case.name:
+                continue
+            result = measure(case, args.min_time)
+            results[case.name] = result
+            print(f"{case.name:<52} {result['ops_per_sec']:>12.1f} {result['peak_kib']:>10.0f}")
+
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+        print(f"\nSaved baseline to {args.save_baseline}")
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        if not compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,24 @@
 #!/usr/bin/env bash
-# Run badwordcheck in all subfolders of the current directory
+# Run badwordcheck on all subfolders of the current directory in a single run,
+# so the model is loaded once. Each folder is reported in parolacce/<folder>/
+# and parolacce/parolacce.txt combines them all.
+# Set BADWORDCHECK_SERVER to the socket of a running `badwordcheck serve` daemon
+# to use its resident model instead of loading one.
 
 BADWORDCHECK=~/Development/AI-tests/BadWordsChecker/badwordcheck
 DICT_FILE="$(pwd)/badwords-it.txt"
 
+dirs=()
 for dir in */ ; do
   if [ -d "$dir" ]; then
-    echo "Processing $dir with dict $DICT_FILE"
-    "$BADWORDCHECK" --dict "$DICT_FILE" "$dir"
+    dirs+=("$dir")
   fi
 done
+
+if [ ${#dirs[@]} -eq 0 ]; then
+  echo "No subfolders to process"
+  exit 0
+fi
+
+echo "Processing ${#dirs[@]} folders with dict $DICT_FILE"
+"$BADWORDCHECK" ${BADWORDCHECK_SERVER:+--server --server-socket "$BADWORDCHECK_SERVER"} --dict "$DICT_FILE" "${dirs[@]}"